@@ -0,0 +1,308 @@
+"""
+Headless batch analyzer: runs MugguVision.analyze_principles over a directory,
+glob pattern or manifest across a process pool and streams one row per image
+to a JSONL or CSV file.
+
+    python batch_analyze.py assets/ -o results.jsonl -j 8
+    python batch_analyze.py "photos/**/*.jpg" manifest.txt -o results.csv
+
+Re-running with the same output file resumes: images already recorded are
+skipped (failed ones too, unless --retry-failed is given, which replaces
+their rows). A row cut short by a crash is dropped and redone.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from functools import partial
+from multiprocessing import Pool
+
+import cv2
+
+from core.cache import AnalysisCache
+from core.config import VisionConfig
+from core.tiled import TiledAnalyzer
+from core.vision import MugguVision, to_builtin
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+MANIFEST_EXTENSIONS = (".txt", ".lst", ".csv", ".jsonl")
+
+RESULT_FIELDS = [
+    "path", "dots", "anchor_dot_grid", "sikku", "zero_endpoints", "endpoints",
+    "style", "palette", "seconds", "error",
+]
+
+
+# --------------------------------------------------
+# INPUT COLLECTION
+# --------------------------------------------------
+def _read_manifest(path):
+    """One image path per line (txt), a 'path' column (csv) or key (jsonl)."""
+    base = os.path.dirname(path)
+    paths = []
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+            paths = [row["path"] for row in rows if row.get("path")]
+        elif path.endswith(".jsonl"):
+            paths = [json.loads(line)["path"] for line in f if line.strip()]
+        else:
+            paths = [line.strip() for line in f
+                     if line.strip() and not line.startswith("#")]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in paths]
+
+
+def collect_images(sources):
+    """Expands directories, glob patterns and manifests into a list of image paths."""
+    images = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                images.extend(os.path.join(root, name) for name in sorted(files)
+                              if name.lower().endswith(IMAGE_EXTENSIONS))
+        elif any(ch in source for ch in "*?["):
+            images.extend(sorted(glob.glob(source, recursive=True)))
+        elif source.lower().endswith(MANIFEST_EXTENSIONS):
+            images.extend(_read_manifest(source))
+        else:
+            images.append(source)
+
+    # Keep the first occurrence of every path, preserving order
+    seen = set()
+    unique = []
+    for path in images:
+        key = os.path.normpath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+# --------------------------------------------------
+# WORKER
+# --------------------------------------------------
+# Per-process result cache, opened once by _init_worker
+_CACHE = None
+
+
+def _init_worker(cache_dir=None, cache_bytes=None):
+    # One OpenCV thread per process: the pool already uses every core, and
+    # nested thread pools only fight over them.
+    cv2.setNumThreads(1)
+    cv2.setUseOptimized(True)
+    global _CACHE
+    if cache_dir:
+        _CACHE = AnalysisCache(cache_dir, cache_bytes)
+
+
+def summarize(path, result, seconds):
+    """Flattens an AnalysisResult into one output row."""
+    principles = result.principles
+    return {
+        "path": path,
+        "dots": len(result.dots),
+        "anchor_dot_grid": to_builtin(principles["Anchor Dot Grid (Chukkalu)"]),
+        "sikku": to_builtin(principles["Single Continuous Line (Sikku)"]),
+        "zero_endpoints": to_builtin(principles["Zero Endpoints Checks"]),
+        "endpoints": to_builtin(result.topology["endpoints_count"]),
+        "style": result.style,
+        "palette": to_builtin(result.palette),
+        "seconds": round(seconds, 4),
+        "error": "",
+    }
+
+
+def analyze_one(path, config=None, tile=None):
+    """Pool task: analyzes one image and never raises."""
+    start = time.perf_counter()
+    try:
+        if tile:
+            # Memory-bounded path for huge scans; bypasses the cache, which
+            # would have to read the whole file to hash it
+            with TiledAnalyzer(path, config, tile=tile) as tiled:
+                result = tiled.run()
+        elif _CACHE is not None:
+            result = _CACHE.analyze(path, config)
+        else:
+            result = MugguVision(path, config).analyze_principles()
+        return summarize(path, result, time.perf_counter() - start)
+    except Exception as e:
+        row = dict.fromkeys(RESULT_FIELDS, "")
+        row.update(path=path, seconds=round(time.perf_counter() - start, 4),
+                   error=f"{type(e).__name__}: {e}")
+        return row
+
+
+# --------------------------------------------------
+# OUTPUT
+# --------------------------------------------------
+class ResultWriter:
+    """Appends rows to a JSONL or CSV file, flushing after each one."""
+
+    def __init__(self, output_path):
+        self.is_csv = output_path.lower().endswith(".csv")
+        write_header = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self._file = open(output_path, "a", newline="")
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS)
+            if write_header:
+                self._csv.writeheader()
+
+    def write(self, row):
+        if self._csv is not None:
+            flat = dict(row)
+            if isinstance(flat.get("palette"), list):
+                flat["palette"] = ";".join(flat["palette"])
+            self._csv.writerow(flat)
+        else:
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_config(path=None):
+    """VisionConfig from a JSON file (e.g. written by sweep.py), or the defaults."""
+    if not path:
+        return VisionConfig()
+    with open(path) as f:
+        return VisionConfig.from_dict(json.load(f))
+
+
+def _cut_partial_row(output_path):
+    """Truncates a last row left without its newline by an interrupted run; returns bytes cut."""
+    with open(output_path, "rb+") as f:
+        end = pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            block = min(pos, 1 << 16)
+            f.seek(pos - block)
+            newline = f.read(block).rfind(b"\n")
+            if newline >= 0:
+                pos += newline + 1 - block
+                break
+            pos -= block
+        if pos < end:
+            f.truncate(pos)
+    return end - pos
+
+
+def load_checkpoint(output_path, retry_failed=False):
+    """
+    Returns the set of paths already present in a previous output file,
+    first cutting off a partial last row so appended rows start on a line
+    of their own.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    if _cut_partial_row(output_path):
+        print(f"Dropped a partial last row from {output_path} (interrupted run).")
+    with open(output_path, newline="") as f:
+        if output_path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            if retry_failed and row.get("error"):
+                continue
+            done.add(os.path.normpath(row["path"]))
+    return done
+
+
+def drop_rows(output_path, paths):
+    """Rewrites the output file without the rows of 'paths' (failed images about to be retried)."""
+    paths = {os.path.normpath(p) for p in paths}
+    temp_path = output_path + ".tmp"
+    with open(output_path, newline="") as src, open(temp_path, "w", newline="") as dst:
+        if output_path.lower().endswith(".csv"):
+            reader = csv.DictReader(src)
+            writer = csv.DictWriter(dst, fieldnames=reader.fieldnames or RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(row for row in reader if os.path.normpath(row["path"]) not in paths)
+        else:
+            dst.writelines(line for line in src if line.strip()
+                           and os.path.normpath(json.loads(line)["path"]) not in paths)
+    os.replace(temp_path, output_path)
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def run_batch(sources, output_path, workers=None, chunksize=4, retry_failed=False,
+              max_side=None, cache_dir=None, cache_bytes=512 * 1024 * 1024,
+              progress_every=100, config=None, tile=None):
+    images = collect_images(sources)
+    done = load_checkpoint(output_path, retry_failed)
+    todo = [p for p in images if os.path.normpath(p) not in done]
+    print(f"{len(images)} images found, {len(images) - len(todo)} already done, "
+          f"{len(todo)} to analyze.")
+    if not todo:
+        return 0
+    if retry_failed and os.path.exists(output_path):
+        # Only failed rows can name a path still to do; the retry replaces them
+        drop_rows(output_path, todo)
+
+    workers = workers or os.cpu_count() or 1
+    config = (config or VisionConfig()).replace(**({"max_side": max_side} if max_side else {}))
+    task = partial(analyze_one, config=config, tile=tile)
+    failures = 0
+    start = time.perf_counter()
+    with ResultWriter(output_path) as writer, \
+            Pool(processes=workers, initializer=_init_worker,
+                 initargs=(cache_dir, cache_bytes)) as pool:
+        for i, row in enumerate(pool.imap_unordered(task, todo, chunksize), 1):
+            writer.write(row)
+            if row["error"]:
+                failures += 1
+            if i % progress_every == 0 or i == len(todo):
+                rate = i / (time.perf_counter() - start)
+                print(f"  {i}/{len(todo)} done ({rate:.1f} img/s, {failures} failed)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch Muggu / Kolam analyzer")
+    parser.add_argument("sources", nargs="+",
+                        help="image directories, glob patterns, manifests or files")
+    parser.add_argument("-o", "--output", default="results.jsonl",
+                        help="output file (.jsonl or .csv), also the resume checkpoint")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=4,
+                        help="images handed to a worker at a time")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="re-analyze images that failed in a previous run")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="analyze at a pyramid level whose longest side fits this size")
+    parser.add_argument("--tile", type=int, default=None,
+                        help="analyze in tiles of this size (px) to bound memory on huge scans")
+    parser.add_argument("--config", default=None,
+                        help="JSON file of VisionConfig settings (see sweep.py)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="content-addressed result cache shared across runs")
+    parser.add_argument("--cache-mb", type=int, default=512,
+                        help="evict least recently used cache entries above this size")
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    if args.tile and (args.max_side or config.max_side is not None):
+        parser.error("--tile analyzes at full resolution and cannot be combined with max_side")
+
+    failures = run_batch(args.sources, args.output, args.workers, args.chunksize,
+                         args.retry_failed, args.max_side, args.cache_dir,
+                         args.cache_mb * 1024 * 1024, config=config, tile=args.tile)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
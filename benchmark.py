@@ -0,0 +1,269 @@
+"""
+Benchmark of the analysis and generation stages, with regression tracking
+against a stored baseline.
+
+    python benchmark.py -o bench.json                          # measure and save
+    python benchmark.py --baseline bench.json --threshold 0.2  # ... and compare
+    python benchmark.py --inputs synthetic --megapixels 1,4 --stages classify_style
+
+Image stages run on the bundled assets/kolam*.{jpg,png} and on synthetic
+kolams rendered at the requested sizes. Every run starts from a fresh
+MugguVision, so memoized intermediates never hide a stage's cost; the
+stages it depends on are computed beforehand, outside the timing.
+
+Each entry reports p50/p95 latency, throughput (runs/s and, for images,
+megapixels/s) and the peak Python/numpy heap of one extra run traced with
+tracemalloc (buffers OpenCV allocates internally are not seen). With
+--baseline, entries whose p50 latency or peak memory grew by more than
+--threshold are listed and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import count
+
+import cv2
+import numpy as np
+
+from batch_analyze import load_config
+from core.generator import CurveGenerator, HeritageGenerator
+from core.render import random_design, rasterize_design
+from core.symmetry import MugguSymmetry
+from core.thinning import zhang_suen_thinning
+from core.vision import MugguVision, close_lines
+from verify_analysis import generate_sample_kolam
+
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+# Regressions smaller than these are noise, whatever the relative change
+MIN_DELTA_MS = 1.0
+MIN_DELTA_MB = 0.5
+
+# Skeleton thinning paths: OpenCV contrib when installed, the bit-packed fallback always
+THINNING = {"fallback": zhang_suen_thinning}
+if hasattr(cv2, "ximgproc"):
+    THINNING["ximgproc"] = lambda img: cv2.ximgproc.thinning(
+        img, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN)
+
+
+def image_stages(config):
+    """
+    name -> (setup, run, number) for one image: setup(image) builds the
+    untimed inputs, run(*inputs) is the timed call, repeated 'number'
+    times per sample.
+    """
+    def fresh(image):
+        return (MugguVision(image, config),)
+
+    def with_inputs(image):
+        # Dots and skeleton come from another instance: the timed one has
+        # nothing memoized, so the graph and the style features are built
+        # inside the timed call
+        inputs = MugguVision(image, config)
+        return MugguVision(image, config), inputs.identify_chukkalu(), inputs.get_skeleton()
+
+    stages = {"identify_chukkalu": (fresh, lambda v: v.identify_chukkalu(), 1)}
+    for name in ("ximgproc", "fallback"):
+        thin = THINNING.get(name)
+        stages[f"get_skeleton[{name}]"] = thin and (
+            fresh, lambda v, thin=thin: thin(close_lines(v.get_binary(), v.config)), 1)
+    stages.update({
+        "verify_sikku_topology": (with_inputs, lambda v, dots, skel: v.verify_sikku_topology(skel), 1),
+        "classify_style": (with_inputs, lambda v, dots, skel: v.classify_style(dots, skel), 1),
+        "extract_color_palette": (fresh, lambda v: v.extract_color_palette(), 1),
+        "analyze_principles": (fresh, lambda v: v.analyze_principles(), 1),
+    })
+    return stages
+
+
+def generator_stages(size=11, px=1024):
+    """Like image_stages, for design generation and rendering; every run gets a new seed."""
+    seeds = count()
+
+    def paths(_):
+        return (HeritageGenerator(size, seed=next(seeds)).get_varied_petal_layers().paths(),)
+
+    def smooth(paths):
+        if isinstance(paths, np.ndarray):
+            return CurveGenerator.smooth_path(paths)
+        return [CurveGenerator.smooth_path(p) for p in paths]
+
+    def curve(_):
+        layer = HeritageGenerator(size, seed=next(seeds)).get_varied_petal_layers().path(0)
+        return MugguSymmetry(center_point=(size // 2, size // 2)), CurveGenerator.smooth_path(layer)
+
+    return {
+        "smooth_path": (paths, smooth, 100),
+        "apply_radial_symmetry": (curve, lambda sym, c: sym.apply_radial_symmetry(c, 16), 100),
+        "generate": (lambda _: (), lambda: random_design(size, next(seeds)), 10),
+        "render": (lambda _: (random_design(size, next(seeds)),),
+                   lambda design: rasterize_design(design, px), 1),
+        "generate+render": (lambda _: (), lambda: rasterize_design(random_design(size, next(seeds)), px), 1),
+    }
+
+
+def measure(setup, run, source, repeat=5, number=1, warmup=1):
+    """Latency percentiles (ms per call), throughput and peak traced heap of one stage."""
+    times = []
+    for i in range(warmup + repeat):
+        inputs = setup(source)
+        start = time.perf_counter()
+        for _ in range(number):
+            run(*inputs)
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000 / number)
+
+    # Peak heap of one more call, traced on its own so tracing does not skew the timings
+    inputs = setup(source)
+    tracemalloc.start()
+    run(*inputs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times = np.array(times)
+    p50, p95 = np.percentile(times, [50, 95])
+    return {"runs": repeat * number, "p50_ms": round(float(p50), 4), "p95_ms": round(float(p95), 4),
+            "mean_ms": round(float(times.mean()), 4),
+            "throughput_per_s": round(1000 / max(float(times.mean()), 1e-9), 2),
+            "peak_mb": round(peak / 2 ** 20, 3)}
+
+
+def load_inputs(kinds, megapixels, extra=()):
+    """(name, BGR image) pairs: bundled assets, synthetic kolams of the given sizes, extra paths."""
+    paths = list(extra)
+    if "assets" in kinds:
+        paths += [os.path.join(ASSETS, name) for name in sorted(os.listdir(ASSETS))
+                  if name.lower().startswith("kolam") and name.lower().endswith(IMAGE_EXTENSIONS)]
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"  skipping {path}: not an image")
+            continue
+        yield os.path.basename(path), image
+    if "synthetic" in kinds:
+        for mp in megapixels:
+            px = round(np.sqrt(mp * 1e6))
+            yield f"synthetic_{mp:g}mp", generate_sample_kolam(seed=0, px=px)
+
+
+def run_benchmark(inputs, config, repeat=5, stages=None, size=11, px=1024):
+    """Measures every selected stage on every input; returns the result entries."""
+    def selected(name):
+        return not stages or name in stages or name.split("[")[0] in stages
+
+    results = []
+
+    def record(entry):
+        results.append(entry)
+        if "skipped" in entry:
+            print(f"{entry['input']:<22} {entry['stage']:<26} skipped: {entry['skipped']}")
+            return
+        rate = f"{entry['mp_per_s']:8.2f} MP/s" if "mp_per_s" in entry else \
+            f"{entry['throughput_per_s']:8.0f} /s  "
+        print(f"{entry['input']:<22} {entry['stage']:<26} p50 {entry['p50_ms']:9.3f} ms   "
+              f"p95 {entry['p95_ms']:9.3f} ms   {rate}   peak {entry['peak_mb']:8.2f} MB")
+
+    for name, image in inputs:
+        h, w = image.shape[:2]
+        mp = h * w / 1e6
+        for stage, spec in image_stages(config).items():
+            if not selected(stage):
+                continue
+            entry = {"input": name, "stage": stage, "megapixels": round(mp, 3)}
+            if spec is None:
+                entry["skipped"] = "cv2.ximgproc not available"
+            else:
+                entry.update(measure(spec[0], spec[1], image, repeat, spec[2]))
+                entry["mp_per_s"] = round(mp * 1000 / entry["mean_ms"], 2)
+            record(entry)
+
+    for stage, (setup, run, number) in generator_stages(size, px).items():
+        if selected(stage):
+            entry = {"input": f"generator_{size}", "stage": stage}
+            entry.update(measure(setup, run, None, repeat, number))
+            record(entry)
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Entries whose p50 latency or peak memory exceeds the baseline's by more
+    than 'threshold' (relative) and MIN_DELTA_MS / MIN_DELTA_MB (absolute).
+    """
+    base = {(r["input"], r["stage"]): r for r in baseline["results"] if "p50_ms" in r}
+    regressions = []
+    for r in results:
+        b = base.get((r["input"], r["stage"]))
+        if b is None or "p50_ms" not in r:
+            continue
+        for metric, floor in (("p50_ms", MIN_DELTA_MS), ("peak_mb", MIN_DELTA_MB)):
+            if r[metric] > b[metric] * (1 + threshold) and r[metric] - b[metric] > floor:
+                regressions.append({"input": r["input"], "stage": r["stage"], "metric": metric,
+                                    "baseline": b[metric], "current": r[metric],
+                                    "change": round(r[metric] / max(b[metric], 1e-9) - 1, 4)})
+    return regressions
+
+
+def environment():
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "ximgproc": "ximgproc" in THINNING,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Kolam analysis and generation stages")
+    parser.add_argument("images", nargs="*", help="extra images to benchmark")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON results file")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown / memory growth counted as a regression")
+    parser.add_argument("--inputs", default="assets,synthetic",
+                        help="comma separated input sets: assets, synthetic")
+    parser.add_argument("--megapixels", default="1,4,16", help="synthetic image sizes")
+    parser.add_argument("--stages", default=None,
+                        help="comma separated stage names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed samples per stage")
+    parser.add_argument("--config", default=None,
+                        help="JSON file of VisionConfig settings (see sweep.py)")
+    args = parser.parse_args(argv)
+
+    inputs = load_inputs(args.inputs.split(","), [float(m) for m in args.megapixels.split(",") if m],
+                         args.images)
+    stages = set(args.stages.split(",")) if args.stages else None
+    start = time.perf_counter()
+    results = run_benchmark(inputs, load_config(args.config), args.repeat, stages)
+    report = {"environment": environment(), "repeat": args.repeat, "results": results}
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline"] = args.baseline
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['input']} {r['stage']} {r['metric']}: "
+                  f"{r['baseline']} -> {r['current']} ({r['change']:+.0%})")
+        if report["regressions"]:
+            status = 1
+        else:
+            print(f"No regressions over {args.threshold:.0%} against {args.baseline}.")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(results)} entries in {time.perf_counter() - start:.1f}s -> {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
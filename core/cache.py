@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from core.vision import AnalysisResult, MugguVision, to_builtin
+
+
+class AnalysisCache:
+    """
+    Content-addressed on-disk cache for MugguVision.analyze_principles().
+
+    The key combines a hash of the image bytes with a hash of the analysis
+    parameters, so renamed or re-uploaded files hit and any parameter change
+    misses. Each entry is one compressed .npz holding the principles (as JSON),
+    the bit-packed skeleton and the dot array. Entries are evicted least
+    recently used first once the directory grows past max_bytes.
+    """
+
+    SUFFIX = ".npz"
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Running size estimate; the directory is rescanned only when it overflows
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    # --------------------------------------------------
+    # KEYS
+    # --------------------------------------------------
+    @staticmethod
+    def hash_bytes(data):
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    @staticmethod
+    def hash_params(params):
+        blob = json.dumps(to_builtin(params), sort_keys=True).encode()
+        return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+    def key(self, image_bytes, params):
+        return f"{self.hash_bytes(image_bytes)}-{self.hash_params(params)}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    # --------------------------------------------------
+    # LOOKUP / STORE
+    # --------------------------------------------------
+    def get(self, key):
+        """Returns the cached AnalysisResult for 'key', or None."""
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data["meta"].tobytes().decode())
+                shape = tuple(data["skeleton_shape"])
+                bits = np.unpackbits(data["skeleton"], count=shape[0] * shape[1])
+                dots = data["dots"]
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return AnalysisResult(
+            principles=meta["principles"],
+            dots=dots[:, :2],
+            skeleton=(bits.reshape(shape) * 255).astype(np.uint8),
+            topology=meta["topology"],
+            style=meta["style"],
+            palette=meta["palette"],
+            palette_weights=meta.get("palette_weights"),
+            style_features=meta.get("style_features"),
+            lattice=meta.get("lattice"),
+            dot_table=dots,
+        )
+
+    def put(self, key, result):
+        """Stores an AnalysisResult under 'key' and evicts old entries if needed."""
+        meta = to_builtin({
+            "principles": result.principles,
+            "topology": result.topology,
+            "style": result.style,
+            "palette": result.palette,
+            "palette_weights": result.palette_weights,
+            "style_features": result.style_features,
+            "lattice": result.lattice,
+        })
+        skeleton = np.asarray(result.skeleton)
+        # Whole dot table when there is one (positions, radius, contrast)
+        table = result.dot_table if result.dot_table is not None else result.dots
+        dots = np.asarray(table, dtype=np.float32).reshape(len(table), -1)
+
+        # Write to a temp file and rename, so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                    skeleton=np.packbits(skeleton > 0),
+                    skeleton_shape=np.array(skeleton.shape, dtype=np.int64),
+                    dots=dots,
+                )
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        self._bytes += os.path.getsize(self._path(key))
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def analyze(self, image_path, config=None, **overrides):
+        """
+        analyze_principles() through the cache. A hit only reads and hashes
+        the file; on a miss the bytes already read are decoded in memory.
+        """
+        with open(image_path, "rb") as f:
+            data = f.read()
+        key = self.key(data, MugguVision.analysis_params(config, **overrides))
+        result = self.get(key)
+        if result is None:
+            result = MugguVision(data, config, **overrides).analyze_principles()
+            self.put(key, result)
+        return result
+
+    # --------------------------------------------------
+    # EVICTION
+    # --------------------------------------------------
+    def _entries(self):
+        """(path, size, last_used) for every entry in the cache directory."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._bytes = 0
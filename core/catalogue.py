@@ -0,0 +1,204 @@
+"""
+Exhaustive enumeration of the petal design space, one design per symmetry
+class.
+
+A design is described by the petals it draws: for every petal shape
+(length, width), the set of directions that carry an outline and the set
+that are filled. Directions are bits of an integer mask over U equal angle
+steps, where U is a multiple of every petal count and of 4, so the grid's
+own symmetries (MugguSymmetry.dihedral_stack(4)) act on masks as bit
+permutations. The canonical form of a design is the smallest of its images
+under that group, and its hash identifies the design up to rotation and
+mirroring.
+"""
+import hashlib
+from dataclasses import dataclass
+from functools import partial, reduce
+from math import lcm
+from multiprocessing import Pool
+
+import numpy as np
+
+from core.generator import HeritageGenerator
+from core.symmetry import dihedral_stack
+
+
+@dataclass(frozen=True)
+class DesignSpace:
+    """
+    Discrete design parameters, following HeritageGenerator: layer i
+    reaches at least i + 1 dots out and at most to the grid's edge, widths
+    run from 0.5 to half the length in 'width_step' steps, petal counts
+    come from 'ladder'.
+    """
+    size: int = 11
+    min_layers: int = 2
+    max_layers: int = 4
+    width_step: float = 0.5
+    ladder: tuple = (4, 8, 12, 16)
+    fills: tuple = (False, True)
+
+    @property
+    def units(self):
+        """Angle steps per turn: every petal count and the grid's 90 degrees divide it."""
+        return reduce(lcm, self.ladder, 4)
+
+    def layer_options(self):
+        """Every (length, width, petals, fill) layer, sorted."""
+        options = []
+        for length in range(1, self.size // 2 + 1):
+            n_widths = int(np.floor((length * 0.5 - 0.5) / self.width_step + 1e-9)) + 1
+            for width in 0.5 + self.width_step * np.arange(n_widths):
+                options.extend((length, float(width), petals, fill)
+                               for petals in sorted(self.ladder) for fill in sorted(self.fills))
+        return options
+
+
+def symmetry_permutations(units):
+    """
+    (g, units) angle-step permutations of the dot grid's symmetry group,
+    taken from MugguSymmetry's D_4 matrices. Step 0 points along +y, the
+    direction of an unrotated petal.
+    """
+    angle = np.pi / 2 + 2 * np.pi * np.arange(units) / units
+    vectors = np.stack((np.cos(angle), np.sin(angle)), axis=-1)
+    moved = vectors @ dihedral_stack(4).transpose(0, 2, 1)
+    steps = (np.arctan2(moved[..., 1], moved[..., 0]) - np.pi / 2) * units / (2 * np.pi)
+    return np.mod(np.rint(steps), units).astype(int)
+
+
+def petal_mask(petals, units):
+    """Angle-step bitmask of 'petals' evenly spaced petals, the first at step 0."""
+    return sum(1 << (k * units // petals) for k in range(petals))
+
+
+def _permute_mask(mask, permutation):
+    return sum(1 << int(permutation[a]) for a in range(len(permutation)) if mask >> a & 1)
+
+
+class DesignCatalogue:
+    """
+    Enumerates a DesignSpace depth first, layer options in sorted order and
+    never decreasing, so reordered layers are never generated. A branch is
+    pruned as soon as some layer is redundant (its petals all drawn by
+    same-shape layers, a repeated option included) and dropping it would
+    still leave min_layers: that drawing is enumerated with fewer layers.
+    Redundant designs of at most min_layers layers are kept, since their
+    drawing has no shorter form in the space. Anything equal up to the
+    grid's rotations and mirrors is then dropped by canonical hash.
+    """
+
+    def __init__(self, space=None):
+        self.space = space or DesignSpace()
+        self.options = self.space.layer_options()
+        units = self.space.units
+        shapes = sorted({(o[0], o[1]) for o in self.options})
+        shape_id = {shape: i for i, shape in enumerate(shapes)}
+
+        # Group elements that move some petal set; the rest act trivially
+        perms = [p for p in symmetry_permutations(units)
+                 if any(_permute_mask(petal_mask(n, units), p) != petal_mask(n, units)
+                        for n in self.space.ladder)]
+        self._n_images = 1 + len(perms)
+
+        # Per option: shape id, then (outline, fill) masks under each image
+        self._masks = []
+        for length, width, petals, fill in self.options:
+            outline = petal_mask(petals, units)
+            images = [outline] + [_permute_mask(outline, p) for p in perms]
+            self._masks.append((shape_id[(length, width)],
+                                [(m, m if fill else 0) for m in images]))
+        # First option reaching at least k dots out, per k
+        lengths = np.array([o[0] for o in self.options])
+        self._first = [int(np.searchsorted(lengths, k)) for k in range(self.space.max_layers + 2)]
+
+    def first_layers(self):
+        """Option indices a design can start with (the parallel split)."""
+        return range(self._first[1], len(self.options))
+
+    def designs(self, first=None):
+        """
+        Yields (hash, layers) for every distinct design, layers as
+        (length, width, petals, fill) tuples. 'first': only designs starting
+        with that option index.
+        """
+        seen = set()
+        starts = self.first_layers() if first is None else [first]
+        for j in starts:
+            for key, chosen in self._extend([j], self._add({}, j)):
+                if key not in seen:
+                    seen.add(key)
+                    yield key.hex(), [self.options[i] for i in chosen]
+
+    def _add(self, state, j):
+        """Drawing state with option j added: shape -> [(outline, fill) per image]."""
+        shape, images = self._masks[j]
+        state = dict(state)
+        current = state.get(shape)
+        state[shape] = images if current is None else [
+            (o | co, f | cf) for (o, f), (co, cf) in zip(images, current)]
+        return state
+
+    def _redundant(self, chosen):
+        """True if some chosen layer only draws petals its same-shape layers draw too."""
+        for a, i in enumerate(chosen):
+            shape, ((outline, fill), *_) = self._masks[i]
+            o_rest = f_rest = 0
+            for b, k in enumerate(chosen):
+                if b != a and self._masks[k][0] == shape:
+                    o_rest |= self._masks[k][1][0][0]
+                    f_rest |= self._masks[k][1][0][1]
+            if outline & ~o_rest == 0 and fill & ~f_rest == 0:
+                return True
+        return False
+
+    def _extend(self, chosen, state, redundant=False):
+        depth = len(chosen)
+        if depth >= self.space.min_layers:
+            yield self._key(state), tuple(chosen)
+        if depth == self.space.max_layers:
+            return
+        for j in range(max(chosen[-1], self._first[depth + 1]), len(self.options)):
+            # A redundant layer stays redundant whatever is added after it
+            now = redundant or (self._masks[j][0] in state and self._redundant(chosen + [j]))
+            if now and depth >= self.space.min_layers:
+                continue
+            yield from self._extend(chosen + [j], self._add(state, j), now)
+
+    def _key(self, state):
+        """Hash of the smallest image of the drawing under the symmetry group."""
+        form = min(tuple(sorted((shape, *images[g]) for shape, images in state.items()))
+                   for g in range(self._n_images))
+        return design_hash(form)
+
+
+def design_hash(form):
+    """8-byte digest of a canonical form (tuple of (shape, outline, fill) ints)."""
+    return hashlib.blake2b(repr(form).encode(), digest_size=8).digest()
+
+
+def _catalogue_part(first, space):
+    """Pool task: every design starting with option 'first'."""
+    return list(DesignCatalogue(space).designs(first))
+
+
+def iter_catalogue(space=None, workers=None):
+    """
+    Yields (hash, layers) for the whole design space, split by first layer
+    across a process pool; duplicates between parts are dropped as they
+    arrive.
+    """
+    catalogue = DesignCatalogue(space)
+    task = partial(_catalogue_part, space=catalogue.space)
+    seen = set()
+    with Pool(processes=workers) as pool:
+        for part in pool.imap_unordered(task, catalogue.first_layers()):
+            for key, layers in part:
+                if key not in seen:
+                    seen.add(key)
+                    yield key, layers
+
+
+def catalogue_design(layers, size=11):
+    """Design (core.design) of one catalogue entry."""
+    return HeritageGenerator(size).design_from_layers(layers)
@@ -0,0 +1,120 @@
+import cv2
+import numpy as np
+
+# Predefined Indian cultural palette (RGB)
+CULTURAL_COLORS = {
+    "Kumkum Red": (180, 20, 20),
+    "Turmeric Yellow": (255, 200, 0),
+    "Rice Flour White": (240, 240, 240),
+    "Charcoal Black": (30, 30, 30),
+    "Leaf Green": (34, 139, 34),
+    "Sky Blue": (135, 206, 235),
+    "Magenta": (255, 0, 255),
+    "Saffron": (255, 153, 51),
+    "Mud Brown": (101, 67, 33),
+    "Deep Blue": (0, 50, 150)
+}
+
+# LUT resolution: 32 levels per channel (top 5 bits of each 8-bit value)
+LUT_BITS = 5
+
+
+def rgb_to_lab(rgb):
+    """(N, 3) RGB (0-255) -> (N, 3) float32 CIE Lab."""
+    rgb = np.asarray(rgb, dtype=np.float32).reshape(-1, 1, 3) / 255.0
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2Lab).reshape(-1, 3)
+
+
+class ColorTable:
+    """
+    Named reference colours held as arrays, matched in perceptual (Lab) space.
+    A 32x32x32 RGB -> colour-index lookup table is built on first use so whole
+    images can be labelled with one gather.
+    """
+
+    def __init__(self, colors):
+        if not colors:
+            raise ValueError("A colour table needs at least one colour")
+        self.names = list(colors)
+        self.rgb = np.array([colors[n] for n in self.names], dtype=np.uint8).reshape(-1, 3)
+        self.lab = rgb_to_lab(self.rgb)
+        self._lut = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(self, rgb):
+        """Index of the closest reference colour for each row of an (N, 3) RGB array."""
+        lab = rgb_to_lab(rgb)
+        # |a - b|^2 = |a|^2 - 2ab + |b|^2, without an (N, k, 3) temporary
+        dist = (np.einsum("ij,ij->i", lab, lab)[:, None] - 2 * lab @ self.lab.T
+                + np.einsum("ij,ij->i", self.lab, self.lab)[None, :])
+        return np.argmin(dist, axis=1)
+
+    def name_of(self, rgb):
+        """Names of the closest reference colours for an (N, 3) RGB array."""
+        return [self.names[i] for i in self.nearest(rgb)]
+
+    @property
+    def lut(self):
+        """(32, 32, 32) colour-index table over quantized RGB, built lazily."""
+        if self._lut is None:
+            levels = 1 << LUT_BITS
+            step = 256 // levels
+            centres = np.arange(levels) * step + step // 2
+            r, g, b = np.meshgrid(centres, centres, centres, indexing="ij")
+            grid = np.stack((r, g, b), axis=-1).reshape(-1, 3)
+            dtype = np.uint8 if len(self) <= 255 else np.uint16
+            self._lut = self.nearest(grid).astype(dtype).reshape(levels, levels, levels)
+        return self._lut
+
+    def label_image(self, image_rgb):
+        """Colour index of every pixel of an (h, w, 3) RGB image via the LUT."""
+        shift = 8 - LUT_BITS
+        q = np.right_shift(image_rgb, shift)
+        flat = (q[..., 0].astype(np.intp) << (2 * LUT_BITS)) | \
+               (q[..., 1].astype(np.intp) << LUT_BITS) | q[..., 2]
+        return self.lut.reshape(-1)[flat]
+
+    def coverage(self, image_rgb, mask=None):
+        """
+        Fraction of pixels (optionally only where mask is set) nearest to each
+        named colour, largest first. Colours with no pixels are left out.
+        """
+        labels = self.label_image(image_rgb)
+        if mask is not None:
+            labels = labels[np.asarray(mask) > 0]
+        counts = np.bincount(labels.reshape(-1), minlength=len(self))
+        total = counts.sum()
+        if total == 0:
+            return {}
+        order = np.argsort(-counts, kind="stable")
+        return {self.names[i]: float(counts[i] / total) for i in order if counts[i]}
+
+
+_TABLES = {"cultural": ColorTable(CULTURAL_COLORS)}
+
+
+def register_color_table(name, colors, extends="cultural"):
+    """
+    Registers a regional palette under 'name'. Its colours are added on top of
+    the 'extends' table (pass None to start from an empty table).
+    """
+    merged = {}
+    if extends is not None:
+        base = get_color_table(extends)
+        merged.update(zip(base.names, map(tuple, base.rgb.tolist())))
+    merged.update(colors)
+    _TABLES[name] = ColorTable(merged)
+    return _TABLES[name]
+
+
+def get_color_table(name="cultural"):
+    """Looks up a registered colour table (tables pass through unchanged)."""
+    if isinstance(name, ColorTable):
+        return name
+    try:
+        return _TABLES[name]
+    except KeyError:
+        raise ValueError(f"Unknown colour table '{name}'. "
+                         f"Registered: {', '.join(sorted(_TABLES))}") from None
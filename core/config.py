@@ -0,0 +1,70 @@
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class VisionConfig:
+    """
+    Every tunable setting of the MugguVision pipeline.
+    Defaults reproduce the values the analyzer was tuned with on the bundled
+    assets; areas and distances are in full-resolution pixels.
+    """
+    # Dot (Chukkalu) detection
+    dot_threshold: int = 200           # V-channel cutoff for bright dots
+    dot_kernel: int = 5                # opening kernel size (px)
+    dot_min_area: float = 5.0          # accepted dot area window
+    dot_max_area: float = 2000.0
+
+    # Line skeleton
+    adaptive_block: int = 11           # adaptive threshold neighbourhood (odd, px)
+    adaptive_c: float = 2.0            # adaptive threshold offset
+    close_kernel: int = 3              # gap-bridging closing kernel (px)
+    close_iterations: int = 2
+
+    # Style / palette
+    style_cutoff: float = 12.0         # mean dot-to-line distance separating Puli from Sikku
+    padi_straightness: float = 0.7     # share of near-straight line samples marking Padi
+    curvature_step: int = 8            # arc length (px) headings are measured over
+    background_distance: float = 30.0  # colours this close to the background are ignored
+    palette_size: int = 2
+    colors: str = "cultural"           # registered colour table used for naming
+
+    # Analysis resolution (longest side of the working pyramid level)
+    max_side: Optional[int] = None
+
+    def __post_init__(self):
+        if not 0 <= self.dot_threshold <= 255:
+            raise ValueError(f"dot_threshold must be in 0..255, got {self.dot_threshold}")
+        if self.adaptive_block < 3 or self.adaptive_block % 2 == 0:
+            raise ValueError(f"adaptive_block must be odd and >= 3, got {self.adaptive_block}")
+        for name in ("dot_kernel", "close_kernel"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be >= 1, got {getattr(self, name)}")
+        if self.close_iterations < 0:
+            raise ValueError(f"close_iterations must be >= 0, got {self.close_iterations}")
+        if not 0 <= self.dot_min_area < self.dot_max_area:
+            raise ValueError("dot area window must satisfy 0 <= dot_min_area < dot_max_area")
+        if not 0 <= self.padi_straightness <= 1:
+            raise ValueError(f"padi_straightness must be in 0..1, got {self.padi_straightness}")
+        if self.curvature_step < 1:
+            raise ValueError(f"curvature_step must be >= 1, got {self.curvature_step}")
+        if self.palette_size < 1:
+            raise ValueError(f"palette_size must be >= 1, got {self.palette_size}")
+        if self.max_side is not None and self.max_side < 1:
+            raise ValueError(f"max_side must be positive, got {self.max_side}")
+
+    def replace(self, **changes):
+        """Copy with some fields changed (validated like the constructor)."""
+        return replace(self, **changes) if changes else self
+
+    def as_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values):
+        """Builds a config from a dict, rejecting unknown keys."""
+        known = {f.name for f in fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Unknown VisionConfig fields: {', '.join(sorted(unknown))}")
+        return cls(**values)
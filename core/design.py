@@ -0,0 +1,159 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+# Serialized column order with fixed little-endian dtypes; the shape of each
+# column follows from the layer count L and control point count P
+_COLUMNS = (
+    ("points", "<f4", lambda L, P: (P, 2)),
+    ("offsets", "<i4", lambda L, P: (L + 1,)),
+    ("petals", "<i2", lambda L, P: (L,)),
+    ("fill", "?", lambda L, P: (L,)),
+    ("length", "<f4", lambda L, P: (L,)),
+    ("width", "<f4", lambda L, P: (L,)),
+    ("colors", "u1", lambda L, P: (L, 3)),
+)
+_MAGIC = b"KLMD"
+_FORMAT_VERSION = 1
+# Magic, then int32 version, size, L, P; columns start 8-byte aligned
+_HEADER = 24
+
+
+def _aligned(n):
+    return (n + 7) & ~7
+
+
+@dataclass(eq=False)
+class Design:
+    """
+    A generated design as flat arrays instead of one dict per layer: the
+    control points of every layer in one contiguous (P, 2) float32 array,
+    layer i being points[offsets[i]:offsets[i + 1]], plus one column per
+    layer attribute.
+
+    Iterating yields the familiar layer dicts ('path', 'petals', 'fill',
+    'length', 'width', 'color'), with 'path' a view into 'points'.
+    """
+    size: int
+    points: np.ndarray   # (P, 2) float32 control points, layer after layer
+    offsets: np.ndarray  # (L + 1,) int32
+    petals: np.ndarray   # (L,) int16 radial copies of the layer's petal
+    fill: np.ndarray     # (L,) bool
+    length: np.ndarray   # (L,) float32 petal length, in dots
+    width: np.ndarray    # (L,) float32 petal half-width, in dots
+    colors: np.ndarray   # (L, 3) uint8 RGB per layer
+
+    def __post_init__(self):
+        self.size = int(self.size)
+        # No copy when a column already has the right dtype and layout
+        for name, dtype, _ in _COLUMNS:
+            setattr(self, name, np.ascontiguousarray(getattr(self, name), dtype=dtype))
+
+    @classmethod
+    def from_layers(cls, size, layers, colors=None):
+        """From a list of layer dicts (as HeritageGenerator used to return)."""
+        paths = [np.asarray(layer['path'], dtype=np.float32).reshape(-1, 2) for layer in layers]
+        n = len(layers)
+        design = cls(
+            size=size,
+            points=np.concatenate(paths) if paths else np.zeros((0, 2)),
+            offsets=np.r_[0, np.cumsum([len(p) for p in paths], dtype=np.int64)],
+            petals=[layer['petals'] for layer in layers],
+            fill=[layer['fill'] for layer in layers],
+            length=[layer.get('length', 0) for layer in layers],
+            width=[layer.get('width', 0) for layer in layers],
+            colors=np.zeros((n, 3)),
+        )
+        return design.with_colors(colors) if colors else design
+
+    def __len__(self):
+        return len(self.petals)
+
+    def __iter__(self):
+        return (self.layer(i) for i in range(len(self)))
+
+    def path(self, i):
+        """Control points of layer i, (n, 2) view into 'points'."""
+        return self.points[self.offsets[i]:self.offsets[i + 1]]
+
+    def paths(self):
+        """
+        All layer paths: one (L, n, 2) view when every layer has n control
+        points (the usual case, ready for batched smoothing), otherwise a
+        list of (n_i, 2) views.
+        """
+        counts = np.diff(self.offsets)
+        if len(counts) and (counts == counts[0]).all():
+            return self.points.reshape(len(counts), counts[0], 2)
+        return [self.path(i) for i in range(len(self))]
+
+    def layer(self, i):
+        """Layer i as a dict of plain Python values (JSON-friendly but for 'path')."""
+        return {
+            'path': self.path(i),
+            'petals': int(self.petals[i]),
+            'fill': bool(self.fill[i]),
+            'length': float(self.length[i]),
+            'width': float(self.width[i]),
+            'color': "#{:02X}{:02X}{:02X}".format(*self.colors[i].tolist()),
+        }
+
+    def with_colors(self, palette):
+        """Copy with the '#RRGGBB' palette cycled over the layers."""
+        rgb = np.array([[int(c.lstrip('#')[k:k + 2], 16) for k in (0, 2, 4)] for c in palette])
+        return replace(self, colors=rgb[np.arange(len(self)) % len(rgb)])
+
+    def hex_colors(self):
+        return ["#{:02X}{:02X}{:02X}".format(*rgb) for rgb in self.colors.tolist()]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name, _, _ in _COLUMNS)
+
+    def to_npz(self, file, compressed=False):
+        """Saves every column to an .npz (path or file object)."""
+        save = np.savez_compressed if compressed else np.savez
+        save(file, size=np.int32(self.size), **{name: getattr(self, name) for name, _, _ in _COLUMNS})
+
+    @classmethod
+    def from_npz(cls, file):
+        with np.load(file) as data:
+            return cls(size=int(data["size"]), **{name: data[name] for name, _, _ in _COLUMNS})
+
+    def to_bytes(self):
+        """
+        Flat binary form: a small header, then each column's raw buffer
+        (8-byte aligned). from_bytes maps it back without copying.
+        """
+        L, P = len(self), len(self.points)
+        header = _MAGIC + np.array([_FORMAT_VERSION, self.size, L, P], dtype="<i4").tobytes()
+        chunks = [header.ljust(_HEADER, b"\0")]
+        for name, _, _ in _COLUMNS:
+            raw = getattr(self, name).tobytes()
+            chunks.append(raw.ljust(_aligned(len(raw)), b"\0"))
+        return b"".join(chunks)
+
+    def __reduce__(self):
+        # Pickle (e.g. to pool workers) as the flat binary form
+        return Design.from_bytes, (self.to_bytes(),)
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """
+        Inverse of to_bytes. The columns are read-only views into 'buffer'
+        (bytes, bytearray, memoryview, mmap), so nothing is copied.
+        """
+        buffer = memoryview(buffer)
+        if bytes(buffer[:4]) != _MAGIC:
+            raise ValueError("not a serialized Design")
+        version, size, L, P = np.frombuffer(buffer, dtype="<i4", count=4, offset=4).tolist()
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported Design format version {version}")
+        columns, offset = {}, _HEADER
+        for name, dtype, shape in _COLUMNS:
+            shape = shape(L, P)
+            count = int(np.prod(shape))
+            columns[name] = (np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+                             if count else np.zeros(0, dtype=dtype)).reshape(shape)
+            offset += _aligned(count * np.dtype(dtype).itemsize)
+        return cls(size=size, **columns)
@@ -0,0 +1,102 @@
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Turning-angle histogram edges (degrees) for curvature_histogram
+CURVATURE_BINS = (0, 15, 45, 75, 105, 180)
+# Dots per batch in nearest_pixel_distance, bounding the (dots x window) gather
+_DOT_BATCH = 2048
+
+
+@lru_cache(maxsize=8)
+def _disc_offsets(radius):
+    """(dy, dx) offsets within 'radius', nearest first, and their lengths."""
+    r = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(r, r, indexing="ij")
+    dist = np.hypot(dy, dx).ravel()
+    order = np.argsort(dist, kind="stable")
+    order = order[dist[order] <= radius]
+    return dy.ravel()[order], dx.ravel()[order], dist[order]
+
+
+def nearest_pixel_distance(mask, xs, ys, radius=24):
+    """
+    Euclidean distance from each (xs[i], ys[i]) to the nearest non-zero pixel
+    of 'mask', without a full-image distance transform.
+
+    Each point scans a disc of 'radius' pixels ordered nearest first, so one
+    gather plus argmax per point finds the closest pixel. Points with nothing
+    inside their disc fall back to a KD-tree over all mask pixels. Returns inf
+    everywhere when the mask is empty.
+    """
+    xs = np.asarray(xs, dtype=np.intp)
+    ys = np.asarray(ys, dtype=np.intp)
+    h, w = mask.shape
+    dy, dx, dist = _disc_offsets(int(radius))
+    out = np.full(len(xs), np.inf)
+
+    for start in range(0, len(xs), _DOT_BATCH):
+        bx, by = xs[start:start + _DOT_BATCH], ys[start:start + _DOT_BATCH]
+        yy = by[:, None] + dy
+        xx = bx[:, None] + dx
+        inside = (yy >= 0) & (yy < h) & (xx >= 0) & (xx < w)
+        hit = np.zeros(yy.shape, dtype=bool)
+        hit[inside] = mask[yy[inside], xx[inside]] > 0
+        found = hit.any(axis=1)
+        out[start:start + _DOT_BATCH][found] = dist[hit[found].argmax(axis=1)]
+
+    missing = np.flatnonzero(np.isinf(out))
+    if len(missing):
+        my, mx = np.nonzero(mask)
+        if len(mx):
+            tree = cKDTree(np.column_stack((mx, my)))
+            out[missing] = tree.query(np.column_stack((xs[missing], ys[missing])))[0]
+    return out
+
+
+def lattice_spacing(points):
+    """
+    Median nearest-neighbour distance of a point set and its coefficient of
+    variation (0 for a perfectly regular lattice). (0, 0) for fewer than 2 points.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 2:
+        return 0.0, 0.0
+    nn = cKDTree(points).query(points, k=2)[0][:, 1]
+    median = float(np.median(nn))
+    cv = float(np.std(nn) / median) if median > 0 else 0.0
+    return median, cv
+
+
+def curvature_histogram(skeleton, step=8, bins=CURVATURE_BINS):
+    """
+    Histogram of turning angles along the skeleton's traced contours.
+
+    The heading is measured over 'step' pixels (long enough to average out
+    the pixel staircase) and the turn is the change of heading over the next
+    'step' pixels. Returns (fractions per bin, number of samples).
+    """
+    contours, _ = cv2.findContours((np.asarray(skeleton) > 0).astype(np.uint8),
+                                   cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+    contours = [c for c in contours if len(c) > 2 * step]
+    if not contours:
+        return np.zeros(len(bins) - 1), 0
+
+    lengths = np.array([len(c) for c in contours])
+    pts = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+    cid = np.repeat(np.arange(len(contours)), lengths)
+
+    # Heading from point i to i + step, valid inside one contour
+    i = np.arange(len(pts) - step)
+    vec = pts[i + step] - pts[i]
+    heading = np.arctan2(vec[:, 1], vec[:, 0])
+
+    # Turn between consecutive headings, step apart, spanning one contour
+    j = np.arange(len(heading) - step)
+    same = cid[j] == cid[j + 2 * step]
+    turn = np.abs(np.angle(np.exp(1j * (heading[j + step] - heading[j]))))[same]
+    counts, _ = np.histogram(np.degrees(turn), bins=bins)
+    total = counts.sum()
+    return (counts / total if total else counts.astype(np.float64)), int(total)
@@ -1,31 +1,61 @@
+from functools import lru_cache
 import numpy as np
 from scipy.interpolate import CubicSpline
 import random
 
+from core.design import Design
+
+
+@lru_cache(maxsize=32)
+def spline_basis(n_points, points_per_segment=20, bc_type='clamped'):
+    """
+    (n_points * points_per_segment, n_points) matrix B with B @ path equal to
+    the cubic spline through 'path' (uniform parameter) sampled like
+    CurveGenerator.smooth_path. A spline is linear in its control points, so
+    B is the spline fitted to the identity, built once per combination.
+    """
+    t = np.linspace(0, 1, n_points)
+    t_new = np.linspace(0, 1, n_points * points_per_segment)
+    basis = CubicSpline(t, np.eye(n_points), bc_type=bc_type, axis=0)(t_new)
+    basis.setflags(write=False)
+    return basis
+
+
 class CurveGenerator:
     @staticmethod
-    def smooth_path(path, points_per_segment=20):
-        path = np.array(path)
-        if len(path) < 3: return path
-        t = np.linspace(0, 1, len(path))
-        t_new = np.linspace(0, 1, len(path) * points_per_segment)
-        cs_x = CubicSpline(t, path[:, 0], bc_type='clamped')
-        cs_y = CubicSpline(t, path[:, 1], bc_type='clamped')
-        return np.vstack((cs_x(t_new), cs_y(t_new))).T
+    def smooth_path(path, points_per_segment=20, bc_type='clamped'):
+        """
+        Smooths a (n, 2) path, or a batch of equally long paths (batch, n, 2),
+        with a clamped cubic spline: one product with the cached basis.
+        """
+        path = np.asarray(path, dtype=np.float64)
+        if path.shape[-2] < 3: return path
+        return spline_basis(path.shape[-2], points_per_segment, bc_type) @ path
 
-import random
 
 class HeritageGenerator:
-    def __init__(self, size):
+    def __init__(self, size, seed=None, rng=None):
+        """
+        seed / rng: the same seed (or a random.Random in the same state)
+        reproduces the same sequence of designs. Without either, designs
+        come from a fresh, unseeded generator.
+        """
         self.size = size
         self.center = size // 2
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
 
     def get_varied_petal_layers(self):
-        """Generates random layers that are strictly anchored to the dot grid."""
+        """
+        Generates random layers that are strictly anchored to the dot grid,
+        as a Design (array columns; iterating it yields one dict per layer).
+        """
         layers = []
         # We'll generate 2 to 4 layers
-        num_layers = random.randint(2, 4)
-        
+        num_layers = self.rng.randint(2, 4)
+        # Higher index layers get more petals for the 'blooming' effect
+        petal_counts = [4, 8, 12, 16]
+
         for i in range(num_layers):
             # DESIGN PRINCIPLE: 
             # Step must be 1.0 to align with square grid or 0.5 for staggered.
@@ -35,19 +65,28 @@ class HeritageGenerator:
             min_dist = i + 1
             max_dist = self.center
             
-            length = random.randint(min_dist, max_dist)
-            width = random.uniform(0.5, length * 0.5) 
-            
-            # Higher index layers get more petals for the 'blooming' effect
-            petal_counts = [4, 8, 12, 16]
-            
-            layers.append({
-                'path': self._make_petal(self.center, self.center, length, width),
-                'petals': petal_counts[i] if i < len(petal_counts) else 16,
-                'fill': random.choice([True, False])
-            })
-            
-        return layers
+            length = self.rng.randint(min_dist, max_dist)
+            width = self.rng.uniform(0.5, length * 0.5) 
+            petals = petal_counts[i] if i < len(petal_counts) else 16
+            layers.append((length, width, petals, self.rng.choice([True, False])))
+
+        return self.design_from_layers(layers)
+
+    def design_from_layers(self, layers):
+        """Design from (length, width, petals, fill) tuples, one per layer."""
+        paths = [self._make_petal(self.center, self.center, length, width)
+                 for length, width, _, _ in layers]
+        points = np.array(paths, dtype=np.float32).reshape(-1, 2)
+        return Design(
+            size=self.size,
+            points=points,
+            offsets=np.arange(len(layers) + 1) * (len(paths[0]) if paths else 0),
+            petals=[layer[2] for layer in layers],
+            fill=[layer[3] for layer in layers],
+            length=[layer[0] for layer in layers],
+            width=[layer[1] for layer in layers],
+            colors=np.zeros((len(layers), 3)),
+        )
 
     def _make_petal(self, x, y, length, width):
         # Anchor points: (Center) -> (Curve Out) -> (Tip on Dot) -> (Curve In) -> (Center)
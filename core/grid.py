@@ -1,11 +1,90 @@
 import numpy as np
+from scipy.spatial import cKDTree
+
+LATTICE_KINDS = ("square", "staggered", "diamond", "hex")
+
+
+# Lattice bonds as (row, half-column) steps, in increasing dot-index order
+_SQUARE_BONDS = ((-1, 0), (0, -2), (0, 2), (1, 0))
+_STAGGERED_BONDS = ((-1, -1), (-1, 1), (0, -2), (0, 2), (1, -1), (1, 1))
+
+
+class DotGrid:
+    """
+    The dots of one lattice as an (N, 2) float32 array, row by row, with a
+    CSR index of the lattice bonds (4 per dot on square and diamond grids, 6
+    on staggered and hex grids) and a KD-tree for radius queries, both built
+    on first use.
+    """
+
+    def __init__(self, kind, points, cells, bonds):
+        self.kind = kind
+        self.points = points   # (N, 2) float32 (x, y)
+        self.cells = cells     # (N, 2) int32 (row, x in half spacings)
+        self._bonds = bonds
+        self._tree = None
+        self._csr = None
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def rows(self):
+        return self.cells[:, 0]
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = cKDTree(self.points)
+        return self._tree
+
+    @property
+    def neighbors(self):
+        """
+        (indptr, indices) CSR adjacency: the neighbours of dot i are
+        indices[indptr[i]:indptr[i + 1]], sorted. Looked up through a dense
+        (row, half-column) index map, one shift per bond, without a search.
+        """
+        if self._csr is None:
+            row, col = self.cells[:, 0], self.cells[:, 1]
+            index = np.full((row.max() + 3, col.max() + 5), -1, dtype=np.int32)
+            # Pad the map by one row / two half-columns on each side so
+            # every shifted lookup stays in bounds
+            index[row + 1, col + 2] = np.arange(len(self), dtype=np.int32)
+            nbr = np.stack([index[row + 1 + dr, col + 2 + dc] for dr, dc in self._bonds], axis=1)
+            valid = nbr >= 0
+            indptr = np.zeros(len(self) + 1, dtype=np.int64)
+            np.cumsum(valid.sum(axis=1), out=indptr[1:])
+            self._csr = (indptr, nbr[valid])
+        return self._csr
+
+    def neighbors_of(self, i):
+        indptr, indices = self.neighbors
+        return indices[indptr[i]:indptr[i + 1]]
+
+    def within(self, point, r):
+        """Indices of the dots within distance r of 'point', sorted."""
+        return np.asarray(self.tree.query_ball_point(point, r, return_sorted=True), dtype=np.intp)
+
 
 class KolamEngine:
-    def __init__(self, size=5, spacing=1):
+    def __init__(self, size=5, spacing=1, kind="square", row_spacing=None):
+        """
+        kind: default lattice for grid() (one of LATTICE_KINDS).
+        row_spacing: distance between staggered rows (default: spacing).
+        """
+        if kind not in LATTICE_KINDS:
+            raise ValueError(f"unknown lattice kind {kind!r}, expected one of {LATTICE_KINDS}")
         self.size = size
         self.spacing = spacing
-        # Default square grid
-        self.dots = self._generate_square_grid()
+        self.kind = kind
+        self.row_spacing = spacing if row_spacing is None else row_spacing
+        self._grids = {}
+
+    @property
+    def dots(self):
+        # Default square grid, as meshgrids
+        return self._generate_square_grid()
 
     def _generate_square_grid(self):
         x = np.linspace(0, (self.size - 1) * self.spacing, self.size)
@@ -18,12 +97,63 @@ class KolamEngine:
         Implements the 'Idai Pulli' (Triangular/Hexagonal) grid.
         This places dots in the gaps of the previous row.
         """
-        x_coords = []
-        y_coords = []
-        for r in range(self.size):
-            # Every other row is shifted by half the spacing
-            offset = (self.spacing / 2) if r % 2 != 0 else 0
-            for c in range(self.size):
-                x_coords.append(c * self.spacing + offset)
-                y_coords.append(r * self.spacing)
-        return np.array(x_coords), np.array(y_coords)
\ No newline at end of file
+        points = self.grid("staggered").points
+        return points[:, 0], points[:, 1]
+
+    def grid(self, kind=None, counts=None):
+        """
+        DotGrid of the given lattice kind (default: the engine's), cached:
+        - square: size x size dots,
+        - staggered: square rows with every other row shifted by half a
+          spacing (Idai Pulli), rows 'row_spacing' apart,
+        - diamond: centred rows of 'counts' dots, by default 1, 3, 5, ...
+          up to 'size' and back (size 6 gives dot.py's 1-3-5-5-3-1),
+        - hex: staggered rows sqrt(3)/2 spacing apart, so every dot has six
+          neighbours at the same distance.
+        """
+        kind = kind or self.kind
+        key = (kind, None if counts is None else tuple(counts))
+        if key not in self._grids:
+            if kind not in LATTICE_KINDS:
+                raise ValueError(f"unknown lattice kind {kind!r}, expected one of {LATTICE_KINDS}")
+            s, n = self.spacing, self.size
+            if kind == "square":
+                grid = DotGrid(kind, *_row_lattice(n, n, s, s, 0), _SQUARE_BONDS)
+            elif kind == "staggered":
+                grid = DotGrid(kind, *_row_lattice(n, n, s, self.row_spacing, 1), _STAGGERED_BONDS)
+            elif kind == "hex":
+                grid = DotGrid(kind, *_row_lattice(n, n, s, s * np.sqrt(3) / 2, 1), _STAGGERED_BONDS)
+            else:
+                if counts is None:
+                    counts = [2 * min(r, n - 1 - r) + 1 for r in range(n)]
+                grid = DotGrid(kind, *_diamond_lattice(counts, s), _SQUARE_BONDS)
+            self._grids[key] = grid
+        return self._grids[key]
+
+
+def _row_lattice(n_rows, n_cols, spacing, row_spacing, shift):
+    """Rows of n_cols dots; odd rows shifted by 'shift' half spacings."""
+    cells = np.empty((n_rows * n_cols, 2), dtype=np.int32)
+    cells[:, 0] = np.repeat(np.arange(n_rows, dtype=np.int32), n_cols)
+    cells[:, 1] = np.tile(np.arange(0, 2 * n_cols, 2, dtype=np.int32), n_rows)
+    cells[:, 1] += shift * (cells[:, 0] % 2)
+    points = np.empty(cells.shape, dtype=np.float32)
+    points[:, 0] = cells[:, 1] * (spacing / 2)
+    points[:, 1] = cells[:, 0] * row_spacing
+    return points, cells
+
+
+def _diamond_lattice(counts, spacing):
+    """Row r holds counts[r] dots, every row centred on the widest one."""
+    counts = np.asarray(counts, dtype=np.int32)
+    rows = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    starts = np.cumsum(counts) - counts
+    index = np.arange(len(rows), dtype=np.int32) - starts[rows]
+    cells = np.empty((len(rows), 2), dtype=np.int32)
+    cells[:, 0] = rows
+    # Half spacings from the left edge of the widest row
+    cells[:, 1] = counts.max() - counts[rows] + 2 * index
+    points = np.empty(cells.shape, dtype=np.float32)
+    points[:, 0] = cells[:, 1] * (spacing / 2)
+    points[:, 1] = rows * spacing
+    return points, cells
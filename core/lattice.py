@@ -0,0 +1,348 @@
+import itertools
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError, cKDTree
+
+from core.grid import KolamEngine
+
+# A dot further than this share of the dot spacing (the distance between the
+# closest sites) from its lattice site is spurious
+SNAP_TOLERANCE = 0.3
+
+
+@dataclass
+class Lattice:
+    """
+    Dot grid recovered from detected Chukkalu.
+
+    Lattice site (row, col) sits at origin + col * pitch * u + row * row_spacing * v,
+    where u is the row direction (rotated by 'rotation' degrees from the image
+    x axis) and v is perpendicular to it; staggered grids shift odd rows by
+    half a pitch along u, like KolamEngine.generate_staggered_grid.
+    """
+    kind: str                      # "square" or "staggered"
+    pitch: float                   # dot spacing along a row (px)
+    row_spacing: float             # distance between rows (px)
+    rotation: float                # row direction, degrees from the image x axis
+    origin: np.ndarray             # (x, y) image position of site (0, 0)
+    rows: int
+    cols: int
+    indices: np.ndarray            # (N, 2) int (row, col) per input dot, -1 when spurious
+    spurious: np.ndarray           # input dot indices that do not sit on a site
+    missing: np.ndarray            # (M, 2) int (row, col) of empty sites inside the grid
+    residual: float                # RMS distance of inliers from their sites (px)
+    _axes: np.ndarray = field(default=None, repr=False)
+
+    def positions(self, indices):
+        """Image (x, y) of lattice sites given as (K, 2) (row, col) indices."""
+        indices = np.asarray(indices, dtype=np.float64).reshape(-1, 2)
+        row, col = indices[:, 0], indices[:, 1]
+        if self.kind == "staggered":
+            col = col + 0.5 * (np.mod(row, 2) == 1)
+        local = np.column_stack((col * self.pitch, row * self.row_spacing))
+        return self.origin + local @ self._axes
+
+    @property
+    def missing_points(self):
+        """Image (x, y) of the missing sites."""
+        return self.positions(self.missing)
+
+    def cell_of(self, points):
+        """
+        (row, col) of the lattice cell (the square whose top-left corner is a
+        site) holding each image point, so later stages can work per cell.
+        """
+        local = (np.asarray(points, dtype=np.float64).reshape(-1, 2) - self.origin) @ self._axes.T
+        row = np.floor(local[:, 1] / self.row_spacing).astype(int)
+        shift = 0.5 * (np.mod(row, 2) == 1) if self.kind == "staggered" else 0.0
+        col = np.floor(local[:, 0] / self.pitch - shift).astype(int)
+        return np.column_stack((row, col))
+
+    def describe(self):
+        """KolamEngine-compatible grid description (JSON-friendly)."""
+        return {
+            "kind": self.kind,
+            "size": max(self.rows, self.cols),
+            "rows": self.rows,
+            "cols": self.cols,
+            "spacing": round(self.pitch, 3),
+            "row_spacing": round(self.row_spacing, 3),
+            "rotation": round(self.rotation, 3),
+            "origin": [round(float(v), 3) for v in self.origin],
+            "dots": int(np.count_nonzero(self.indices[:, 0] >= 0)),
+            "missing": len(self.missing),
+            "spurious": len(self.spurious),
+            "residual": round(self.residual, 3),
+        }
+
+    def to_engine(self):
+        """KolamEngine producing the same grid in lattice units (pitch 'spacing')."""
+        return KolamEngine(size=max(self.rows, self.cols), spacing=self.pitch, kind=self.kind,
+                           row_spacing=self.row_spacing)
+
+
+def fit_lattice(dots, tolerance=SNAP_TOLERANCE):
+    """
+    Fits a square or staggered lattice to (N, 2+) dot centroids by voting on
+    neighbour vectors. Returns None for fewer than 3 dots.
+
+    1. Basis: the densest clusters of vectors between near neighbours, one
+       per direction (two on square grids, three on hex-spaced staggered
+       ones), each pair reduced to the shortest basis it spans.
+    2. Readings: a basis of perpendicular vectors is a square grid; a
+       staggered one runs along any of a, b, a + b, a - b that the other
+       basis vector crosses at half its length. Rows and diagonals are voted
+       on separately, so hex spacing does not blur the row direction.
+    3. Each reading snaps every dot to its site (far or duplicate dots are
+       spurious), refits the spacings on the inliers by least squares and
+       snaps again; empty sites inside the inliers' hull are missing.
+    4. Score: dots snapped less spurious dots less sites missing. Half the
+       true pitch snaps every dot too but leaves most sites empty; every
+       other row leaves half the dots spurious. Of the readings close to
+       the best score the tightest fit picks the lattice, then its readings
+       with the shortest pitch, square first, rows nearest the image x axis
+       first (a hex grid reads the same along three directions).
+    """
+    pts = np.asarray(dots, dtype=np.float64)
+    pts = pts.reshape(len(pts), -1)[:, :2] if len(pts) else pts.reshape(0, 2)
+    if len(pts) < 3:
+        return None
+
+    fits = [_snap(pts, kind, u, row_spacing, tolerance)
+            for kind, u, row_spacing in _readings(pts)]
+    fits = [fit for fit in fits if fit is not None]
+    if not fits:
+        return None
+    score = [np.count_nonzero(fit.indices[:, 0] >= 0) - len(fit.spurious) - len(fit.missing)
+             for fit in fits]
+    fits = [fit for fit, s in zip(fits, score) if s >= max(score) - 0.2 * len(pts)]
+    # A slightly skewed lattice also snaps near-hex grids, maybe a stray dot
+    # more; the diagonals of a square grid read it as staggered at 1.41x
+    tightest = min(fits, key=lambda fit: fit.residual)
+    fits = [fit for fit in fits if _same_sites(fit, tightest)]
+    short = min(fit.pitch for fit in fits)
+    fits = [fit for fit in fits if fit.pitch <= 1.1 * short]
+    low = min(fit.residual for fit in fits)
+    return next(fit for fit in fits if fit.residual <= 1.1 * low + 0.005 * fit.pitch)
+
+
+def _site_coords(lattice):
+    """Per-dot (x, y) site coordinates in a basis of the lattice's own sites."""
+    row, col = lattice.indices[:, 0], lattice.indices[:, 1]
+    if lattice.kind == "staggered":
+        col = col - row // 2
+    return np.column_stack((col, row))
+
+
+def _same_sites(one, other):
+    """
+    Whether two readings index the dots they both snap as one lattice: the
+    site coordinates of one are a whole-number invertible affine map of
+    the other's.
+    """
+    both = (one.indices[:, 0] >= 0) & (other.indices[:, 0] >= 0)
+    a, b = _site_coords(one)[both], _site_coords(other)[both]
+    design = np.column_stack((a, np.ones(len(a))))
+    mapping, _, rank, _ = np.linalg.lstsq(design, b, rcond=None)
+    if rank < 3:
+        return one is other
+    whole = np.rint(mapping)
+    return bool(np.all(design @ whole == b) and abs(_cross(whole[0], whole[1])) == 1)
+
+
+def _readings(pts):
+    """
+    (kind, row vector, row spacing) lattice models suggested by the dominant
+    neighbour vectors of 'pts': square readings first, each kind with rows
+    nearest the image x axis first.
+    """
+    # The neighbours of a few hundred dots vote as clearly as all of them
+    sample = pts[::-(-len(pts) // 256)]
+    dist, nn = cKDTree(pts).query(sample, k=min(9, len(pts)))
+    pitch = float(np.median(dist[:, 1]))
+    if pitch <= 0:
+        return []
+    vec = (pts[nn[:, 1:]] - sample[:, None]).reshape(-1, 2)
+    length = np.hypot(vec[:, 0], vec[:, 1])
+    vec = vec[(length > 0.5 * pitch) & (length < 2.5 * pitch)]
+    if not len(vec):
+        return []
+    peaks = _peaks(vec, 0.15 * pitch)
+    if len(peaks) == 1:
+        # One line of dots: read it as a row of a square grid
+        peaks.append(np.array([-peaks[0][1], peaks[0][0]]))
+
+    square, staggered = [], []
+    for p, q in itertools.combinations(peaks, 2):
+        if abs(_cross(p, q)) < 0.2 * np.hypot(*p) * np.hypot(*q):
+            continue
+        a, b = _reduce(p, q)
+        area = abs(_cross(a, b))
+        la, lb = np.hypot(*a), np.hypot(*b)
+        if abs(a @ b) < 0.15 * la * lb:
+            # Rows along the basis vector nearer the image x axis
+            u = a if abs(a[0]) / la >= abs(b[0]) / lb else b
+            _add_reading(square, "square", u, area)
+        for u in (a, b, a + b, a - b):
+            for w in (a, b):
+                if abs(abs(w @ u) / (u @ u) - 0.5) < 0.05:
+                    _add_reading(staggered, "staggered", u, area)
+    level = lambda reading: abs(reading[1][1]) / np.hypot(*reading[1])
+    return sorted(square, key=level) + sorted(staggered, key=level)
+
+
+def _peaks(vec, radius, count=4):
+    """
+    Means of the densest clusters of 'vec' (within 'radius'), at most one
+    per direction, densest first.
+    """
+    tree = cKDTree(vec)
+    density = tree.query_ball_point(vec, radius, return_length=True)
+    length = np.hypot(vec[:, 0], vec[:, 1])
+    live = density >= 0.2 * density.max()
+    peaks = []
+    while live.any() and len(peaks) < count:
+        i = np.flatnonzero(live)[density[live].argmax()]
+        peak = vec[tree.query_ball_point(vec[i], radius)].mean(axis=0)
+        peaks.append(peak)
+        live &= np.abs(vec @ [peak[1], -peak[0]]) >= 0.2 * length * np.hypot(*peak)
+    return peaks
+
+
+def _reduce(a, b):
+    """Shortest basis (|a| <= |b|) of the lattice spanned by non-parallel a and b."""
+    if a @ a > b @ b:
+        a, b = b, a
+    while True:
+        b = b - np.rint((a @ b) / (a @ a)) * a
+        if b @ b >= a @ a:
+            return a, b
+        a, b = b, a
+
+
+def _cross(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+
+def _axes(theta):
+    """Rows of the unit row direction u and its perpendicular v."""
+    return np.array([[np.cos(theta), np.sin(theta)], [-np.sin(theta), np.cos(theta)]])
+
+
+def _add_reading(readings, kind, u, area):
+    """Appends (kind, u, row spacing), u pointing right, unless already there."""
+    if u[0] < 0 or (u[0] == 0 and u[1] < 0):
+        u = -u
+    pitch = np.hypot(*u)
+    if not any(np.hypot(*(u - v)) < 0.05 * pitch for _, v, _ in readings):
+        readings.append((kind, u, area / pitch))
+
+
+def _snap(pts, kind, u, row_spacing, tolerance):
+    """
+    Lattice of 'kind' with rows along 'u' fitted to 'pts': phases from the
+    rotated coordinates, then snap, reject far and duplicate dots, refit the
+    rotation and spacings on the inliers by least squares and snap once more
+    with the refined model. None when fewer than 3 dots snap.
+    """
+    pitch = float(np.hypot(*u))
+    theta = np.arctan2(u[1], u[0])
+    axes = _axes(theta)
+    local = pts @ axes.T
+    y0 = _phase_origin(local[:, 1], row_spacing)
+    row = np.rint((local[:, 1] - y0) / row_spacing).astype(int)
+    offset = 0.5 * (np.mod(row, 2) == 1) if kind == "staggered" else 0.0
+    x0 = _phase_origin(local[:, 0] - offset * pitch, pitch)
+
+    for _ in range(2):
+        row = np.rint((local[:, 1] - y0) / row_spacing).astype(int)
+        offset = 0.5 * (np.mod(row, 2) == 1) if kind == "staggered" else 0.0
+        col = np.rint((local[:, 0] - x0) / pitch - offset).astype(int)
+        site = np.column_stack(((col + offset) * pitch + x0, row * row_spacing + y0))
+        residual = np.hypot(*(local - site).T)
+        # Tolerance against the closest sites, whichever way the grid is read
+        nearest = min(pitch, row_spacing if kind == "square" else np.hypot(pitch / 2, row_spacing))
+        inlier = (residual <= tolerance * nearest) & _first_per_site(row, col, residual)
+        if inlier.sum() < 3:
+            return None
+        u = (col + offset)[inlier]
+        design = np.column_stack((u, row[inlier], np.ones(len(u))))
+        (step, down, _), _, rank, _ = np.linalg.lstsq(design, pts[inlier], rcond=None)
+        if rank == 3:
+            # Rotation from the least-squares column and row steps, each
+            # weighted by the span it was measured over
+            along = (step / np.hypot(*step) * np.ptp(u)
+                     + np.array([down[1], -down[0]]) / np.hypot(*down) * np.ptp(row[inlier]))
+            theta = np.arctan2(along[1], along[0])
+            axes = _axes(theta)
+            local = pts @ axes.T
+        if np.ptp(u) > 0:
+            pitch, x0 = np.polyfit(u, local[inlier, 0], 1)
+        if np.ptp(row[inlier]) > 0:
+            row_spacing, y0 = np.polyfit(row[inlier], local[inlier, 1], 1)
+    site = np.column_stack(((col + offset) * pitch + x0, row * row_spacing + y0))
+    residual = np.hypot(*(local - site).T)
+
+    # Index (0, 0) at the top-left inlier row/column. A staggered grid whose
+    # top row is a shifted one moves the half-pitch shift to the other rows.
+    r0 = row[inlier].min()
+    if kind == "staggered" and r0 % 2:
+        x0 += 0.5 * pitch
+        col = col + np.mod(row, 2) - 1
+    c0 = col[inlier].min()
+    row, col = row - r0, col - c0
+    origin_local = np.array([x0 + c0 * pitch, y0 + r0 * row_spacing])
+
+    indices = np.where(inlier[:, None], np.column_stack((row, col)), -1)
+    rows = int(row[inlier].max()) + 1
+    cols = int(col[inlier].max()) + 1
+    occupied = np.zeros((rows, cols), dtype=bool)
+    occupied[row[inlier], col[inlier]] = True
+
+    lattice = Lattice(
+        kind=kind, pitch=float(pitch), row_spacing=float(row_spacing),
+        rotation=float(np.degrees(theta)),
+        origin=origin_local @ axes,
+        rows=rows, cols=cols, indices=indices,
+        spurious=np.flatnonzero(~inlier),
+        missing=np.zeros((0, 2), dtype=int),
+        residual=float(np.sqrt(np.mean(residual[inlier] ** 2))),
+        _axes=axes,
+    )
+    lattice.missing = _missing_sites(lattice, occupied, row[inlier], col[inlier])
+    return lattice
+
+
+def _first_per_site(row, col, residual):
+    """Mask keeping only the closest dot on each (row, col) site."""
+    order = np.lexsort((residual, col, row))
+    keys = np.column_stack((row, col))[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+    keep = np.zeros(len(row), dtype=bool)
+    keep[order[first]] = True
+    return keep
+
+
+def _phase_origin(values, spacing):
+    """Offset of a 1-D lattice with 'spacing' that best fits 'values'."""
+    phase = np.angle(np.mean(np.exp(2j * np.pi * values / spacing)))
+    return phase / (2 * np.pi) * spacing
+
+
+def _missing_sites(lattice, occupied, rows, cols):
+    """Empty sites inside the convex hull of the occupied ones (in index space)."""
+    empty = np.argwhere(~occupied)
+    if not len(empty):
+        return empty
+    occupied_xy = lattice.positions(np.column_stack((rows, cols)))
+    try:
+        hull = ConvexHull(occupied_xy)
+    except (QhullError, ValueError):
+        # Collinear dots: only gaps along the line count
+        return empty if lattice.rows == 1 or lattice.cols == 1 else empty[:0]
+    # Inside every hull edge's half-plane, sites on an edge included
+    normal, offset = hull.equations[:, :2], hull.equations[:, 2]
+    inside = np.all(lattice.positions(empty) @ normal.T + offset <= 1e-6 * lattice.pitch, axis=1)
+    return empty[inside]
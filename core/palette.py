@@ -0,0 +1,74 @@
+import numpy as np
+
+# Histogram resolution: 32 levels per channel
+HIST_BITS = 5
+
+
+def color_histogram(pixels, bits=HIST_BITS):
+    """
+    Quantizes (N, 3) uint8 colours into a 3-D histogram.
+    Returns the mean colour of every occupied bin (float32 (M, 3)) and the
+    number of pixels in it (float64 (M,)).
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    q = np.right_shift(pixels, 8 - bits).astype(np.intp)
+    bins = (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+
+    size = 1 << (3 * bits)
+    counts = np.bincount(bins, minlength=size)
+    occupied = np.flatnonzero(counts)
+    weights = counts[occupied].astype(np.float64)
+    means = np.empty((len(occupied), 3), dtype=np.float32)
+    for c in range(3):
+        sums = np.bincount(bins, weights=pixels[:, c], minlength=size)
+        means[:, c] = sums[occupied] / weights
+    return means, weights
+
+
+def weighted_kmeans(points, weights, k, seed=0, max_iter=30, tol=0.5):
+    """
+    Weighted k-means with k-means++ seeding from a fixed RNG seed, so the same
+    input always gives the same centres. Returns (centers (k, 3), cluster
+    weights (k,) as fractions of the total), heaviest cluster first.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    k = min(k, len(points))
+    if k == 0:
+        return np.zeros((0, points.shape[1])), np.zeros(0)
+
+    rng = np.random.default_rng(seed)
+
+    # 1. k-means++: first centre by weight, then proportional to weight * D^2
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.choice(len(points), p=weights / weights.sum())]
+    closest = np.sum((points - centers[0]) ** 2, axis=1)
+    for i in range(1, k):
+        score = weights * closest
+        total = score.sum()
+        if total <= 0:
+            # Fewer distinct colours than clusters; reuse the heaviest point
+            centers[i:] = centers[0]
+            break
+        centers[i] = points[rng.choice(len(points), p=score / total)]
+        closest = np.minimum(closest, np.sum((points - centers[i]) ** 2, axis=1))
+
+    # 2. Lloyd iterations over the histogram bins
+    for _ in range(max_iter):
+        dist = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = np.argmin(dist, axis=1)
+        mass = np.bincount(labels, weights=weights, minlength=k)
+        moved = centers.copy()
+        for c in range(points.shape[1]):
+            sums = np.bincount(labels, weights=weights * points[:, c], minlength=k)
+            nonempty = mass > 0
+            moved[nonempty, c] = sums[nonempty] / mass[nonempty]
+        shift = np.max(np.abs(moved - centers))
+        centers = moved
+        if shift < tol:
+            break
+
+    dist = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+    mass = np.bincount(np.argmin(dist, axis=1), weights=weights, minlength=k)
+    order = np.argsort(-mass, kind="stable")
+    return centers[order], mass[order] / mass.sum()
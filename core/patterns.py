@@ -0,0 +1,157 @@
+"""
+Kolam drawings as data: dots, straight strokes and circular arcs, evaluated
+with numpy instead of being walked with turtle graphics.
+
+A Pattern keeps its primitives in drawing order (dots, then segments, then
+arcs) plus one affine matrix; rotating or scaling a pattern only composes
+that matrix, and geometry() pushes every point through it in a single
+matrix product. core.render turns patterns into images, SVG and
+animations without a display.
+"""
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from core.grid import KolamEngine
+
+
+@dataclass
+class Pattern:
+    """
+    Primitives in turtle-style coordinates (origin in the middle, y up).
+    Arcs run counter-clockwise from 'start' degrees (direction from the
+    centre to the first point) over 'extent' degrees; 360 is a circle.
+    """
+    dots: np.ndarray               # (N, 2) dot centres
+    segments: np.ndarray           # (M, 2, 2) straight strokes, start and end point
+    arcs: np.ndarray               # (K, 5) centre x, centre y, radius, start, extent
+    dot_size: float = 6.0          # dot diameter
+    width: float = 3.0             # stroke width
+    color: str = "#FFFFFF"
+    background: str = "#000000"
+    matrix: np.ndarray = None      # (2, 3) affine applied to all of it; identity by default
+
+    def __post_init__(self):
+        self.dots = np.asarray(self.dots, dtype=np.float64).reshape(-1, 2)
+        self.segments = np.asarray(self.segments, dtype=np.float64).reshape(-1, 2, 2)
+        self.arcs = np.asarray(self.arcs, dtype=np.float64).reshape(-1, 5)
+        self.matrix = np.eye(2, 3) if self.matrix is None else np.asarray(self.matrix, dtype=np.float64)
+
+    @property
+    def scale(self):
+        """Linear size factor of the matrix (for dot sizes and stroke widths)."""
+        return float(np.sqrt(abs(np.linalg.det(self.matrix[:, :2]))))
+
+    def transformed(self, matrix):
+        """Copy with the (2, 3) affine 'matrix' applied after the current one."""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        combined = np.vstack((matrix, (0, 0, 1))) @ np.vstack((self.matrix, (0, 0, 1)))
+        return replace(self, matrix=combined[:2])
+
+    def rotated(self, degrees, about=(0, 0)):
+        """Copy rotated counter-clockwise by 'degrees' about the point 'about'."""
+        c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+        rotation = np.array(((c, -s), (s, c)))
+        about = np.asarray(about, dtype=np.float64)
+        return self.transformed(np.column_stack((rotation, about - rotation @ about)))
+
+    def scaled(self, factor, about=(0, 0)):
+        about = np.asarray(about, dtype=np.float64)
+        return self.transformed(np.column_stack((factor * np.eye(2), about * (1 - factor))))
+
+    def translated(self, offset):
+        return self.transformed(np.column_stack((np.eye(2), offset)))
+
+    def geometry(self, arc_step=3.0):
+        """
+        (dots, strokes) after the matrix: dots as (N, 2), strokes as a list
+        of (n, 2) polylines in drawing order (segments, then arcs sampled
+        every 'arc_step' degrees). Arcs of equal sample count are evaluated
+        as one batch.
+        """
+        steps = np.maximum(1, np.ceil(np.abs(self.arcs[:, 4]) / arc_step)).astype(int)
+        arc_points = [None] * len(self.arcs)
+        for n in np.unique(steps):
+            idx = np.flatnonzero(steps == n)
+            cx, cy, r, start, extent = self.arcs[idx].T[:, :, None]
+            angle = np.radians(start + extent * np.linspace(0, 1, n + 1))
+            points = np.stack((cx + r * np.cos(angle), cy + r * np.sin(angle)), axis=-1)
+            for i, p in zip(idx, points):
+                arc_points[i] = p
+
+        pieces = [self.dots, self.segments.reshape(-1, 2)] + arc_points
+        points = np.concatenate(pieces) @ self.matrix[:, :2].T + self.matrix[:, 2]
+        sizes = [len(self.dots)] + [2] * len(self.segments) + [len(p) for p in arc_points]
+        parts = np.split(points, np.cumsum(sizes)[:-1])
+        return parts[0], parts[1:]
+
+    def bounds(self, arc_step=3.0):
+        """((x_min, y_min), (x_max, y_max)) of everything drawn, after the matrix."""
+        dots, strokes = self.geometry(arc_step)
+        points = np.concatenate([dots] + strokes)
+        reach = max(self.dot_size, self.width) * self.scale / 2
+        return points.min(axis=0) - reach, points.max(axis=0) + reach
+
+
+def vertical_skeleton(rows=6, dots_per_row=3, dot_spacing=100, row_spacing=40, shift_left=30,
+                      shift_down=20, radius=15, rotation=50.0):
+    """
+    kolam.py: staggered rows of dots, five vertical and five horizontal
+    strokes between them, a circle round every dot, the whole turned by
+    'rotation' degrees (its "ROTATE" step).
+    """
+    start_y = (rows - 1) * row_spacing / 2
+    r = np.arange(rows)
+    # Alternate rows start half a spacing further left
+    start_x = np.where(r % 2 == 1, -dot_spacing, -dot_spacing / 2)
+    xs = start_x[:, None] + dot_spacing * np.arange(dots_per_row)
+    ys = np.broadcast_to((start_y - r * row_spacing)[:, None], xs.shape)
+    dots = np.stack((xs, ys), axis=-1).reshape(-1, 2)
+
+    # Vertical strokes between the dot columns, horizontal ones across them
+    top_y = start_y + row_spacing / 2
+    bottom_y = start_y - (rows - 1) * row_spacing - row_spacing / 2
+    x = -dot_spacing + np.arange(5) * (dot_spacing / 2) + shift_left
+    vertical = np.stack((np.stack((x, np.full(5, top_y)), -1),
+                         np.stack((x, np.full(5, bottom_y)), -1)), axis=1)
+    y = start_y - np.arange(5) * (row_spacing / 1.05) - shift_down
+    horizontal = np.stack((np.stack((np.full(5, -dot_spacing * 1.25), y), -1),
+                           np.stack((np.full(5, dot_spacing * 1.75), y), -1)), axis=1)
+
+    circles = np.column_stack((dots, np.full(len(dots), radius), np.full(len(dots), -90.0),
+                               np.full(len(dots), 360.0)))
+    pattern = Pattern(dots=dots, segments=np.concatenate((vertical, horizontal)), arcs=circles)
+    return pattern.rotated(rotation) if rotation else pattern
+
+
+def diamond_kolam(dot_rows=(1, 3, 5, 5, 3, 1), dot_spacing=50, num_lines=5, line_length=260,
+                  curve_radius=15, base_y=-120):
+    """
+    dot.py: a diamond of dots (KolamEngine's diamond lattice) crossed by
+    45 and 135 degree strokes, with semicircles joining neighbouring strokes
+    and a loop closing each end.
+    """
+    grid = KolamEngine(size=len(dot_rows), spacing=dot_spacing).grid("diamond", counts=dot_rows)
+    dots = np.column_stack((grid.points[:, 0] - (max(dot_rows) - 1) * dot_spacing / 2,
+                            (len(dot_rows) // 2) * dot_spacing - grid.points[:, 1]))
+
+    x45 = -2 * dot_spacing + dot_spacing * np.arange(num_lines)
+    x135 = 2 * dot_spacing - dot_spacing * np.arange(num_lines)
+    starts = np.column_stack((np.r_[x45, x135], np.full(2 * num_lines, float(base_y))))
+    heading = np.radians(np.r_[np.full(num_lines, 45.0), np.full(num_lines, 135.0)])
+    ends = starts + line_length * np.column_stack((np.cos(heading), np.sin(heading)))
+    segments = np.stack((starts, ends), axis=1)
+
+    # Semicircles between neighbouring 45 degree strokes, then the end loops
+    center_y = base_y + line_length / 2
+    joins = x45[:num_lines - 1] + dot_spacing / 2
+    arcs = [(cx, center_y, curve_radius, 45.0, 180.0) for cx in joins]
+    arcs += [(0, center_y + 100, curve_radius + 6, 0.0, 180.0),
+             (0, center_y - 100, curve_radius + 6, 180.0, 180.0)]
+    return Pattern(dots=dots, segments=segments, arcs=arcs)
+
+
+PATTERNS = {
+    "vertical-skeleton": vertical_skeleton,
+    "diamond": diamond_kolam,
+}
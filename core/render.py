@@ -0,0 +1,400 @@
+import os
+
+import cv2
+import numpy as np
+
+from core.generator import CurveGenerator, HeritageGenerator
+from core.grid import KolamEngine
+from core.sikku import SikkuGenerator
+from core.symmetry import MugguSymmetry
+
+PALETTES = [
+    ['#D32F2F', '#FFC107', '#1976D2'],
+    ['#8E24AA', '#00ACC1', "#7094E9"],
+    ["#388E3C", "#8BC34A", "#CDDC39"],  # Greenery
+    ["#F57C00", "#FFB74D", "#FF9800"],  # Sunset
+]
+BACKGROUND = "#FFF8E1"
+DOT_COLOR = "#8D6E63"
+LINE_COLOR = "#4E342E"
+DOT_ALPHA = 0.4
+FILL_ALPHA = 0.2
+# Fixed-point bits for OpenCV drawing (1/16 px precision)
+SHIFT = 4
+# Vertices of the polygon drawn for each grid dot
+_DOT_VERTICES = 16
+
+
+def random_design(size=11, seed=None):
+    """
+    One coloured Design, reproducible from 'seed': the layers come from
+    HeritageGenerator and the palette from the same RNG.
+    """
+    heritage = HeritageGenerator(size=size, seed=seed)
+    design = heritage.get_varied_petal_layers()
+    return design.with_colors(heritage.rng.choice(PALETTES))
+
+
+def design_name(seed, design):
+    """File stem naming a design by its seed and parameters."""
+    petals = "-".join(map(str, design.petals.tolist()))
+    return f"kolam_s{seed}_n{design.size}_l{len(design)}_p{petals}"
+
+
+def draw_design(ax, design, dot_color=DOT_COLOR, lw=2.5):
+    """
+    Draws the dot grid and the petal layers on a matplotlib Axes: each layer
+    is smoothed, repeated by radial symmetry and added as one collection.
+    """
+    # Only the on-screen view needs matplotlib; rasterizing and SVG do not
+    from matplotlib.collections import LineCollection, PolyCollection
+
+    # 1. Background Grid
+    dots = KolamEngine(size=design.size).grid().points
+    ax.scatter(dots[:, 0], dots[:, 1], c=dot_color, s=20, zorder=1, alpha=0.4)
+
+    # 2. Design: (n_petals, n_points, 2) per layer
+    colors = design.hex_colors()
+    for i, (rotations, filled) in enumerate(design_geometry(design)):
+        color = colors[i]
+        if filled:
+            ax.add_collection(PolyCollection(rotations, facecolors=color, edgecolors='none',
+                                             alpha=0.2, zorder=i+2))
+        ax.add_collection(LineCollection(rotations, colors=color, lw=lw, zorder=i+3))
+    ax.autoscale_view()
+    ax.axis('off')
+    ax.set_aspect('equal')
+
+
+def design_geometry(design):
+    """
+    Per layer: its smoothed petals repeated by radial symmetry, as one
+    (n_petals, n_points, 2) array in grid units, with the layer's fill flag.
+    Layers with equally long control paths are smoothed in one batch.
+    """
+    center = design.size // 2
+    sym = MugguSymmetry(center_point=(center, center))
+    paths = design.paths()
+    if isinstance(paths, np.ndarray):
+        curves = CurveGenerator.smooth_path(paths)
+    else:
+        curves = [CurveGenerator.smooth_path(p) for p in paths]
+    return [(sym.apply_radial_symmetry(curve, num_petals=petals), filled)
+            for curve, petals, filled in zip(curves, design.petals.tolist(), design.fill.tolist())]
+
+
+def _bgr(color):
+    """'#RRGGBB' -> (B, G, R)."""
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (4, 2, 0))
+
+
+def _blend(color, background, alpha):
+    return tuple(round(alpha * c + (1 - alpha) * b) for c, b in zip(color, background))
+
+
+def _to_pixels(points, size, px, pad=0.0):
+    """
+    Grid units -> pixel (x, y), y pointing down: [-pad, size - 1 + pad]
+    fills the image but for a 6% margin.
+    """
+    margin = 0.06 * px
+    scale = (px - 2 * margin) / max(size - 1 + 2 * pad, 1)
+    points = np.asarray(points, dtype=np.float64) + pad
+    return np.stack((margin + points[..., 0] * scale,
+                     px - margin - points[..., 1] * scale), axis=-1)
+
+
+def _fixed(points):
+    """Pixel coordinates -> int32 with SHIFT fractional bits."""
+    return np.rint(points * (1 << SHIFT)).astype(np.int32)
+
+
+def _canvas(px, background):
+    img = np.empty((px, px, 3), dtype=np.uint8)
+    # Broadcasting one row is much faster than assigning a colour tuple
+    img.reshape(px, -1)[:] = np.tile(np.array(_bgr(background), dtype=np.uint8), px)
+    return img
+
+
+def _draw_dots(img, centers, color, radius):
+    """All dots as one fillPoly call of small polygons."""
+    angle = 2 * np.pi * np.arange(_DOT_VERTICES) / _DOT_VERTICES
+    ring = radius * np.stack((np.cos(angle), np.sin(angle)), axis=-1)
+    cv2.fillPoly(img, _fixed(centers[:, None] + ring), color, cv2.LINE_AA, SHIFT)
+
+
+def grid_pixels(size, px):
+    """(size*size, 2) pixel centres of the grid dots in a px x px rendering."""
+    return _to_pixels(KolamEngine(size=size).grid().points, size, px)
+
+
+def rasterize_design(design, px=512, background=BACKGROUND,
+                     dot_color=DOT_COLOR, dot_alpha=DOT_ALPHA, dot_radius=None, lw=None,
+                     fill=True):
+    """
+    Draws a design straight into a (px, px, 3) BGR uint8 buffer with OpenCV:
+    antialiased, sub-pixel (SHIFT bits) coordinates, all dots in one
+    fillPoly call and all petals of a layer in one polylines / fillPoly call.
+    The buffer can go to MugguVision as is.
+    """
+    dot_radius = px / 260 if dot_radius is None else dot_radius
+    lw = max(1, round(px / 230)) if lw is None else lw
+    img = _canvas(px, background)
+
+    # 1. Grid dots, pre-blended with the background
+    size = design.size
+    _draw_dots(img, grid_pixels(size, px), _blend(_bgr(dot_color), _bgr(background), dot_alpha),
+               dot_radius)
+
+    # 2. Layers in order: translucent fill, then the outline
+    for i, (petals, filled) in enumerate(design_geometry(design)):
+        color = tuple(design.colors[i, ::-1].tolist())
+        pts = _fixed(_to_pixels(petals, size, px))
+        if fill and filled:
+            # Blend only the layer's bounding box
+            x0, y0 = np.clip((pts.min(axis=(0, 1)) >> SHIFT) - 1, 0, px)
+            x1, y1 = np.clip((pts.max(axis=(0, 1)) >> SHIFT) + 2, 0, px)
+            roi = img[y0:y1, x0:x1]
+            overlay = roi.copy()
+            offset = -np.array([x0, y0], dtype=np.int32) << SHIFT
+            cv2.fillPoly(overlay, pts + offset, color, cv2.LINE_AA, SHIFT)
+            cv2.addWeighted(overlay, FILL_ALPHA, roi, 1 - FILL_ALPHA, 0, dst=roi)
+        cv2.polylines(img, pts, False, color, lw, cv2.LINE_AA, SHIFT)
+    return img
+
+
+def _svg_start(px, background, centers, dot_color, dot_alpha, dot_radius):
+    """Opening lines of an SVG document: background and dots."""
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{px}" height="{px}" '
+           f'viewBox="0 0 {px} {px}">',
+           f'<rect width="{px}" height="{px}" fill="{background}"/>',
+           f'<g fill="{dot_color}" fill-opacity="{dot_alpha}">']
+    out.extend(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{dot_radius:.2f}"/>' for x, y in centers)
+    out.append('</g>')
+    return out
+
+
+def _svg_path_data(polylines, closed=False):
+    end = " Z" if closed else ""
+    return " ".join("M" + " L".join(f"{x:.2f},{y:.2f}" for x, y in line) + end
+                    for line in polylines)
+
+
+def design_svg(design, px=512, background=BACKGROUND,
+               dot_color=DOT_COLOR, dot_alpha=DOT_ALPHA, dot_radius=None, lw=None):
+    """The same drawing as rasterize_design, as an SVG document (str)."""
+    dot_radius = px / 260 if dot_radius is None else dot_radius
+    lw = px / 230 if lw is None else lw
+    size = design.size
+    out = _svg_start(px, background, grid_pixels(size, px), dot_color, dot_alpha, dot_radius)
+
+    colors = design.hex_colors()
+    for i, (petals, filled) in enumerate(design_geometry(design)):
+        color = colors[i]
+        d = _svg_path_data(_to_pixels(petals, size, px))
+        if filled:
+            out.append(f'<path d="{d}" fill="{color}" fill-opacity="{FILL_ALPHA}" stroke="none"/>')
+        out.append(f'<path d="{d}" fill="none" stroke="{color}" stroke-width="{lw:.2f}" '
+                   f'stroke-linecap="round" stroke-linejoin="round"/>')
+    out.append('</svg>')
+    return "\n".join(out)
+
+
+def render_design(design, path, px=512, background=BACKGROUND):
+    """
+    Renders a design headlessly to 'path': SVG (vector) for .svg, otherwise
+    a raster image written by OpenCV (format from the extension).
+    """
+    _write(path, lambda: design_svg(design, px, background),
+           lambda: rasterize_design(design, px, background))
+
+
+def random_sikku(size=11, seed=None):
+    """A size x size Sikku (single closed line), reproducible from 'seed'."""
+    return SikkuGenerator(size, seed=seed).generate()
+
+
+def sikku_name(seed, sikku):
+    """File stem naming a Sikku by its seed and grid."""
+    return f"sikku_s{seed}_n{sikku.rows}x{sikku.cols}"
+
+
+def _sikku_frame(sikku, px):
+    """Dot centres, loop polylines and dot spacing in pixels, the grid centred in the image."""
+    size = max(sikku.rows, sikku.cols)
+    offset = np.array([size - sikku.cols, size - sikku.rows]) / 2
+    scale = 0.88 * px / size
+    centers = _to_pixels(sikku.dots + offset, size, px, pad=0.5)
+    loops = [_to_pixels(loop + offset, size, px, pad=0.5) for loop in sikku.polylines()]
+    return centers, loops, scale
+
+
+def rasterize_sikku(sikku, px=512, background=BACKGROUND, color=LINE_COLOR,
+                    dot_color=DOT_COLOR, dot_radius=None, lw=None):
+    """
+    Draws a Sikku into a (px, px, 3) BGR uint8 buffer: its dots, then every
+    loop as one closed antialiased polyline (a single polylines call).
+    Dot size and line width default to fractions of the dot spacing.
+    """
+    centers, loops, spacing = _sikku_frame(sikku, px)
+    dot_radius = max(1.0, 0.07 * spacing) if dot_radius is None else dot_radius
+    lw = max(1, round(0.035 * spacing)) if lw is None else lw
+    img = _canvas(px, background)
+    _draw_dots(img, centers, _bgr(dot_color), dot_radius)
+    cv2.polylines(img, [_fixed(loop) for loop in loops], True, _bgr(color), lw, cv2.LINE_AA, SHIFT)
+    return img
+
+
+def sikku_svg(sikku, px=512, background=BACKGROUND, color=LINE_COLOR,
+              dot_color=DOT_COLOR, dot_radius=None, lw=None):
+    """The same drawing as rasterize_sikku, as an SVG document (str)."""
+    centers, loops, spacing = _sikku_frame(sikku, px)
+    dot_radius = max(1.0, 0.07 * spacing) if dot_radius is None else dot_radius
+    lw = max(1.0, 0.035 * spacing) if lw is None else lw
+    out = _svg_start(px, background, centers, dot_color, 1.0, dot_radius)
+    out.append(f'<path d="{_svg_path_data(loops, closed=True)}" fill="none" stroke="{color}" '
+               f'stroke-width="{lw:.2f}" stroke-linejoin="round"/>')
+    out.append('</svg>')
+    return "\n".join(out)
+
+
+def render_sikku(sikku, path, px=512, background=BACKGROUND):
+    """Like render_design, for a Sikku."""
+    _write(path, lambda: sikku_svg(sikku, px, background),
+           lambda: rasterize_sikku(sikku, px, background))
+
+
+def fit_pattern(pattern, px, margin=0.06):
+    """The pattern (core.patterns) scaled and centred into a px x px image, y pointing down."""
+    low, high = pattern.bounds()
+    scale = px * (1 - 2 * margin) / max(float(np.max(high - low)), 1e-9)
+    cx, cy = (low + high) / 2
+    return pattern.transformed([[scale, 0, px / 2 - scale * cx],
+                                [0, -scale, px / 2 + scale * cy]])
+
+
+def _pattern_frame(pattern, px, arc_step):
+    """Dots, strokes, dot radius and line width of a pattern fitted to px x px."""
+    fitted = fit_pattern(pattern, px)
+    dots, strokes = fitted.geometry(arc_step)
+    return dots, strokes, max(0.5, pattern.dot_size * fitted.scale / 2), pattern.width * fitted.scale
+
+
+def rasterize_pattern(pattern, px=512, arc_step=3.0):
+    """
+    Draws a pattern into a (px, px, 3) BGR uint8 buffer: its dots in one
+    fillPoly call, then every stroke in one antialiased polylines call.
+    Dot size and line width scale with the pattern.
+    """
+    dots, strokes, radius, lw = _pattern_frame(pattern, px, arc_step)
+    img = _canvas(px, pattern.background)
+    color = _bgr(pattern.color)
+    if len(dots):
+        _draw_dots(img, dots, color, radius)
+    cv2.polylines(img, [_fixed(s) for s in strokes], False, color, max(1, round(lw)),
+                  cv2.LINE_AA, SHIFT)
+    return img
+
+
+def pattern_svg(pattern, px=512, arc_step=3.0):
+    """The same drawing as rasterize_pattern, as an SVG document (str)."""
+    dots, strokes, radius, lw = _pattern_frame(pattern, px, arc_step)
+    out = _svg_start(px, pattern.background, dots, pattern.color, 1.0, radius)
+    out.append(f'<path d="{_svg_path_data(strokes)}" fill="none" stroke="{pattern.color}" '
+               f'stroke-width="{max(1.0, lw):.2f}" stroke-linecap="round" stroke-linejoin="round"/>')
+    out.append('</svg>')
+    return "\n".join(out)
+
+
+def _stroke_piece(points, along, start, stop):
+    """The part of a polyline between arc lengths 'start' and 'stop' ('along': length at each vertex)."""
+    inside = (along > start) & (along < stop)
+    ends = [np.interp(t, along, points[:, i]) for t in (start, stop) for i in (0, 1)]
+    return np.vstack((ends[:2], points[inside], ends[2:]))
+
+
+def pattern_frames(pattern, px=512, fps=30, seconds=4.0, hold=1.0, arc_step=3.0):
+    """
+    Yields the pattern being drawn, one BGR frame per 1/fps second: the dots
+    appear over the first fifth of 'seconds', then the pen runs through the
+    strokes in order at constant speed. The last frame is held for 'hold'
+    seconds. Each frame only adds the new ink to the previous one, and the
+    same buffer is yielded every time (copy it to keep a frame).
+    """
+    dots, strokes, radius, lw = _pattern_frame(pattern, px, arc_step)
+    img = _canvas(px, pattern.background)
+    color = _bgr(pattern.color)
+    lw = max(1, round(lw))
+    n_frames = max(1, round(fps * seconds))
+
+    # 1. Dots, a few more every frame
+    n_dot_frames = round(n_frames / 5) if len(dots) and strokes else (n_frames if len(dots) else 0)
+    shown = 0
+    for k in range(1, n_dot_frames + 1):
+        upto = len(dots) * k // n_dot_frames
+        if upto > shown:
+            _draw_dots(img, dots[shown:upto], color, radius)
+            shown = upto
+        yield img
+
+    # 2. Strokes laid end to end; frame k draws up to total * k / n
+    along = [np.r_[0, np.cumsum(np.hypot(*np.diff(s, axis=0).T))] for s in strokes]
+    ends = np.cumsum([a[-1] for a in along])
+    starts = ends - [a[-1] for a in along]
+    total = ends[-1] if len(ends) else 0.0
+    n_line_frames = n_frames - n_dot_frames
+    drawn = 0.0
+    for k in range(1, n_line_frames + 1):
+        target = total * k / n_line_frames
+        first = int(np.searchsorted(ends, drawn, side="right"))
+        last = int(np.searchsorted(starts, target, side="left"))
+        pieces = [_stroke_piece(strokes[i], along[i], drawn - starts[i], target - starts[i])
+                  for i in range(first, last)]
+        if pieces:
+            cv2.polylines(img, [_fixed(p) for p in pieces], False, color, lw, cv2.LINE_AA, SHIFT)
+        drawn = target
+        yield img
+
+    for _ in range(round(fps * hold)):
+        yield img
+
+
+# Video containers write_animation knows, and the codec used for each
+VIDEO_CODECS = {".mp4": "mp4v", ".avi": "MJPG"}
+
+
+def write_animation(pattern, path, px=512, fps=30, seconds=4.0, hold=1.0):
+    """Writes pattern_frames to a video file (.mp4 or .avi); returns the number of frames."""
+    ext = os.path.splitext(path)[1].lower()
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*VIDEO_CODECS[ext]), fps, (px, px))
+    if not writer.isOpened():
+        raise OSError(f"could not write {path}")
+    count = 0
+    try:
+        for count, frame in enumerate(pattern_frames(pattern, px, fps, seconds, hold), 1):
+            writer.write(frame)
+    finally:
+        writer.release()
+    return count
+
+
+def render_pattern(pattern, path, px=512, fps=30, seconds=4.0):
+    """
+    Like render_design, for a pattern; .mp4 and .avi paths get the drawing
+    animated at 'fps' frames per second instead.
+    """
+    if os.path.splitext(path)[1].lower() in VIDEO_CODECS:
+        write_animation(pattern, path, px, fps, seconds)
+        return
+    _write(path, lambda: pattern_svg(pattern, px), lambda: rasterize_pattern(pattern, px))
+
+
+def _write(path, svg, raster):
+    """Writes svg() to .svg paths, otherwise raster() through OpenCV."""
+    if path.lower().endswith(".svg"):
+        with open(path, "w") as f:
+            f.write(svg())
+        return
+    if not cv2.imwrite(path, raster()):
+        raise OSError(f"could not write {path}")
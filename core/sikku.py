@@ -0,0 +1,221 @@
+"""
+Sikku (single closed line) generation on a dot grid, using the mirror-curve
+model.
+
+Each dot sits in a unit cell. The line runs diagonally through the cells,
+from one edge midpoint to the next: four segments (NE, ES, SW, WN) around
+every dot. At the midpoint between two neighbouring dots, a gate decides
+how the two strands passing through connect:
+
+- CROSS: both strands go straight on and cross,
+- WALL: a mirror across the gap; each strand turns back round its own dot,
+- BRIDGE: a mirror on the line between the dots; the strands turn and run
+  on along the pair.
+
+The grid border is a wall everywhere. Given the gates, each segment end has
+exactly one partner, so the line falls apart into closed loops.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from core.grid import KolamEngine
+
+CROSS, WALL, BRIDGE = 0, 1, 2
+
+# Segment ends of cell k are 8k + slot. Slots 0-7 are NE@N, NE@E, ES@E,
+# ES@S, SW@S, SW@W, WN@W, WN@N, so end e and e ^ 1 are the two ends of one
+# segment.
+_SLOT_OFFSET = np.array([(0, .5), (.5, 0), (.5, 0), (0, -.5), (0, -.5), (-.5, 0), (-.5, 0), (0, .5)])
+# For each gate state, how the four ends (a1, a2, b1, b2) meeting at a gate
+# pair up: a = the cell left of / above the gate, b = the other one
+_PAIRS = np.array([
+    [0, 2, 1, 3],   # CROSS: a1-b1, a2-b2
+    [0, 1, 2, 3],   # WALL: a1-a2, b1-b2
+    [0, 3, 1, 2],   # BRIDGE: a1-b2, a2-b1
+])
+# How far a turning strand keeps from the mirror, in dot spacings
+_MIRROR_GAP = 0.2
+
+
+@dataclass
+class Sikku:
+    """
+    Gate states of a rows x cols dot grid (dots at (col, row)) and the
+    closed line they produce. h_gates[r, c] sits between dots (r, c) and
+    (r, c + 1), v_gates[r, c] between (r, c) and (r + 1, c).
+    """
+    rows: int
+    cols: int
+    h_gates: np.ndarray    # (rows, cols - 1) int8
+    v_gates: np.ndarray    # (rows - 1, cols) int8
+    loops: list            # per closed loop: (K, 2) float midpoints it visits, in order
+
+    @property
+    def dots(self):
+        """(rows * cols, 2) float32 dot positions, row by row."""
+        engine = KolamEngine(size=max(self.rows, self.cols))
+        points = engine.grid("square").points.reshape(engine.size, engine.size, 2)
+        return points[:self.rows, :self.cols].reshape(-1, 2)
+
+    @property
+    def is_single_loop(self):
+        return len(self.loops) == 1
+
+    def polylines(self, points_per_segment=6):
+        """
+        Each loop as a smooth closed (M, 2) polyline (first point repeated at
+        the end), rounded where it turns at a mirror. Ready for MugguSymmetry
+        and the renderers.
+        """
+        return [smooth_loop(turned_corners(loop), points_per_segment) for loop in self.loops]
+
+
+class SikkuGenerator:
+    def __init__(self, rows, cols=None, seed=None, rng=None):
+        """seed / rng: the same seed (or numpy Generator state) gives the same Sikku."""
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+    def generate(self, weights=(0.5, 0.25, 0.25)):
+        """
+        A random Sikku drawn as one single closed line.
+
+        1. Every gate gets a random state (CROSS / WALL / BRIDGE 'weights').
+        2. Loops are labelled at once as connected components of the
+           segment-end graph.
+        3. Merge: visiting the gates in random order, a gate whose two
+           strands belong to different loops is switched to another state,
+           which always joins them into one; a union-find tracks the merged
+           loops. One pass leaves a single loop.
+        4. The loop is traced end to end in linear time.
+        """
+        rows, cols = self.rows, self.cols
+        p = np.asarray(weights, dtype=np.float64) / np.sum(weights)
+        h_gates = self.rng.choice(3, size=(rows, cols - 1), p=p).astype(np.int8)
+        v_gates = self.rng.choice(3, size=(rows - 1, cols), p=p).astype(np.int8)
+
+        quads = _gate_ends(rows, cols)
+        states = np.concatenate((h_gates.ravel(), v_gates.ravel()))
+        partner = _partners(rows, cols, quads, states)
+        n, labels = _loop_labels(partner)
+
+        if n > 1:
+            parent = list(range(n))
+
+            def find(i):
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            order = self.rng.permutation(len(states))
+            switch = self.rng.integers(1, 3, size=len(states))
+            strand_a = labels[quads[np.arange(len(states)), _PAIRS[states, 0]]]
+            strand_b = labels[quads[np.arange(len(states)), _PAIRS[states, 2]]]
+            for g in order.tolist():
+                a, b = find(strand_a[g]), find(strand_b[g])
+                if a != b:
+                    parent[a] = b
+                    states[g] = (states[g] + switch[g]) % 3
+                    n -= 1
+                    if n == 1:
+                        break
+            h_gates = states[:h_gates.size].reshape(h_gates.shape)
+            v_gates = states[h_gates.size:].reshape(v_gates.shape)
+            partner = _partners(rows, cols, quads, states)
+
+        return Sikku(rows=rows, cols=cols, h_gates=h_gates, v_gates=v_gates,
+                     loops=trace_loops(partner, cols))
+
+
+def _gate_ends(rows, cols):
+    """(gates, 4) segment ends (a1, a2, b1, b2) meeting at every gate, h_gates then v_gates."""
+    cell = np.arange(rows * cols).reshape(rows, cols) * 8
+    # Horizontal neighbours: a = left (NE@E, ES@E), b = right (SW@W, WN@W)
+    a, b = cell[:, :-1].ravel(), cell[:, 1:].ravel()
+    horizontal = np.stack((a + 1, a + 2, b + 5, b + 6), axis=1)
+    # Vertical neighbours: a = upper (SW@S, ES@S), b = lower (NE@N, WN@N)
+    a, b = cell[1:, :].ravel(), cell[:-1, :].ravel()
+    vertical = np.stack((a + 4, a + 3, b + 0, b + 7), axis=1)
+    return np.concatenate((horizontal, vertical))
+
+
+def _partners(rows, cols, quads, states):
+    """partner[e]: the segment end joined to end e."""
+    partner = np.empty(rows * cols * 8, dtype=np.intp)
+    pairs = np.take_along_axis(quads, _PAIRS[states], axis=1)
+    for first, second in ((0, 1), (2, 3)):
+        partner[pairs[:, first]] = pairs[:, second]
+        partner[pairs[:, second]] = pairs[:, first]
+
+    # The border is a wall: the two ends at a border midpoint pair up
+    cell = np.arange(rows * cols).reshape(rows, cols) * 8
+    walls = [(cell[-1, :], 0, 7), (cell[0, :], 3, 4), (cell[:, -1], 1, 2), (cell[:, 0], 5, 6)]
+    for base, first, second in walls:
+        partner[base + first] = base + second
+        partner[base + second] = base + first
+    return partner
+
+
+def _loop_labels(partner):
+    """(number of loops, loop label per segment end)."""
+    ends = np.arange(len(partner))
+    # Edges: the two ends of each segment, and each end to its partner
+    graph = coo_matrix((np.ones(2 * len(ends), dtype=np.int8),
+                        (np.r_[ends, ends], np.r_[ends ^ 1, partner])),
+                       shape=(len(ends), len(ends)))
+    return connected_components(graph, directed=False)
+
+
+def trace_loops(partner, cols):
+    """
+    Follows the segments end to end: every loop as the (K, 2) sequence of
+    edge midpoints it passes, in grid units (dot (r, c) at (c, r)).
+    """
+    seen = np.zeros(len(partner) // 2, dtype=bool)
+    loops = []
+    for start in range(0, len(partner), 2):
+        if seen[start // 2]:
+            continue
+        order = []
+        end = start
+        while True:
+            seen[end // 2] = True
+            end ^= 1                 # leave the segment by its other end
+            order.append(end)
+            end = partner[end]       # step into the next segment
+            if end == start:
+                break
+        order = np.array(order)
+        cell = order // 8
+        loops.append(np.column_stack((cell % cols, cell // cols)) + _SLOT_OFFSET[order % 8])
+    return loops
+
+
+def turned_corners(loop, gap=_MIRROR_GAP):
+    """
+    Moves each midpoint where the line turns at a mirror 'gap' away from the
+    mirror, so strands that meet at a WALL or BRIDGE do not touch. Strands
+    going straight through (CROSS) are left on the midpoint.
+    """
+    incoming = loop - np.roll(loop, 1, axis=0)
+    outgoing = np.roll(loop, -1, axis=0) - loop
+    normal = outgoing - incoming
+    length = np.hypot(normal[:, 0], normal[:, 1])
+    turning = length > 1e-9
+    out = loop.astype(np.float64)
+    out[turning] += gap * normal[turning] / length[turning, None]
+    return out
+
+
+def smooth_loop(loop, points_per_segment=6):
+    """Closed (M, 2) polyline through 'loop' by a periodic cubic spline."""
+    closed = np.vstack((loop, loop[:1]))
+    t = np.arange(len(closed))
+    t_new = np.linspace(0, len(loop), len(loop) * points_per_segment + 1)
+    return CubicSpline(t, closed, bc_type='periodic', axis=0)(t_new)
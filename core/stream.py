@@ -0,0 +1,400 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from core.config import VisionConfig
+from core.vision import MugguVision, line_mask, skeletonize
+
+# Stages timed for every frame, in pipeline order
+STAGES = ("convert", "diff", "skeleton", "dots", "verdict")
+
+
+class FrameSource:
+    """
+    Iterates BGR frames from a cv2.VideoCapture, a video path or camera index,
+    a single (h, w[, 3]) array, an (n, h, w[, 3]) stack, or any iterable of
+    arrays. Grayscale frames are converted to BGR.
+
+    Captures are read into one reused buffer, so a yielded frame is only valid
+    until the next one is read; copy it to keep it.
+    """
+
+    def __init__(self, source, fps=None):
+        self._capture = None
+        self._owns_capture = False
+        if isinstance(source, cv2.VideoCapture):
+            self._capture = source
+        elif isinstance(source, (str, int)):
+            self._capture = cv2.VideoCapture(source)
+            self._owns_capture = True
+            if not self._capture.isOpened():
+                raise ValueError(f"Could not open video source {source!r}")
+        self._source = source
+        if fps is None and self._capture is not None:
+            fps = self._capture.get(cv2.CAP_PROP_FPS) or None
+        self.fps = fps
+
+    def __iter__(self):
+        if self._capture is not None:
+            yield from self._read_capture()
+        elif isinstance(self._source, np.ndarray):
+            frames = self._source
+            if frames.ndim == 2 or (frames.ndim == 3 and frames.shape[2] in (3, 4)):
+                frames = frames[None]
+            for frame in frames:
+                yield self._as_bgr(frame)
+        else:
+            for frame in self._source:
+                yield self._as_bgr(np.asarray(frame))
+
+    def _read_capture(self):
+        frame = None
+        while True:
+            ok, frame = self._capture.read(frame)
+            if not ok:
+                break
+            yield frame
+
+    @staticmethod
+    def _as_bgr(frame):
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        if frame.shape[2] == 4:
+            return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        return frame
+
+    def close(self):
+        if self._owns_capture:
+            self._capture.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass
+class FrameResult:
+    """Principle results for one frame plus how much work the frame needed."""
+    index: int
+    principles: dict
+    dots: np.ndarray               # float32 (N, 2) dot centres
+    topology: dict
+    style: str
+    palette: list
+    changed_tiles: int
+    dirty_fraction: float
+    stage_ms: dict = field(default_factory=dict)
+    latency_ms: float = 0.0
+
+
+class StreamingAnalyzer:
+    """
+    Frame-by-frame MugguVision analysis for videos and camera feeds.
+
+    Working-scale buffers (gray, V channel, line mask, skeleton) are allocated once
+    and overwritten in place. Every frame is compared with the previous one in
+    tile x tile blocks; only changed tiles, grown by 'halo' pixels (the reach
+    of the threshold block, closing and thinning), have their line mask and
+    skeleton recomputed. A frame with no changed tile reuses the previous
+    result outright.
+
+    Dots are refreshed on every changed frame. The design-level verdict
+    (skeleton graph and Sikku check, style, palette) is computed on a
+    background thread every 'graph_interval' changed frames and once more when
+    the scene settles, so it never stalls a frame; results carry the latest
+    finished verdict, and topology["frame"] tells which frame it describes.
+    """
+
+    def __init__(self, config=None, tile=64, halo=16, diff_threshold=12,
+                 budget_ms=1000 / 30, graph_interval=15, window=10000, **overrides):
+        self.config = (config or VisionConfig()).replace(**overrides)
+        self.tile = tile
+        self.halo = halo
+        self.diff_threshold = diff_threshold
+        self.budget_ms = budget_ms
+        self.graph_interval = graph_interval
+        self._timings = deque(maxlen=window)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        self._shape = None
+        self._last = None
+        self.frame_index = -1
+
+    # --------------------------------------------------
+    # BUFFERS
+    # --------------------------------------------------
+    def _allocate(self, frame, work):
+        """(Re)creates the per-stream buffers for a new frame size."""
+        h, w = work.shape[:2]
+        self._shape = frame.shape
+        self.gray = np.zeros((h, w), dtype=np.uint8)
+        self._prev_gray = np.zeros((h, w), dtype=np.uint8)
+        self.v_channel = np.zeros((h, w), dtype=np.uint8)
+        self.binary = np.zeros((h, w), dtype=np.uint8)
+        self.skeleton = np.zeros((h, w), dtype=np.uint8)
+        self._diff = np.zeros((h, w), dtype=np.uint8)
+        self._row_starts = np.arange(0, h, self.tile)
+        self._col_starts = np.arange(0, w, self.tile)
+
+        # Per-axis working/full ratio; area and distance settings follow it
+        self._scale_xy = np.array([w / frame.shape[1], h / frame.shape[0]])
+        area = self._scale_xy[0] * self._scale_xy[1]
+        self._work_config = self.config.replace(
+            max_side=None,
+            dot_min_area=self.config.dot_min_area * area,
+            dot_max_area=self.config.dot_max_area * area,
+            style_cutoff=self.config.style_cutoff * self._scale_xy[0])
+        if self._pending is not None:
+            self._pending.result()
+        self._pending = None
+        self._since_verdict = 0
+        self._verdict = None
+        self._work_dots = np.zeros((0, 2), dtype=np.float32)
+        self._last = None
+
+    # --------------------------------------------------
+    # PER FRAME
+    # --------------------------------------------------
+    def process(self, frame):
+        """Analyzes one BGR frame and returns its FrameResult."""
+        start = time.perf_counter()
+        stage_ms = dict.fromkeys(STAGES, 0.0)
+        self.frame_index += 1
+
+        # 1. Working-scale gray into the stream buffers
+        t = time.perf_counter()
+        work = MugguVision._pyramid_down(frame, self.config.max_side)
+        first = self._shape != frame.shape
+        if first:
+            self._allocate(frame, work)
+        self.gray, self._prev_gray = self._prev_gray, self.gray
+        cv2.cvtColor(work, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        stage_ms["convert"] = _ms(t)
+
+        # 2. Tiles holding a pixel that moved by more than diff_threshold
+        t = time.perf_counter()
+        if first:
+            changed = np.ones((len(self._row_starts), len(self._col_starts)), dtype=bool)
+        else:
+            cv2.absdiff(self.gray, self._prev_gray, dst=self._diff)
+            cv2.threshold(self._diff, self.diff_threshold, 1, cv2.THRESH_BINARY, dst=self._diff)
+            cols = np.maximum.reduceat(self._diff, self._col_starts, axis=1)
+            changed = np.maximum.reduceat(cols, self._row_starts, axis=0) > 0
+        n_changed = int(np.count_nonzero(changed))
+        stage_ms["diff"] = _ms(t)
+
+        t = time.perf_counter()
+        verdict_ready = self._collect_verdict()
+        if n_changed == 0 and self._last is not None:
+            # Static scene: verify the settled drawing once, otherwise reuse the last result
+            if self._since_verdict and self._pending is None:
+                self._submit_verdict(work)
+            stage_ms["verdict"] = _ms(t)
+            return self._finish(self._reuse(stage_ms, verdict_ready), start)
+
+        # 3. Recompute line mask and skeleton only around the changed tiles
+        t = time.perf_counter()
+        cv2.max(work[:, :, 0], work[:, :, 1], dst=self.v_channel)
+        cv2.max(self.v_channel, work[:, :, 2], dst=self.v_channel)
+        dirty = self._update_regions(changed)
+        stage_ms["skeleton"] = _ms(t)
+
+        # 4. Dots on the whole frame (cheap: threshold, opening, components)
+        t = time.perf_counter()
+        self._work_dots = self._vision(work).identify_chukkalu()
+        stage_ms["dots"] = _ms(t)
+
+        # 5. Design-level verdict: synchronously for the first frame, then in
+        #    the background every graph_interval changed frames
+        t = time.perf_counter()
+        self._since_verdict += 1
+        if first:
+            self._submit_verdict(work)
+            self._pending.result()
+            self._collect_verdict()
+        elif self._since_verdict >= self.graph_interval and self._pending is None:
+            self._submit_verdict(work)
+        stage_ms["verdict"] = _ms(t)
+
+        dots = self._full_frame_dots()
+        return self._finish(FrameResult(
+            self.frame_index, self._principles(dots), dots, self._verdict["topology"],
+            self._verdict["style"], self._verdict["palette"], n_changed, dirty, stage_ms), start)
+
+    def _update_regions(self, changed):
+        """Re-thresholds and re-thins every group of changed tiles; returns the dirty fraction."""
+        h, w = self.gray.shape
+        n, _, stats, _ = cv2.connectedComponentsWithStats(
+            changed.astype(np.uint8), connectivity=8)
+        area = 0
+        for x, y, tw, th, _ in stats[1:n]:
+            # Pixels whose line mask/skeleton can change: the tiles grown by one
+            # halo; they are recomputed with a second halo of context around them
+            x0 = max(x * self.tile - self.halo, 0)
+            y0 = max(y * self.tile - self.halo, 0)
+            x1 = min((x + tw) * self.tile + self.halo, w)
+            y1 = min((y + th) * self.tile + self.halo, h)
+            cx0, cy0 = max(x0 - self.halo, 0), max(y0 - self.halo, 0)
+            cx1, cy1 = min(x1 + self.halo, w), min(y1 + self.halo, h)
+
+            binary = line_mask(np.ascontiguousarray(self.gray[cy0:cy1, cx0:cx1]), self.config)
+            skeleton = skeletonize(binary, self.config)
+            core = (slice(y0 - cy0, y1 - cy0), slice(x0 - cx0, x1 - cx0))
+            self.binary[y0:y1, x0:x1] = binary[core]
+            self.skeleton[y0:y1, x0:x1] = skeleton[core]
+            area += (x1 - x0) * (y1 - y0)
+        return min(area / (h * w), 1.0)
+
+    # --------------------------------------------------
+    # BACKGROUND VERDICT
+    # --------------------------------------------------
+    def _submit_verdict(self, work):
+        """Starts topology/style/palette on snapshots of the current skeleton and dots."""
+        palette = self._vision(work).extract_color_palette()
+        # Later frames overwrite the stream buffers while the job runs, so its
+        # store holds only copies taken now (work may be the capture buffer)
+        skeleton = self.skeleton.copy()
+        cfg = self._work_config
+        vision = MugguVision(work.copy(), cfg, {MugguVision.stage_key(cfg, "skeleton"): skeleton})
+        self._pending = self._executor.submit(
+            self._verdict_job, vision, skeleton, self._work_dots, palette, self.frame_index)
+        self._since_verdict = 0
+
+    @staticmethod
+    def _verdict_job(vision, skeleton, dots, palette, index):
+        try:
+            topology = vision.verify_sikku_topology(skeleton)
+            style = vision.classify_style(dots, skeleton)
+        except Exception as e:
+            # A failed verdict is reported on the frames, it does not end the stream
+            topology = {"is_closed_loop": False, "endpoints_count": None,
+                        "has_content": bool(skeleton.any()), "components": None,
+                        "junctions": None, "loops": None, "is_sikku": False,
+                        "error": f"{type(e).__name__}: {e}"}
+            style = "Unknown (Analysis Error)"
+        topology["frame"] = index
+        return {"topology": topology, "style": style, "palette": palette}
+
+    def _collect_verdict(self):
+        """Picks up a finished background verdict; True when one arrived."""
+        if self._pending is None or not self._pending.done():
+            return False
+        self._verdict = self._pending.result()
+        self._pending = None
+        return True
+
+    def close(self):
+        """Stops the background verdict worker."""
+        self._executor.shutdown(wait=True)
+
+    # --------------------------------------------------
+    # RESULTS
+    # --------------------------------------------------
+    def _vision(self, work):
+        # MugguVision over the stream buffers: seeding its memo store with them
+        # skips the stages this class already maintains incrementally
+        cfg = self._work_config
+        store = {
+            MugguVision.stage_key(cfg, "work_image"): work,
+            MugguVision.stage_key(cfg, "v_channel"): self.v_channel,
+            MugguVision.stage_key(cfg, "gray"): self.gray,
+            MugguVision.stage_key(cfg, "binary"): self.binary,
+            MugguVision.stage_key(cfg, "skeleton"): self.skeleton,
+        }
+        return MugguVision(work, cfg, store)
+
+    def _full_frame_dots(self):
+        if not len(self._work_dots) or self._scale_xy[0] == 1.0:
+            return self._work_dots
+        return ((self._work_dots + 0.5) / self._scale_xy - 0.5).astype(np.float32)
+
+    def _principles(self, dots):
+        topology = self._verdict["topology"]
+        return {
+            "Anchor Dot Grid (Chukkalu)": len(dots) >= 1,
+            "Single Continuous Line (Sikku)": topology["is_sikku"],
+            "Zero Endpoints Checks": topology["endpoints_count"] == 0,
+            "Design Style": self._verdict["style"],
+            "Detected Palette": self._verdict["palette"],
+        }
+
+    def _reuse(self, stage_ms, verdict_ready):
+        last = self._last
+        principles = self._principles(last.dots) if verdict_ready else last.principles
+        return FrameResult(self.frame_index, principles, last.dots, self._verdict["topology"],
+                           self._verdict["style"], self._verdict["palette"], 0, 0.0, stage_ms)
+
+    def _finish(self, result, start):
+        result.latency_ms = _ms(start)
+        self._last = result
+        self._timings.append((result.latency_ms, [result.stage_ms[s] for s in STAGES],
+                              result.dirty_fraction))
+        return result
+
+    def run(self, source, max_frames=None):
+        """Yields a FrameResult for every frame of 'source' (anything FrameSource accepts)."""
+        frames = source if isinstance(source, FrameSource) else FrameSource(source)
+        try:
+            for i, frame in enumerate(frames):
+                if max_frames is not None and i >= max_frames:
+                    break
+                yield self.process(frame)
+        finally:
+            if self._pending is not None:
+                # Let the last verdict land so report()/last result are complete
+                self._pending.result()
+            if frames is not source:
+                frames.close()
+
+    # --------------------------------------------------
+    # LATENCY REPORT
+    # --------------------------------------------------
+    def report(self):
+        """Latency percentiles against the per-frame budget, overall and per stage."""
+        if not self._timings:
+            return {"frames": 0, "budget_ms": self.budget_ms}
+        latency = np.array([t[0] for t in self._timings])
+        stages = np.array([t[1] for t in self._timings])
+        dirty = np.array([t[2] for t in self._timings])
+        return {
+            "frames": len(latency),
+            "budget_ms": round(self.budget_ms, 3),
+            "fps": round(1000 / latency.mean(), 1),
+            "latency_ms": _percentiles(latency),
+            "over_budget": round(float(np.mean(latency > self.budget_ms)), 4),
+            "dirty_fraction": round(float(dirty.mean()), 4),
+            "stages": {name: _percentiles(stages[:, i]) for i, name in enumerate(STAGES)},
+        }
+
+    @staticmethod
+    def format_report(report):
+        """Human-readable summary of report()."""
+        if not report["frames"]:
+            return "No frames analyzed."
+        lat = report["latency_ms"]
+        lines = [
+            f"{report['frames']} frames, {report['fps']} fps "
+            f"(budget {report['budget_ms']:.1f} ms/frame)",
+            f"latency p50 {lat['p50']:.1f} ms, p95 {lat['p95']:.1f} ms, max {lat['max']:.1f} ms; "
+            f"{report['over_budget']:.1%} of frames over budget",
+            f"mean dirty area {report['dirty_fraction']:.1%}",
+        ]
+        for name, stats in report["stages"].items():
+            lines.append(f"  {name:<9} p50 {stats['p50']:6.2f} ms   p95 {stats['p95']:6.2f} ms")
+        return "\n".join(lines)
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def _percentiles(values):
+    p50, p95 = np.percentile(values, [50, 95])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+            "max": round(float(values.max()), 3)}
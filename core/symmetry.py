@@ -1,27 +1,93 @@
+from functools import lru_cache
+
 import numpy as np
 
+
+@lru_cache(maxsize=64)
+def rotation_stack(num_petals):
+    """(n, 2, 2) rotation matrices for 360/n steps, cached per petal count."""
+    theta = 2 * np.pi * np.arange(num_petals) / num_petals
+    c, s = np.cos(theta), np.sin(theta)
+    stack = np.stack((np.stack((c, -s), -1), np.stack((s, c), -1)), 1)
+    stack.setflags(write=False)
+    return stack
+
+
+@lru_cache(maxsize=64)
+def dihedral_stack(num_petals, axis=0.0):
+    """
+    (2n, 2, 2) matrices of the dihedral group D_n: the n rotations, then the
+    n mirrors (reflection across the line at 'axis' degrees, then rotated).
+    """
+    a = np.radians(2 * axis)
+    mirror = np.array(((np.cos(a), np.sin(a)), (np.sin(a), -np.cos(a))))
+    rotations = rotation_stack(num_petals)
+    stack = np.concatenate((rotations, rotations @ mirror))
+    stack.setflags(write=False)
+    return stack
+
+
+@lru_cache(maxsize=64)
+def translation_stack(counts, vectors):
+    """
+    (prod(counts), 2) offsets k0 * v0 + k1 * v1 + ... for 0 <= ki < counts[i],
+    cached per (counts, vectors) tuple pair.
+    """
+    vectors = np.asarray(vectors, dtype=np.float64).reshape(len(counts), 2)
+    grids = np.meshgrid(*[np.arange(c) for c in counts], indexing="ij")
+    steps = np.stack([g.ravel() for g in grids], axis=1)
+    stack = steps @ vectors
+    stack.setflags(write=False)
+    return stack
+
+
 class MugguSymmetry:
+    """
+    Symmetry groups applied to paths in one batched operation.
+
+    Every method takes a path of shape (n_points, 2), or a batch of paths
+    (..., n_points, 2), and returns an array with one leading axis for the
+    group elements, e.g. (n_petals, n_points, 2).
+    """
+
     def __init__(self, center_point=(0, 0)):
-        self.center = np.array(center_point)
+        self.center = np.array(center_point, dtype=np.float64)
 
     def apply_radial_symmetry(self, path, num_petals):
         """
         Rotates a path evenly based on the number of petals requested.
         Design Principle: Radial Symmetry (360/n)
         """
-        path = np.array(path)
-        full_pattern = []
-        
-        # Calculate the angle for each petal
-        angles = np.linspace(0, 360, num_petals, endpoint=False)
-        
-        for angle in angles:
-            theta = np.radians(angle)
-            c, s = np.cos(theta), np.sin(theta)
-            R = np.array(((c, -s), (s, c)))
-            
-            # Rotate around center
-            rotated_path = (path - self.center) @ R.T + self.center
-            full_pattern.append(rotated_path)
-            
-        return full_pattern
\ No newline at end of file
+        return self._apply_linear(path, rotation_stack(int(num_petals)))
+
+    def apply_dihedral_symmetry(self, path, num_petals, axis=0.0):
+        """
+        Radial symmetry plus mirror images: the n rotations of the path, then
+        its reflection across the line through the center at 'axis' degrees,
+        rotated the same way. Returns (2 * num_petals, ..., n_points, 2).
+        """
+        return self._apply_linear(path, dihedral_stack(int(num_petals), float(axis)))
+
+    def apply_translational_symmetry(self, path, counts, vectors):
+        """
+        Repeats a path along lattice vectors: counts=(5,) with vectors=[(2, 0)]
+        makes a frieze of 5 copies, counts=(3, 4) with [(0, 2), (2, 0)] a 3x4
+        grid. Returns (prod(counts), ..., n_points, 2).
+        """
+        counts = tuple(int(c) for c in np.atleast_1d(counts))
+        vectors = tuple(map(tuple, np.asarray(vectors, dtype=np.float64).reshape(-1, 2)))
+        offsets = translation_stack(counts, vectors)
+        path = np.asarray(path, dtype=np.float64)
+        return path[None] + offsets.reshape((-1,) + (1,) * (path.ndim - 1) + (2,))
+
+    def _apply_linear(self, path, stack):
+        """
+        Applies every (2, 2) matrix of 'stack' about the center as one matrix
+        product: the stack is laid out as a (2, 2k) operand so all k copies
+        come out of a single GEMM.
+        """
+        rel = np.asarray(path, dtype=np.float64) - self.center
+        operand = stack.transpose(2, 0, 1).reshape(2, -1)
+        out = (rel @ operand).reshape(rel.shape[:-1] + (len(stack), 2))
+        out = np.moveaxis(out, -2, 0)
+        return np.add(out, self.center, out=np.empty(out.shape))
@@ -0,0 +1,111 @@
+import numpy as np
+
+_ONE, _HIGH = np.uint64(1), np.uint64(63)
+
+
+def zhang_suen_thinning(img):
+    """
+    Zhang-Suen thinning without opencv-contrib.
+    Rows are packed 64 pixels to a uint64 word and every sub-iteration decides
+    all pixels of a word at once with bitwise logic on the 8 neighbour planes.
+    Only rows next to a pixel removed since a sub-iteration last ran are
+    revisited: while they fill most of their span the whole band is updated
+    in place, once they thin out they are gathered on their own, so late
+    passes only touch the few rows still being peeled. Output matches
+    cv2.ximgproc.thinning (THINNING_ZHANGSUEN), including leaving border
+    pixels untouched. Returns a uint8 skeleton with values 0/255.
+    """
+    src = np.ascontiguousarray(np.asarray(img) > 0)
+    h, w = src.shape
+    if h < 3 or w < 3:
+        return src.astype(np.uint8) * np.uint8(255)
+
+    # Pixel x of a row is bit x % 64 of word x // 64
+    n_words = -(-w // 64)
+    packed = np.zeros((h, n_words * 8), dtype=np.uint8)
+    packed[:, :-(-w // 8)] = np.packbits(src, axis=1, bitorder="little")
+    words = packed.view(np.uint64)
+    columns = np.zeros(n_words * 64, dtype=bool)
+    columns[1:w - 1] = True
+    interior = np.packbits(columns, bitorder="little").view(np.uint64)
+    east, west = np.empty_like(words), np.empty_like(words)
+
+    # Rows each sub-iteration still has to visit; border rows never change
+    dirty = [np.zeros(h, dtype=bool), np.zeros(h, dtype=bool)]
+    dirty[0][1:-1] = dirty[1][1:-1] = True
+    step = 0
+    while dirty[0].any() or dirty[1].any():
+        rows = np.flatnonzero(dirty[step])
+        dirty[step][:] = False
+        if rows.size:
+            lo, hi = rows[0], rows[-1] + 1
+            if 2 * rows.size < hi - lo:
+                # Scattered rows: gather each with the rows above and below
+                stack = words[np.stack((rows - 1, rows, rows + 1))]
+                e, w_ = np.empty_like(stack), np.empty_like(stack)
+                _shift_into(stack, e, w_)
+                above, centre, below = stack
+                keep = _deletable(above, e[0], e[1], e[2], below, w_[2], w_[1], w_[0], step)
+                keep &= centre
+                keep &= interior
+                hit = keep.any(axis=1)
+                removed = rows[hit]
+                words[removed] = centre[hit] & ~keep[hit]
+            else:
+                band = words[lo - 1:hi + 1]
+                e, w_ = east[lo - 1:hi + 1], west[lo - 1:hi + 1]
+                _shift_into(band, e, w_)
+                centre = band[1:-1]
+                keep = _deletable(band[:-2], e[:-2], e[1:-1], e[2:], band[2:],
+                                  w_[2:], w_[1:-1], w_[:-2], step)
+                keep &= centre
+                keep &= interior
+                removed = np.flatnonzero(keep.any(axis=1)) + lo
+                centre &= ~keep
+            if removed.size:
+                # Removed pixels change the neighbourhoods one row either side
+                for d in dirty:
+                    d[removed - 1] = d[removed] = d[removed + 1] = True
+                    d[0] = d[-1] = False
+        step ^= 1
+
+    skeleton = np.unpackbits(packed, axis=1, count=w, bitorder="little")
+    return skeleton * np.uint8(255)
+
+
+def _shift_into(rows, east, west):
+    """Bit x of east/west = pixel x + 1 / x - 1 of the same row (0 past the ends)."""
+    np.right_shift(rows, _ONE, out=east)
+    east[..., :-1] |= rows[..., 1:] << _HIGH
+    np.left_shift(rows, _ONE, out=west)
+    west[..., 1:] |= rows[..., :-1] >> _HIGH
+
+
+def _deletable(n, ne, e, se, s, sw, w, nw, step):
+    """
+    Zhang-Suen deletion test on packed neighbour planes P2 (north) clockwise
+    to P9. A == 1 with 2 <= B <= 6 means the foreground neighbours form one
+    run round the pixel with two adjacent ones and two adjacent zeros in it;
+    the step decides which of the N/E/S/W products must vanish.
+    """
+    p = (n, ne, e, se, s, sw, w, nw)
+    pairs = np.zeros_like(n)     # some two adjacent neighbours are set
+    gapless = ~pairs             # no two adjacent neighbours are clear
+    once, twice = np.zeros_like(n), np.zeros_like(n)
+    both, t = np.empty_like(n), np.empty_like(n)
+    for k in range(8):
+        a, b = p[k], p[(k + 1) % 8]
+        np.bitwise_and(a, b, out=both)
+        pairs |= both
+        np.bitwise_or(a, b, out=t)
+        gapless &= t
+        np.bitwise_xor(b, both, out=t)   # 0 -> 1 transition from P(k+2) to P(k+3)
+        np.bitwise_and(once, t, out=both)
+        twice |= both
+        once |= t
+    keep = pairs & ~gapless & ~twice
+    if step == 0:
+        keep &= ~(e & s & (n | w))   # P2*P4*P6 == 0 and P4*P6*P8 == 0
+    else:
+        keep &= ~(n & w & (e | s))   # P2*P4*P8 == 0 and P2*P6*P8 == 0
+    return keep
@@ -0,0 +1,376 @@
+import os
+
+import cv2
+import numpy as np
+
+from core.config import VisionConfig
+from core.features import curvature_histogram
+from core.lattice import fit_lattice
+from core.vision import DOT_COLUMNS, AnalysisResult, MugguVision, style_label
+
+try:
+    import tifffile
+except ImportError:  # optional: only needed for TIFF input
+    tifffile = None
+
+# Longest side of the downsampled overview the palette is taken from
+OVERVIEW_SIDE = 1024
+
+
+class RegionReader:
+    """
+    Region-by-region access to a large BGR image without loading it whole.
+
+    Accepts an (h, w, 3) array or memmap, a .npy file, a raw interleaved BGR
+    file (shape required), or an uncompressed TIFF (located through the
+    optional tifffile package; TIFF data is RGB and is flipped to BGR per
+    region). Files are read row segment by row segment into a fresh tile
+    buffer rather than mapped, so pages of the source never pile up in the
+    process. Other formats fall back to cv2.imread, which loads the image whole.
+    """
+
+    def __init__(self, source, shape=None, dtype=np.uint8):
+        self._rgb = False
+        self._file = None
+        self.data = None
+        if isinstance(source, np.ndarray):
+            self.data = source if source.ndim == 3 else source[:, :, None]
+            shape, dtype = self.data.shape, self.data.dtype
+        else:
+            ext = os.path.splitext(str(source))[1].lower()
+            offset = 0
+            if ext == ".npy":
+                # Mapping only parses the header; no pixel pages are touched
+                header = np.load(source, mmap_mode="r")
+                shape, dtype, offset = header.shape, header.dtype, header.offset
+                if not header.flags.c_contiguous:
+                    raise ValueError(f"{source} is Fortran-ordered; save it in C order")
+                del header
+            elif ext in (".raw", ".bgr"):
+                if shape is None:
+                    raise ValueError("Raw input needs shape=(height, width, 3)")
+            elif ext in (".tif", ".tiff"):
+                if tifffile is None:
+                    raise ImportError("Reading TIFF scans by region needs 'pip install tifffile'")
+                with tifffile.TiffFile(source) as tif:
+                    page = tif.pages[0]
+                    contiguous = page.is_contiguous
+                    shape, dtype = page.shape, page.dtype
+                if not contiguous:
+                    raise ValueError(f"{source} is compressed or tiled and cannot be "
+                                     f"read by region; save it uncompressed")
+                offset = contiguous[0]
+                self._rgb = True
+            else:
+                data = cv2.imread(str(source))
+                if data is None:
+                    raise ValueError(f"Could not open image at {source}")
+                self.data = data
+                shape, dtype = data.shape, data.dtype
+            if self.data is None:
+                self._file = open(source, "rb")
+                self._offset = offset
+
+        shape = tuple(shape) if len(shape) == 3 else tuple(shape) + (1,)
+        if shape[2] not in (1, 3, 4):
+            raise ValueError(f"Expected an (h, w, 3) image, got shape {shape}")
+        self.shape = shape[:2]
+        self.channels = shape[2]
+        self.dtype = np.dtype(dtype)
+
+    def read(self, y0, y1, x0, x1):
+        """Contiguous BGR copy of rows y0:y1, columns x0:x1."""
+        if self._file is None:
+            return self._to_bgr(self.data[y0:y1, x0:x1])
+        out = np.empty((y1 - y0, x1 - x0, self.channels), dtype=self.dtype)
+        pixel = self.channels * self.dtype.itemsize
+        for i, y in enumerate(range(y0, y1)):
+            self._file.seek(self._offset + (y * self.shape[1] + x0) * pixel)
+            self._file.readinto(out[i])
+        return self._to_bgr(out)
+
+    def overview(self, max_side=OVERVIEW_SIDE):
+        """Strided (nearest-neighbour) thumbnail whose longest side is at most max_side."""
+        step = max(1, -(-max(self.shape) // max_side))
+        if self._file is None:
+            return self._to_bgr(self.data[::step, ::step])
+        rows = [self.read(y, y + 1, 0, self.shape[1])[:, ::step]
+                for y in range(0, self.shape[0], step)]
+        return np.concatenate(rows)
+
+    def _to_bgr(self, region):
+        region = np.ascontiguousarray(region)
+        if region.shape[2] == 1:
+            return cv2.cvtColor(region, cv2.COLOR_GRAY2BGR)
+        if region.shape[2] == 4:
+            code = cv2.COLOR_RGBA2BGR if self._rgb else cv2.COLOR_BGRA2BGR
+            return cv2.cvtColor(region, code)
+        return cv2.cvtColor(region, cv2.COLOR_RGB2BGR) if self._rgb else region
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class TiledAnalyzer:
+    """
+    Memory-bounded analyze_principles() for scans too large to hold in memory.
+
+    The image is read tile by tile with a 'halo' of context on every side and
+    each tile goes through MugguVision on its own, so peak memory follows the
+    tile size, not the image size. Results are stitched from the tile cores
+    (the part of each tile outside the halo):
+
+    - dots are kept by the tile whose core holds their centroid;
+    - endpoints, junctions and isolated pixels are skeleton-graph nodes
+      counted in the core where they lie (cut ends sit in the halo and drop);
+    - skeleton components are labelled per core and joined across tile seams
+      with union-find over the boundary rows and columns;
+    - the style uses each dot's distance to the skeleton inside its tile and
+      the turning-angle histogram of every core.
+
+    The halo must exceed the threshold block radius plus half the widest
+    stroke for the tiled skeleton to match a whole-image one. Pass
+    skeleton_out (a path or an (h, w) uint8 array/memmap) to keep the stitched
+    skeleton; it is written core by core.
+    """
+
+    def __init__(self, source, config=None, tile=2048, halo=64, shape=None,
+                 skeleton_out=None, **overrides):
+        self.reader = source if isinstance(source, RegionReader) else RegionReader(source, shape)
+        self.config = (config or VisionConfig()).replace(**overrides)
+        if self.config.max_side is not None:
+            raise ValueError("Tiled analysis runs at full resolution; max_side is not supported")
+        if halo < 1 or tile < 1:
+            raise ValueError("tile and halo must be positive")
+        self.tile = tile
+        self.halo = halo
+        self.skeleton_out = skeleton_out
+
+    def close(self):
+        self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open_skeleton_out(self):
+        if self.skeleton_out is None or isinstance(self.skeleton_out, np.ndarray):
+            return self.skeleton_out
+        return _NpyRowWriter(self.skeleton_out, self.reader.shape)
+
+    def tiles(self):
+        """(y0, y1, x0, x1) core rectangles in row-major order."""
+        h, w = self.reader.shape
+        for y0 in range(0, h, self.tile):
+            for x0 in range(0, w, self.tile):
+                yield y0, min(y0 + self.tile, h), x0, min(x0 + self.tile, w)
+
+    def run(self):
+        """Analyzes every tile and returns the stitched AnalysisResult."""
+        h, w = self.reader.shape
+        n_cols = -(-w // self.tile)
+        skeleton_out = self._open_skeleton_out()
+
+        dots, dot_distances = [], []
+        curvature_counts, line_samples = 0, 0
+        endpoints = junctions = isolated = 0
+        bad_crossings = 0
+        pixel_count = 0
+        uf = _UnionFind()
+        # Core labels (offset to global ids) along the last column of the
+        # previous tile, and along the bottom rows of the tile row above and
+        # of the current one (kept apart: the corner joins read the row
+        # above on both sides of the tile)
+        left_edge = None
+        above_edges = [None] * n_cols
+        row_edges = [None] * n_cols
+
+        for y0, y1, x0, x1 in self.tiles():
+            col = x0 // self.tile
+            if col == 0:
+                above_edges, row_edges = row_edges, [None] * n_cols
+            hy0, hy1 = max(y0 - self.halo, 0), min(y1 + self.halo, h)
+            hx0, hx1 = max(x0 - self.halo, 0), min(x1 + self.halo, w)
+            vision = MugguVision(self.reader.read(hy0, hy1, hx0, hx1), self.config)
+            core = (slice(y0 - hy0, y1 - hy0), slice(x0 - hx0, x1 - hx0))
+
+            # 1. Dots whose centroid falls in the core
+            tile_dots = vision.get_dot_table()
+            if len(tile_dots):
+                gx, gy = tile_dots[:, 0] + hx0, tile_dots[:, 1] + hy0
+                inside = (gx >= x0) & (gx < x1) & (gy >= y0) & (gy < y1)
+                dot_distances.append(vision.dot_distances(tile_dots[inside, :2]))
+                found = tile_dots[inside].copy()
+                found[:, 0], found[:, 1] = gx[inside], gy[inside]
+                dots.append(found)
+
+            # 2. Graph nodes inside the core
+            skeleton = vision.get_skeleton()
+            graph = vision.get_skeleton_graph()
+            if graph.n_nodes:
+                nx = graph.node_xy[:, 0] + hx0
+                ny = graph.node_xy[:, 1] + hy0
+                inside = (nx >= x0) & (nx < x1) & (ny >= y0) & (ny < y1)
+                degree = graph.node_degree[inside]
+                endpoints += int(np.count_nonzero(degree == 1))
+                isolated += int(np.count_nonzero(degree == 0))
+                junctions += int(np.count_nonzero(degree >= 3))
+                bad_crossings += int(np.count_nonzero((degree >= 3) & (degree != 4)))
+
+            # 3. Components of the core, joined to the left and upper neighbours
+            core_skel = np.ascontiguousarray(skeleton[core])
+            pixel_count += int(np.count_nonzero(core_skel))
+            fractions, samples = curvature_histogram(core_skel, self.config.curvature_step)
+            curvature_counts = curvature_counts + fractions * samples
+            line_samples += samples
+            n_lbl, labels = cv2.connectedComponents((core_skel > 0).astype(np.uint8),
+                                                    connectivity=8, ltype=cv2.CV_32S)
+            base = uf.add(n_lbl - 1) - 1
+            glabels = np.where(labels > 0, labels + base, -1)
+            if x0 > 0:
+                _join(uf, left_edge, glabels[:, 0])
+            if y0 > 0:
+                _join(uf, above_edges[col], glabels[0, :])
+                # Diagonal neighbours across tile corners
+                if x0 > 0:
+                    _join(uf, above_edges[col - 1][-1:], glabels[0, :1], diagonal=True)
+                if x1 < w:
+                    _join(uf, above_edges[col + 1][:1], glabels[0, -1:], diagonal=True)
+            left_edge = glabels[:, -1].copy()
+            row_edges[col] = glabels[-1, :].copy()
+
+            if skeleton_out is not None:
+                skeleton_out[y0:y1, x0:x1] = core_skel
+
+        if isinstance(skeleton_out, _NpyRowWriter):
+            # Hand back a lazy view of the written file
+            skeleton_out = skeleton_out.close()
+
+        components = uf.count()
+        is_sikku = (pixel_count > 0 and components == 1 and endpoints == 0
+                    and isolated == 0 and bad_crossings == 0)
+        topology = {
+            "is_closed_loop": endpoints == 0,
+            "endpoints_count": endpoints,
+            "has_content": pixel_count > 0,
+            "components": components,
+            "junctions": junctions,
+            "is_sikku": is_sikku,
+        }
+
+        table = (np.concatenate(dots) if dots
+                 else np.zeros((0, len(DOT_COLUMNS)), dtype=np.float32))
+        dots = table[:, :2]
+        distances = np.concatenate(dot_distances) if dot_distances else np.zeros(0)
+        straight = float(curvature_counts[0] / line_samples) if line_samples else 0.0
+        style = style_label(len(dots), distances.mean() if len(distances) else float("inf"),
+                            straight, line_samples, self.config)
+
+        lattice = fit_lattice(dots)
+        overview = MugguVision(self.reader.overview(), self.config)
+        palette = overview.get_palette_details()
+
+        principles = {
+            "Anchor Dot Grid (Chukkalu)": len(dots) >= 1,
+            "Single Continuous Line (Sikku)": is_sikku,
+            "Zero Endpoints Checks": endpoints == 0,
+            "Design Style": style,
+            "Detected Palette": list(palette["names"]),
+        }
+        return AnalysisResult(
+            principles=principles,
+            dots=dots,
+            skeleton=skeleton_out,
+            topology=topology,
+            style=style,
+            palette=list(palette["names"]),
+            palette_weights=list(palette["weights"]),
+            lattice=lattice.describe() if lattice is not None else None,
+            dot_table=table,
+        )
+
+
+class _NpyRowWriter:
+    """Writes tile cores into a new .npy file row segment by row segment."""
+
+    def __init__(self, path, shape):
+        mm = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=shape)
+        self._offset, self.shape = mm.offset, shape
+        del mm
+        self.path = path
+        self._file = open(path, "r+b")
+
+    def __setitem__(self, index, block):
+        rows, cols = index
+        block = np.ascontiguousarray(block, dtype=np.uint8)
+        for i, y in enumerate(range(rows.start, rows.stop)):
+            self._file.seek(self._offset + y * self.shape[1] + cols.start)
+            self._file.write(block[i])
+
+    def close(self):
+        self._file.close()
+        return np.load(self.path, mmap_mode="r")
+
+
+class _UnionFind:
+    """Array-backed union-find over component ids handed out in blocks."""
+
+    def __init__(self):
+        self.parent = np.zeros(0, dtype=np.int64)
+
+    def add(self, n):
+        """Adds n new ids and returns the first one."""
+        first = len(self.parent)
+        self.parent = np.concatenate((self.parent, np.arange(first, first + n)))
+        return first
+
+    def find(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        roots = self.parent[ids]
+        while True:
+            up = self.parent[roots]
+            if np.array_equal(up, roots):
+                break
+            roots = up
+        self.parent[ids] = roots  # path compression for the queried ids
+        return roots
+
+    def union(self, a, b):
+        # Repeat until every pair shares a root; each pass links roots pairwise
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        while len(a):
+            ra, rb = self.find(a), self.find(b)
+            differ = ra != rb
+            if not differ.any():
+                break
+            lo = np.minimum(ra[differ], rb[differ])
+            hi = np.maximum(ra[differ], rb[differ])
+            self.parent[hi] = lo
+            a, b = a[differ], b[differ]
+
+    def count(self):
+        if not len(self.parent):
+            return 0
+        return len(np.unique(self.find(np.arange(len(self.parent)))))
+
+
+def _join(uf, edge_a, edge_b, diagonal=False):
+    """
+    Unions labels of two facing pixel lines (previous tile's edge and the new
+    tile's edge) that touch under 8-connectivity. -1 marks background.
+    """
+    if edge_a is None or not len(edge_a):
+        return
+    if diagonal:
+        pairs = [(edge_a, edge_b)]
+    else:
+        # Straight across, plus one step either way along the seam
+        pairs = [(edge_a, edge_b), (edge_a[1:], edge_b[:-1]), (edge_a[:-1], edge_b[1:])]
+    for a, b in pairs:
+        touching = (a >= 0) & (b >= 0)
+        if touching.any():
+            uf.union(a[touching], b[touching])
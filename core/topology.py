@@ -0,0 +1,224 @@
+import cv2
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# 8-neighbourhood offsets (dy, dx)
+_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+_NEIGHBOUR_KERNEL = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=np.uint8)
+
+
+class SkeletonGraph:
+    """
+    Graph view of a 1-pixel skeleton, stored as flat arrays.
+
+    Nodes are clusters of skeleton pixels whose neighbour count is not 2
+    (endpoints, junctions, isolated pixels); clusters that merely sit on a line
+    (staircase corners) are dissolved into it. Edges are the pixel chains
+    between nodes; a chain that closes on itself without touching any node is
+    an edge with both ends set to -1 (a pure loop).
+
+    node_xy         (N, 2) float32  centroid (x, y) of each node
+    node_degree     (N,)   int32    number of edge ends meeting at the node
+    node_component  (N,)   int32    connected component of the node
+    edge_nodes      (E, 2) int32    node ids at both ends (-1 for pure loops)
+    edge_length     (E,)   int32    chain length in pixels
+    edge_component  (E,)   int32    connected component of the edge
+    edge_offsets    (E+1,) int64    edge e owns edge_pixels[offsets[e]:offsets[e+1]]
+    edge_pixels     (P, 2) int32    chain pixels (x, y), grouped by edge
+    """
+
+    def __init__(self, skeleton, crossing_tolerance=3):
+        """
+        crossing_tolerance: chains at most this many pixels long are folded
+        into the nodes they join. Thinning usually splits an X into two 3-way
+        junctions a pixel or two apart, and leaves 1-2 pixel corner loops.
+        """
+        skel = (np.asarray(skeleton) > 0).astype(np.uint8)
+        self.shape = skel.shape
+        self.crossing_tolerance = crossing_tolerance
+
+        # 1. Neighbour count per skeleton pixel (outside the image counts as empty)
+        count = cv2.filter2D(skel, -1, _NEIGHBOUR_KERNEL, borderType=cv2.BORDER_CONSTANT)
+        count *= skel
+        node_mask = (skel > 0) & (count != 2)
+        chain_mask = (skel > 0) & (count == 2)
+        self.pixel_count = int(np.count_nonzero(skel))
+        self.endpoint_pixels = int(np.count_nonzero(count == 1))
+
+        # 2. Label node clusters, chains and whole components (linear passes)
+        n_nodes, node_lbl, node_stats, node_centroids = cv2.connectedComponentsWithStats(
+            node_mask.astype(np.uint8), connectivity=8, ltype=cv2.CV_32S)
+        n_edges, edge_lbl = cv2.connectedComponents(
+            chain_mask.astype(np.uint8), connectivity=8, ltype=cv2.CV_32S)
+        n_comp, comp_lbl = cv2.connectedComponents(skel, connectivity=8, ltype=cv2.CV_32S)
+        n_nodes -= 1
+        n_edges -= 1
+        self.n_components = n_comp - 1
+
+        ys, xs = np.nonzero(chain_mask)
+        chain_edge = edge_lbl[ys, xs] - 1
+        nys, nxs = np.nonzero(node_mask)
+        pixel_node = node_lbl[nys, nxs] - 1
+
+        # 3. Edge/node incidences: a chain pixel has exactly two neighbours, so
+        #    every open chain touches node pixels exactly twice
+        h, w = self.shape
+        node_pad = np.zeros((h + 2, w + 2), dtype=np.int32)
+        node_pad[1:-1, 1:-1] = node_lbl
+        inc_edge, inc_node = [], []
+        for dy, dx in _OFFSETS:
+            touching = node_pad[ys + 1 + dy, xs + 1 + dx]
+            hit = touching > 0
+            inc_edge.append(chain_edge[hit])
+            inc_node.append(touching[hit] - 1)
+        inc_edge = np.concatenate(inc_edge)
+        inc_node = np.concatenate(inc_node)
+        edge_length = np.bincount(chain_edge, minlength=n_edges)
+        node_area = node_stats[1:, cv2.CC_STAT_AREA]
+
+        # 4. Drop short chains that leave and re-enter the same node (corner loops)
+        edge_nodes = _edge_ends(inc_edge, inc_node, n_edges)
+        a, b = edge_nodes[:, 0], edge_nodes[:, 1]
+        corner = (a >= 0) & (a == b) & (edge_length <= crossing_tolerance)
+        live = ~corner[inc_edge]
+        inc_edge, inc_node = inc_edge[live], inc_node[live]
+
+        # 5. Dissolve degree-2 node clusters (staircase corners) into the chain
+        #    they sit on: edges meeting at such a node become one edge
+        degree = np.bincount(inc_node, minlength=n_nodes)
+        passing = degree[inc_node] == 2
+        by_node = np.argsort(inc_node[passing], kind="stable")
+        pairs = inc_edge[passing][by_node].reshape(-1, 2)
+        _, edge_group = _components(pairs[:, 0], pairs[:, 1], n_edges)
+        dissolved = degree == 2
+        node_group = np.full(n_nodes, -1, dtype=np.int64)
+        node_group[inc_node[passing][by_node][::2]] = edge_group[pairs[:, 0]]
+
+        real = ~passing
+        inc_edge, inc_node = edge_group[inc_edge[real]], inc_node[real]
+        n_groups = int(edge_group.max()) + 1 if n_edges else 0
+        group_length = np.bincount(edge_group[~corner], weights=edge_length[~corner],
+                                   minlength=n_groups)
+        group_length += np.bincount(node_group[dissolved], weights=node_area[dissolved],
+                                    minlength=n_groups)
+        group_ends = _edge_ends(inc_edge, inc_node, n_groups)
+        group_alive = np.bincount(edge_group[~corner], minlength=n_groups) > 0
+
+        # 6. Fold chains no longer than crossing_tolerance into their end nodes;
+        #    this fuses split crossings and absorbs tiny spurs
+        a, b = group_ends[:, 0], group_ends[:, 1]
+        short = group_alive & (group_length <= crossing_tolerance) & (a >= 0) & (b >= 0)
+        keep_node = ~dissolved
+        n_merged, merged = _components(a[short], b[short], n_nodes)
+        # Renumber so only surviving (non-dissolved) nodes get ids
+        survivors = np.unique(merged[keep_node])
+        node_id = np.full(n_merged, -1, dtype=np.int64)
+        node_id[survivors] = np.arange(len(survivors))
+        node_map = np.where(keep_node, node_id[merged], -1)
+
+        area = np.where(keep_node, node_area, 0).astype(np.float64)
+        slot = np.maximum(node_map, 0)
+        weight = np.maximum(np.bincount(slot, weights=area, minlength=len(survivors)), 1)
+        self.node_xy = np.column_stack([
+            np.bincount(slot, weights=node_centroids[1:, i] * area, minlength=len(survivors))
+            / weight for i in range(2)]).astype(np.float32)
+
+        kept = np.flatnonzero(group_alive & ~short)
+        ends = group_ends[kept]
+        # A trailing -1 maps missing ends, and works when there are no nodes at
+        # all (a skeleton of pure loops, e.g. one ring)
+        self.edge_nodes = np.append(node_map, -1)[ends].astype(np.int32)
+        self.edge_length = group_length[kept].astype(np.int32)
+        self.node_degree = np.bincount(self.edge_nodes[self.edge_nodes >= 0],
+                                       minlength=len(survivors)).astype(np.int32)
+
+        # 7. Pixels of every kept edge (chain pixels plus dissolved nodes), CSR layout
+        # The extra trailing slot maps "no group" (-1) to "no edge"
+        edge_id = np.full(n_groups + 1, -1, dtype=np.int64)
+        edge_id[kept] = np.arange(len(kept))
+        px_edge = np.concatenate((
+            np.where(corner[chain_edge], -1, edge_id[edge_group[chain_edge]]),
+            edge_id[node_group[pixel_node]]))
+        px_x = np.concatenate((xs, nxs))
+        px_y = np.concatenate((ys, nys))
+        on_edge = px_edge >= 0
+        by_edge = np.argsort(px_edge[on_edge], kind="stable")
+        self.edge_pixels = np.column_stack(
+            (px_x[on_edge][by_edge], px_y[on_edge][by_edge])).astype(np.int32)
+        self.edge_offsets = np.zeros(len(kept) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(px_edge[on_edge], minlength=len(kept)),
+                  out=self.edge_offsets[1:])
+
+        # 8. Component id of every node and edge (any member pixel will do)
+        self.node_component = np.zeros(len(survivors), dtype=np.int32)
+        px_node = node_map[pixel_node]
+        self.node_component[px_node[px_node >= 0]] = comp_lbl[nys, nxs][px_node >= 0] - 1
+        self.edge_component = np.zeros(len(kept), dtype=np.int32)
+        self.edge_component[px_edge[on_edge]] = comp_lbl[px_y[on_edge], px_x[on_edge]] - 1
+
+    @property
+    def n_nodes(self):
+        return len(self.node_degree)
+
+    @property
+    def n_edges(self):
+        return len(self.edge_length)
+
+    @property
+    def endpoints(self):
+        """Node ids of line ends (degree 1)."""
+        return np.flatnonzero(self.node_degree == 1)
+
+    @property
+    def junctions(self):
+        """Node ids where three or more chain ends meet."""
+        return np.flatnonzero(self.node_degree >= 3)
+
+    @property
+    def loop_count(self):
+        """Independent cycles (cyclomatic number E - N + C); a pure loop counts its own node."""
+        pure = int(np.count_nonzero(self.edge_nodes[:, 0] < 0))
+        return int(self.n_edges - self.n_nodes - pure + self.n_components)
+
+    def edge_chain(self, e):
+        """(k, 2) pixel (x, y) array of edge e."""
+        return self.edge_pixels[self.edge_offsets[e]:self.edge_offsets[e + 1]]
+
+    def crossing_degrees(self):
+        """
+        Degree of every junction; a crossing of two strands has degree 4, and
+        crossings thinned into one node add 2 per extra strand (6, 8, ...).
+        """
+        return self.node_degree[self.junctions]
+
+    def is_single_closed_loop(self):
+        """
+        Sikku rule: one connected line, no loose ends, and every junction is
+        strands passing through (even degree), so the line can be drawn as
+        one closed stroke. An odd junction is a branch or a dead end.
+        """
+        if self.pixel_count == 0 or self.n_components != 1:
+            return False
+        if len(self.endpoints) or np.any(self.node_degree == 0):
+            return False
+        return bool(np.all(self.crossing_degrees() % 2 == 0))
+
+
+def _edge_ends(inc_edge, inc_node, n_edges):
+    """(n_edges, 2) node ids at the two ends of every edge, -1 where missing."""
+    order = np.argsort(inc_edge, kind="stable")
+    inc_edge, inc_node = inc_edge[order], inc_node[order]
+    count = np.bincount(inc_edge, minlength=n_edges)
+    first = np.searchsorted(inc_edge, np.arange(n_edges))
+    ends = np.full((n_edges, 2), -1, dtype=np.int64)
+    ends[count >= 1, 0] = inc_node[first[count >= 1]]
+    ends[count >= 2, 1] = inc_node[first[count >= 2] + 1]
+    return ends
+
+
+def _components(a, b, n):
+    """Connected components of n items linked pairwise by (a[i], b[i])."""
+    links = coo_matrix((np.ones(len(a)), (a, b)), shape=(n, n))
+    count, labels = connected_components(links, directed=False)
+    return count, labels.astype(np.int64)
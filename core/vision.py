@@ -1,153 +1,553 @@
+from dataclasses import dataclass
+
 import cv2
 import numpy as np
 
+from core.blobs import blob_components, measure_blobs
+from core.colors import get_color_table
+from core.config import VisionConfig
+from core.features import (CURVATURE_BINS, curvature_histogram, lattice_spacing,
+                           nearest_pixel_distance)
+from core.lattice import fit_lattice
+from core.palette import color_histogram, weighted_kmeans
+from core.thinning import zhang_suen_thinning
+from core.topology import SkeletonGraph
+
+# Bump when any stage changes its output, so cached results are not reused
+ANALYSIS_VERSION = 5
+
+# Columns of MugguVision.get_dot_table()
+DOT_COLUMNS = ("x", "y", "radius", "contrast")
+# Candidate dots per block when testing whether another blob's box encloses them
+_ENCLOSE_BATCH = 512
+# dot_distances scans a disc per dot until the discs add up to this share of
+# the image, then reads a distance transform instead
+_DISC_SCAN_LIMIT = 0.3
+
+
+def _boxes_enclosed(stats, ids):
+    """True for each blob in 'ids' whose bounding box lies strictly inside another's."""
+    x0, y0 = stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]
+    bw, bh = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+    x1, y1 = x0 + bw, y0 + bh
+    # Only boxes at least 2 px wider and taller than the smallest candidate can enclose one
+    big = np.flatnonzero((bw >= bw[ids].min() + 2) & (bh >= bh[ids].min() + 2))
+    big = big[big > 0][:, None]
+    out = np.zeros(len(ids), dtype=bool)
+    for start in range(0, len(ids), _ENCLOSE_BATCH):
+        c = ids[start:start + _ENCLOSE_BATCH]
+        out[start:start + _ENCLOSE_BATCH] = (
+            (x0[big] < x0[c]) & (y0[big] < y0[c])
+            & (x1[big] > x1[c]) & (y1[big] > y1[c])).any(axis=0)
+    return out
+
+
+def to_builtin(value):
+    """Converts numpy scalars/containers into JSON-friendly Python values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(v) for v in value]
+    if isinstance(value, dict):
+        return {k: to_builtin(v) for k, v in value.items()}
+    return value
+
+
+def line_mask(gray, config):
+    """Adaptive-threshold mask of the drawn lines (lines white) of a grayscale image."""
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY_INV, config.adaptive_block, config.adaptive_c)
+
+
+def close_lines(binary, config):
+    """Morphological closing that bridges small gaps in a line mask."""
+    size = config.close_kernel
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+    return cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=config.close_iterations)
+
+
+def skeletonize(binary, config):
+    """Bridges small gaps in a line mask and thins it to a 1-pixel skeleton."""
+    # 1. Morphological Closing to bridge gaps
+    closed = close_lines(binary, config)
+
+    # 2. Skeletonization
+    try:
+        # Check for ximgproc (opencv-contrib-python)
+        return cv2.ximgproc.thinning(closed, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN)
+    except AttributeError:
+        # Fallback for standard OpenCV: same Zhang-Suen result, no contrib needed
+        return zhang_suen_thinning(closed)
+
+
+def style_label(n_dots, mean_dot_distance, straight_fraction, line_samples, config):
+    """Style name from the classifier features (distances in full-resolution px)."""
+    if n_dots == 0 and line_samples == 0:
+        return "Unknown (No Dots)"
+    # Heuristic: dots sitting on the line (mean distance under the cutoff) -> Puli
+    if n_dots and mean_dot_distance < config.style_cutoff:
+        return "Puli Kolam (Dot-to-Dot)"
+    # Mostly straight strokes with the dots (if any) off them -> Padi
+    if line_samples and straight_fraction >= config.padi_straightness:
+        return "Padi Kolam (Geometric)"
+    if n_dots == 0:
+        return "Unknown (No Dots)"
+    if np.isinf(mean_dot_distance):
+        return "Unknown (No Lines)"
+    return "Sikku Kolam (Curved)"
+
+
+@dataclass
+class AnalysisResult:
+    """
+    Everything analyze_principles() computed for one image.
+    Callers read dots/skeleton from here instead of re-running the stages.
+    """
+    principles: dict
+    dots: np.ndarray               # float32 (N, 2) dot centres
+    skeleton: np.ndarray
+    topology: dict
+    style: str
+    palette: list
+    palette_weights: list = None
+    dot_mask: np.ndarray = None
+    contours: tuple = ()           # external contours of dot_mask
+    binary: np.ndarray = None
+    distance_transform: np.ndarray = None   # float32 px to the nearest skeleton pixel
+    graph: SkeletonGraph = None
+    style_features: dict = None
+    lattice: dict = None
+    dot_table: np.ndarray = None   # float32 (N, 4), columns DOT_COLUMNS
+
+
 class MugguVision:
-    def __init__(self, image_path):
-        self.image = cv2.imread(image_path)
-        if self.image is None:
-            raise ValueError(f"Could not open image at {image_path}")
-        # Convert to HSV for better color/brightness separation
-        self.hsv = cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV)
-        self.gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+    # Config fields each memoized intermediate depends on. Memo keys carry
+    # their values, so instances sharing one store only reuse an intermediate
+    # that was computed with the same settings.
+    _STAGE_PARAMS = {
+        "work_image": ("max_side",),
+        "hsv": ("max_side",),
+        "gray": ("max_side",),
+        "v_channel": ("max_side",),
+        "dot_mask": ("max_side", "dot_threshold", "dot_kernel"),
+        "contours": ("max_side", "dot_threshold", "dot_kernel"),
+        "dots": ("max_side", "dot_threshold", "dot_kernel", "dot_min_area", "dot_max_area"),
+        "binary": ("max_side", "adaptive_block", "adaptive_c"),
+        "skeleton": ("max_side", "adaptive_block", "adaptive_c", "close_kernel",
+                     "close_iterations"),
+        "palette": ("max_side", "background_distance", "colors"),
+        "color_coverage": ("max_side", "colors"),
+    }
+    for _derived in ("skeleton_points", "graph", "distance_transform"):
+        _STAGE_PARAMS[_derived] = _STAGE_PARAMS["skeleton"]
+    del _derived
+    _STAGE_PARAMS["curvature"] = _STAGE_PARAMS["skeleton"] + ("curvature_step",)
+    _STAGE_PARAMS["lattice"] = _STAGE_PARAMS["dots"]
 
-    def identify_chukkalu(self):
+    def __init__(self, image, config=None, shared=None, **overrides):
         """
-        Feature Extraction: Using HSV Color Segmentation and High-Intensity Thresholding 
-        to isolate 'Chukkalu' (dots).
+        image: a file path, an encoded image in memory (bytes, bytearray,
+        memoryview or a binary file object, e.g. an upload) or an already
+        decoded BGR array, which is used without copying.
+        config: VisionConfig with every threshold/kernel setting; keyword
+        overrides (e.g. max_side=1024) are applied on top of it.
+        shared: optional dict used as the memo store. Instances analysing the
+        same image with different configs can pass one dict to reuse every
+        intermediate whose settings agree.
+
+        With config.max_side set, the image is halved with a Gaussian pyramid
+        until its longest side fits, and dot detection and skeletonization run
+        at that working scale. Dot centroids are reported in full-resolution
+        coordinates regardless.
+        """
+        self.config = (config or VisionConfig()).replace(**overrides)
+        self.image = self._decode(image)
+        # Memoized intermediates (dot mask, contours, binary, skeleton, ...)
+        self._cache = shared if shared is not None else {}
+        self.work_image = self._memo(
+            "work_image", lambda: self._pyramid_down(self.image, self.config.max_side))
+        h, w = self.image.shape[:2]
+        wh, ww = self.work_image.shape[:2]
+        # Working/full ratio per axis (x, y); pyrDown rounds odd sizes up
+        self._scale_xy = np.array([ww / w, wh / h])
+        self.scale = float(self._scale_xy[0])
+        self.color_table = get_color_table(self.config.colors)
+
+    @staticmethod
+    def _decode(image):
+        """BGR array from a path, encoded bytes/buffer/file object or an array."""
+        if isinstance(image, np.ndarray):
+            if image.ndim == 2:
+                return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            if image.shape[2] == 4:
+                return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+            return image
+        if hasattr(image, "read"):
+            image = image.read()
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            # frombuffer wraps the caller's buffer; nothing is copied before decoding
+            decoded = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if decoded is None:
+                raise ValueError("Could not decode image buffer")
+            return decoded
+        decoded = cv2.imread(str(image))
+        if decoded is None:
+            raise ValueError(f"Could not open image at {image}")
+        return decoded
+
+    # Colour spaces are converted on first use only: palette-only callers never
+    # pay for HSV/gray, and dot detection needs just the V channel
+    @property
+    def hsv(self):
+        return self._memo("hsv", lambda: cv2.cvtColor(self.work_image, cv2.COLOR_BGR2HSV))
+
+    @property
+    def gray(self):
+        return self._memo("gray", lambda: cv2.cvtColor(self.work_image, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def v_channel(self):
+        """HSV value (max of B, G, R) as one contiguous array shared by every stage."""
+        def compute():
+            hsv = self._cache.get(self._key("hsv"))
+            if hsv is not None:
+                return cv2.extractChannel(hsv, 2)
+            img = self.work_image
+            return cv2.max(cv2.max(img[:, :, 0], img[:, :, 1]), img[:, :, 2])
+        return self._memo("v_channel", compute)
+
+    @staticmethod
+    def analysis_params(config=None, **overrides):
+        """
+        Every setting that affects analyze_principles(), as a JSON-friendly
+        dict. Available without decoding an image, so it can key cached results.
         """
+        config = (config or VisionConfig()).replace(**overrides)
+        table = get_color_table(config.colors)
+        params = config.as_dict()
+        params["version"] = ANALYSIS_VERSION
+        params["color_table"] = dict(zip(table.names, table.rgb.tolist()))
+        return params
+
+    @staticmethod
+    def _pyramid_down(image, max_side):
+        """Halves 'image' with pyrDown until max(h, w) <= max_side."""
+        if not max_side:
+            return image
+        level = image
+        while max(level.shape[:2]) > max_side and min(level.shape[:2]) > 1:
+            level = cv2.pyrDown(level)
+        return level
+
+    def to_full_frame(self, points):
+        """Maps (x, y) working-scale pixel coordinates to the full-resolution frame."""
+        points = np.asarray(points, dtype=np.float64)
+        return (points + 0.5) / self._scale_xy - 0.5
+
+    def to_work_frame(self, points):
+        """Maps full-resolution (x, y) coordinates to the working scale."""
+        points = np.asarray(points, dtype=np.float64)
+        return (points + 0.5) * self._scale_xy - 0.5
+
+    @classmethod
+    def stage_key(cls, config, name, *extra):
+        """Memo key: stage name plus the config values that stage depends on."""
+        return (name,) + tuple(getattr(config, f) for f in cls._STAGE_PARAMS[name]) + extra
+
+    def _key(self, name, *extra):
+        return self.stage_key(self.config, name, *extra)
+
+    def _memo(self, name, compute, *extra):
+        """Returns the cached intermediate 'name', computing it on first use."""
+        key = self._key(name, *extra)
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def get_dot_mask(self):
+        """High-intensity mask of candidate dots (V channel threshold + opening)."""
+        return self._memo("dot_mask", self._compute_dot_mask)
+
+    def _compute_dot_mask(self):
         # 1. Use V (Value) channel from HSV for intensity
-        v_channel = self.hsv[:, :, 2]
+        v_channel = self.v_channel
         
         # 2. High-Intensity Thresholding
         # Dots are usually the brightest part of the image
-        _, mask = cv2.threshold(v_channel, 200, 255, cv2.THRESH_BINARY)
+        _, mask = cv2.threshold(v_channel, self.config.dot_threshold, 255, cv2.THRESH_BINARY)
         
         # 3. Morphological cleanup to remove noise
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # 4. Contour detection
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (self.config.dot_kernel, self.config.dot_kernel))
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+
+    def get_dot_contours(self):
+        """External contours of the dot mask."""
+        def compute():
+            contours, _ = cv2.findContours(self.get_dot_mask(), cv2.RETR_EXTERNAL,
+                                           cv2.CHAIN_APPROX_SIMPLE)
+            return contours
+        return self._memo("contours", compute)
+
+    def identify_chukkalu(self):
+        """
+        Feature Extraction: Using HSV Color Segmentation and High-Intensity Thresholding 
+        to isolate 'Chukkalu' (dots).
+        Returns a float32 (N, 2) array of sub-pixel (x, y) dot centres in the
+        full-resolution frame (see get_dot_table for radius and contrast).
+        """
+        return self.get_dot_table()[:, :2]
+
+    def get_dot_table(self):
+        """
+        float32 (N, 4) table of the detected dots, columns DOT_COLUMNS:
+        sub-pixel centre (x, y) and radius in full-resolution pixels, and
+        contrast (mean V of the dot minus mean V of the ring around it).
+        """
+        return self._memo("dots", self._compute_dots)
+
+    def _compute_dots(self):
+        # 4. Connected components with stats: one pass labels every blob
+        mask = self.get_dot_mask()
+        n, labels, stats = blob_components(mask)
         
-        dots = []
-        for cnt in contours:
-            area = cv2.contourArea(cnt)
-            # Filter by area to distinguish dots from lines or noise
-            # Increased max area to 2000 to catch dots in larger/closer images (e.g. kolam4)
-            if 5 < area < 2000:  
-                M = cv2.moments(cnt)
-                if M["m00"] != 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    dots.append((cx, cy))
-        return dots
+        # Area limits are contour areas in full-resolution pixels; scale them to
+        # the working image. A blob's outer contour encloses between half its
+        # pixels and all of them, which rules most blobs out before measuring.
+        area_scale = self._scale_xy[0] * self._scale_xy[1]
+        min_area = self.config.dot_min_area * area_scale
+        max_area = self.config.dot_max_area * area_scale
+        pixels = stats[:, cv2.CC_STAT_AREA]
+        ids = np.flatnonzero((pixels > min_area) & (pixels / 2 - 1 < max_area))
+        ids = ids[ids > 0]  # label 0 is the background
+        if not len(ids):
+            return np.zeros((0, len(DOT_COLUMNS)), dtype=np.float32)
+
+        # 5. Intensity-weighted moments, boundary and surrounding ring per
+        #    blob; ring pixels only when another blob's box encloses a candidate
+        v = self.v_channel
+        enclosed = _boxes_enclosed(stats, ids)
+        m = measure_blobs(labels, stats, ids, v, ring_pixels=enclosed.any())
+
+        # Filter by area to distinguish dots from lines or noise. By Pick's
+        # theorem the contour through the boundary pixel centres encloses
+        # pixels - boundary / 2 - 1.
+        area = pixels[ids] - m["boundary"] / 2 - 1
+        keep = (area > min_area) & (area < max_area) & (m["m00"] > 0)
+
+        # Like external contours, skip blobs sitting in a hole of another blob:
+        # their ring never reaches the background connected to the image border
+        # (4-connected, the complement of the blobs' 8-connectivity)
+        enclosed &= keep
+        if enclosed.any():
+            _, holes = cv2.connectedComponents(cv2.bitwise_not(mask), connectivity=4,
+                                               ltype=cv2.CV_32S)
+            border = np.unique(np.concatenate((holes[0], holes[-1], holes[:, 0], holes[:, -1])))
+            open_bg = np.zeros(holes.max() + 1, dtype=bool)
+            open_bg[border[border > 0]] = True
+            reaches = open_bg[holes[m["ring_y"], m["ring_x"]]]
+            external = np.bincount(m["ring_id"], reaches, minlength=len(ids)) > 0
+            keep &= ~enclosed | external
+
+        # 6. Sub-pixel centre, radius and contrast (mean V of the blob minus
+        #    mean V of its ring) of the kept blobs
+        m00 = m["m00"][keep]
+        centres = np.column_stack((m["m10"][keep] / m00, m["m01"][keep] / m00))
+        mean_v = m00 / pixels[ids][keep]
+        ring_n = m["ring_n"][keep]
+        background = np.where(ring_n > 0, m["ring_sum"][keep] / np.maximum(ring_n, 1), mean_v)
+        radius = np.sqrt(pixels[ids][keep] / (np.pi * area_scale))
+        if self.scale != 1.0:
+            centres = self.to_full_frame(centres)
+        return np.column_stack((centres, radius, mean_v - background)).astype(np.float32)
+
+    def get_skeleton_points(self):
+        """(N, 2) float array of skeleton pixel (x, y) positions in the full-resolution frame."""
+        def compute():
+            ys, xs = np.nonzero(self.get_skeleton())
+            points = np.column_stack((xs, ys))
+            return self.to_full_frame(points) if self.scale != 1.0 else points.astype(np.float64)
+        return self._memo("skeleton_points", compute)
+
+    def get_binary(self):
+        """Adaptive-threshold line mask the skeleton is built from."""
+        # 1. Adaptive Thresholding for robust line detection
+        return self._memo("binary", lambda: line_mask(self.gray, self.config))
 
     def get_skeleton(self):
         """
         Structural Skeletonization: Converting hand-drawn or digital lines into a 
         1-pixel-wide mathematical 'skeleton'.
         """
-        # 1. Adaptive Thresholding for robust line detection
-        binary = cv2.adaptiveThreshold(self.gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                       cv2.THRESH_BINARY_INV, 11, 2)
-        
-        # 2. Morphological Closing to bridge gaps
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=2)
-        
-        # 3. Skeletonization
-        try:
-            # Check for ximgproc (opencv-contrib-python)
-            skeleton = cv2.ximgproc.thinning(closed, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN)
-        except AttributeError:
-            # Fallback for standard OpenCV
-            skeleton = self._skeletonize_morphological(closed)
-            
-        return skeleton
+        # 2. Closing + Zhang-Suen thinning of the line mask
+        return self._memo("skeleton", lambda: skeletonize(self.get_binary(), self.config))
 
-    def _skeletonize_morphological(self, img):
-        """Standard morphological skeletonization fallback."""
-        size = np.size(img)
-        skel = np.zeros(img.shape, np.uint8)
-        
-        element = cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
-        done = False
-        
-        while not done:
-            eroded = cv2.erode(img, element)
-            temp = cv2.dilate(eroded, element)
-            temp = cv2.subtract(img, temp)
-            skel = cv2.bitwise_or(skel, temp)
-            img = eroded.copy()
-            
-            zeros = size - cv2.countNonZero(img)
-            if zeros == size:
-                done = True
-        return skel
+    def get_skeleton_graph(self):
+        """Node/edge/component graph of the skeleton, built once and reused."""
+        return self._memo("graph", lambda: SkeletonGraph(self.get_skeleton()))
 
     def verify_sikku_topology(self, skeleton):
         """
-        Rule-Based Verification: Applying Topological Neighbor Counting to verify 
-        if a design follows the Sikku principle (single continuous closed loop).
+        Rule-Based Verification: Builds the skeleton graph (endpoints, junctions,
+        pixel chains, components) to verify if a design follows the Sikku
+        principle: one component, every junction strands crossing (even degree),
+        no endpoints.
         """
-        skel_bool = (skeleton > 0).astype(np.uint8)
-        
-        # Neighbor counting kernel
-        kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=np.uint8)
+        # Reuse the memoized graph when asked about our own skeleton
+        graph = self.get_skeleton_graph() if self._owns(skeleton) else SkeletonGraph(skeleton)
         
-        # Count neighbors for each pixel
-        neighbor_count = cv2.filter2D(skel_bool, -1, kernel)
-        neighbor_count = neighbor_count * skel_bool
-        
-        # Endpoints have exactly 1 neighbor
-        endpoints = np.sum(neighbor_count == 1)
+        # Endpoints are degree-1 nodes
+        endpoints = len(graph.endpoints)
         
         # Sikku Principle: A closed loop must have ZERO endpoints.
         is_closed_loop = (endpoints == 0)
-        has_content = np.sum(skel_bool) > 0
+        has_content = graph.pixel_count > 0
         
         return {
             "is_closed_loop": is_closed_loop,
             "endpoints_count": endpoints,
-            "has_content": has_content
+            "has_content": has_content,
+            "components": graph.n_components,
+            "junctions": len(graph.junctions),
+            "loops": graph.loop_count,
+            "is_sikku": graph.is_single_closed_loop()
         }
 
+    def get_lattice(self):
+        """
+        Dot grid model (core.lattice.Lattice) fitted to the detected Chukkalu,
+        or None when there are too few dots to form one.
+        """
+        return self._memo("lattice", lambda: fit_lattice(self.identify_chukkalu()))
+
     def classify_style(self, dots, skeleton):
         """
         Style Classifier: Distinguishes between Puli, Sikku, and Padi styles.
+        Puli lines run through the dots, Padi designs are built from straight
+        strokes (dots, if any, stay off them), and Sikku lines curve around
+        the dots.
         """
-        if not dots:
-            return "Unknown (No Dots)"
-        
-        # 1. Distance Transform from Skeleton
-        skel_inv = cv2.bitwise_not(skeleton)
-        dist_transform = cv2.distanceTransform(skel_inv, cv2.DIST_L2, 5)
-        
-        dot_distances = []
-        for dot in dots:
-            d = dist_transform[dot[1], dot[0]]
-            dot_distances.append(d)
-            
-        avg_dist = np.mean(dot_distances) if dot_distances else 0
-        
-        style = "Unknown"
-        
-        # Heuristic: If avg distance is very small (< 10 pixels), likely Puli.
-        if avg_dist < 12:
-            style = "Puli Kolam (Dot-to-Dot)"
+        distances = self.dot_distances(dots, skeleton)
+        mean = float(distances.mean()) if len(distances) else float("inf")
+        # Puli is decided by the distances alone; only the other rules need
+        # the curvature pass
+        if len(dots) and mean < self.config.style_cutoff:
+            return style_label(len(dots), mean, 0.0, 0, self.config)
+        curvature, samples = self._curvature_of(skeleton)
+        return style_label(len(dots), mean, float(curvature[0]), samples, self.config)
+
+    def _owns(self, skeleton):
+        """
+        True for None or for this image's memoized skeleton array itself. Any
+        other array, even an equal copy, is treated as new input: callers copy
+        to get a stable snapshot, and the memo store may hold a live buffer.
+        """
+        return skeleton is None or skeleton is self._cache.get(self._key("skeleton"))
+
+    def _curvature_of(self, skeleton):
+        """curvature_histogram of 'skeleton', memoized for our own."""
+        if self._owns(skeleton):
+            return self._memo("curvature", lambda: curvature_histogram(
+                self.get_skeleton(), self.config.curvature_step))
+        return curvature_histogram(skeleton, self.config.curvature_step)
+
+    def get_style_features(self, dots=None, skeleton=None):
+        """
+        Cheap descriptors behind classify_style; distances are in
+        full-resolution pixels.
+
+        mean/median_dot_distance  dot to nearest line pixel (inf without lines)
+        lattice_spacing           median nearest-neighbour dot distance
+        spacing_cv                its coefficient of variation (0 = regular grid)
+        loops, components, junctions
+                                  skeleton graph counts
+        curvature_histogram       share of turning angles per degree bin
+        straight_fraction         share of line samples turning < 15 degrees
+        """
+        dots = self.identify_chukkalu() if dots is None else dots
+        own = self._owns(skeleton)
+        skeleton = self.get_skeleton() if skeleton is None else skeleton
+
+        distances = self.dot_distances(dots, skeleton)
+        spacing, spacing_cv = lattice_spacing(dots)
+        graph = self.get_skeleton_graph() if own else SkeletonGraph(skeleton)
+        curvature, samples = self._curvature_of(skeleton)
+
+        edges = CURVATURE_BINS
+        return {
+            "dot_count": len(dots),
+            "mean_dot_distance": float(distances.mean()) if len(distances) else float("inf"),
+            "median_dot_distance": float(np.median(distances)) if len(distances) else float("inf"),
+            "lattice_spacing": spacing,
+            "spacing_cv": spacing_cv,
+            "loops": graph.loop_count,
+            "components": graph.n_components,
+            "junctions": len(graph.junctions),
+            "curvature_histogram": {f"{edges[i]}-{edges[i + 1]}": float(curvature[i])
+                                    for i in range(len(curvature))},
+            "straight_fraction": float(curvature[0]),
+            "line_samples": samples,
+        }
+
+    def dot_distances(self, dots, skeleton=None):
+        """Distance (full-resolution px) from every dot to the nearest skeleton pixel."""
+        skeleton = self.get_skeleton() if skeleton is None else skeleton
+        dots = np.asarray(dots, dtype=np.float64).reshape(-1, 2)
+        if not len(dots):
+            return np.zeros(0)
+
+        # Dots are full-resolution; the skeleton may live at the working scale
+        if skeleton.shape != self.image.shape[:2]:
+            dots = self.to_work_frame(dots)
+            px_scale = self.scale
         else:
-            style = "Sikku Kolam (Curved)"
-            
-        return style
+            px_scale = 1.0
+
+        # Clip so centroids on (or rounded past) the border stay indexable
+        h, w = skeleton.shape
+        xs = np.clip(np.rint(dots[:, 0]).astype(np.intp), 0, w - 1)
+        ys = np.clip(np.rint(dots[:, 1]).astype(np.intp), 0, h - 1)
+
+        # Search discs just past the cutoff; farther dots fall back to a KD-tree.
+        # With many dots the discs cover more than one distance transform costs.
+        radius = max(8, int(np.ceil(2 * self.config.style_cutoff * px_scale)))
+        if len(dots) * np.pi * radius ** 2 > _DISC_SCAN_LIMIT * skeleton.size:
+            dist = (self.get_distance_transform() if self._owns(skeleton)
+                    else self._distance_to(skeleton))
+            return dist[ys, xs].astype(np.float64) / px_scale
+        return nearest_pixel_distance(skeleton, xs, ys, radius) / px_scale
+
+    def get_distance_transform(self):
+        """Distance (px) from every pixel to the nearest skeleton pixel."""
+        return self._memo("distance_transform",
+                          lambda: self._distance_to(self.get_skeleton()))
 
-    def extract_color_palette(self, k=2):
+    @staticmethod
+    def _distance_to(skeleton):
+        skel_inv = cv2.bitwise_not(skeleton)
+        return cv2.distanceTransform(skel_inv, cv2.DIST_L2, 5)
+
+    def extract_color_palette(self, k=None):
         """
         Color Palette 'Mood' Extraction: K-Means Clustering on original colors.
         Ignores background color to find dominant *design* colors.
-        Returns Top 2 colors.
+        Returns Top 2 colors, most dominant first.
         """
+        return list(self.get_palette_details(k)["names"])
+
+    def get_palette_weights(self, k=None):
+        """Share of the design pixels held by each palette colour."""
+        return list(self.get_palette_details(k)["weights"])
+
+    def get_palette_details(self, k=None):
+        """Palette names, RGB centres and cluster weights (heaviest first)."""
+        k = k or self.config.palette_size
+        return self._memo("palette", lambda: self._compute_palette(k), k)
+
+    def _compute_palette(self, k):
         # Resize for speed
-        img_small = cv2.resize(self.image, (150, 150))
+        img_small = cv2.resize(self.work_image, (150, 150))
         img_rgb = cv2.cvtColor(img_small, cv2.COLOR_BGR2RGB)
         
         # Detect background color (median of 4 corners)
@@ -158,86 +558,83 @@ class MugguVision:
         ]
         bg_color = np.median(corners, axis=0) # [R, G, B]
         
-        pixels = img_rgb.reshape(-1, 3).astype(np.float32)
-        
-        # Filter out background pixels
-        # Calculate distance of each pixel to detected background
-        dist_to_bg = np.linalg.norm(pixels - bg_color, axis=1)
-        
-        # Threshold: exclude pixels very close to background (e.g., < 30 euclidean dist)
-        # Also exclude very dark pixels if BG is dark (Charcoal Black issue)
-        # But 'bg_color' logic covers generic background.
+        # Quantize into a weighted colour histogram; everything below works on
+        # the occupied bins instead of individual pixels
+        bins, counts = color_histogram(img_rgb)
         
-        non_bg_mask = dist_to_bg > 30 
-        content_pixels = pixels[non_bg_mask]
+        # Filter out background bins
+        # Threshold: exclude colours very close to background (e.g., < 30 euclidean dist)
+        dist_to_bg = np.linalg.norm(bins - bg_color, axis=1)
+        non_bg_mask = dist_to_bg > self.config.background_distance
         
         # If image is solid color or mask removed everything, fallback to original
-        if len(content_pixels) < 100:
-            content_pixels = pixels
+        if counts[non_bg_mask].sum() >= 100:
+            bins, counts = bins[non_bg_mask], counts[non_bg_mask]
 
-        # K-Means
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
+        # Weighted k-means++ with a fixed seed: same image, same palette
+        centers, weights = weighted_kmeans(bins, counts, k, seed=0)
+        dominant_colors = np.clip(np.rint(centers), 0, 255).astype(int)
         
-        # Handle case where we have fewer pixels than k centers
-        actual_k = min(k, len(content_pixels))
-        
-        if actual_k > 0:
-            _, labels, centers = cv2.kmeans(content_pixels, actual_k, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
-            dominant_colors = centers.astype(int)
-        else:
-            dominant_colors = []
-        
-        palette = []
-        for color in dominant_colors:
-            name = self._get_cultural_color_name(color)
-            palette.append(name)
+        # Name all centres in one vectorized lookup
+        palette = self.color_table.name_of(dominant_colors) if len(dominant_colors) else []
             
-        return palette
+        return {
+            "names": palette,
+            "rgb": dominant_colors.tolist(),
+            "weights": [float(w) for w in weights]
+        }
+
+    def get_color_coverage(self):
+        """Share of the (working-scale) image covered by each named cultural colour."""
+        def compute():
+            rgb = cv2.cvtColor(self.work_image, cv2.COLOR_BGR2RGB)
+            return self.color_table.coverage(rgb)
+        return dict(self._memo("color_coverage", compute))
 
     def _get_cultural_color_name(self, rgb):
         """Maps RGB to nearest Indian cultural color name."""
-        r, g, b = rgb
-        
-        # Simple Euclidean distance mapping to a predefined cultural palette
-        cultural_colors = {
-            "Kumkum Red": (180, 20, 20),
-            "Turmeric Yellow": (255, 200, 0),
-            "Rice Flour White": (240, 240, 240),
-            "Charcoal Black": (30, 30, 30),
-            "Leaf Green": (34, 139, 34),
-            "Sky Blue": (135, 206, 235),
-            "Magenta": (255, 0, 255),
-            "Saffron": (255, 153, 51),
-            "Mud Brown": (101, 67, 33),
-            "Deep Blue": (0, 50, 150)
-        }
-        
-        min_dist = float('inf')
-        closest_name = "Unknown"
-        
-        for name, ref_rgb in cultural_colors.items():
-            dist = np.sqrt((r - ref_rgb[0])**2 + (g - ref_rgb[1])**2 + (b - ref_rgb[2])**2)
-            if dist < min_dist:
-                min_dist = dist
-                closest_name = name
-                
-        return closest_name
+        return self.color_table.name_of([rgb])[0]
 
     def analyze_principles(self):
+        """
+        Single-pass analysis: every stage runs once and its intermediates are
+        shared through the memo store, then returned in an AnalysisResult.
+        """
         dots = self.identify_chukkalu()
         skel = self.get_skeleton()
         topology = self.verify_sikku_topology(skel)
         
-        style_label = self.classify_style(dots, skel)
+        features = self.get_style_features(dots, skel)
+        style = style_label(len(dots), features["mean_dot_distance"],
+                            features["straight_fraction"], features["line_samples"], self.config)
         palette = self.extract_color_palette()
+        lattice = self.get_lattice()
         
-        return {
+        principles = {
             "Anchor Dot Grid (Chukkalu)": len(dots) >= 1,
-            "Single Continuous Line (Sikku)": topology["is_closed_loop"] and topology["has_content"],
+            "Single Continuous Line (Sikku)": topology["is_sikku"],
             "Zero Endpoints Checks": topology["endpoints_count"] == 0,
-            "Design Style": style_label,
+            "Design Style": style,
             "Detected Palette": palette
         }
 
+        return AnalysisResult(
+            principles=principles,
+            dots=dots,
+            skeleton=skel,
+            topology=topology,
+            style=style,
+            palette=palette,
+            dot_mask=self.get_dot_mask(),
+            contours=self.get_dot_contours(),
+            binary=self.get_binary(),
+            distance_transform=self.get_distance_transform(),
+            graph=self.get_skeleton_graph(),
+            palette_weights=self.get_palette_weights(),
+            style_features=features,
+            lattice=lattice.describe() if lattice is not None else None,
+            dot_table=self.get_dot_table(),
+        )
+
     def get_edges(self):
         return self.get_skeleton()
\ No newline at end of file
@@ -7,7 +7,7 @@ def debug_dots(image_path):
     print(f"Debugging {image_path}...")
     vision = MugguVision(image_path)
     
-    v_channel = vision.hsv[:, :, 2]
+    v_channel = vision.v_channel
     print(f"Max V: {np.max(v_channel)}")
     print(f"Mean V: {np.mean(v_channel)}")
     
@@ -0,0 +1,80 @@
+"""
+Design catalogue builder: enumerates every distinct petal design for a grid
+size (up to rotation and mirroring of the grid) across a process pool and
+writes one JSONL row per design, keyed by its canonical hash.
+
+    python enumerate_designs.py 9 -o catalogue_9.jsonl
+    python enumerate_designs.py 11 --max-layers 3 --ladder 4,8 -j 8
+    python enumerate_designs.py 11 --render catalogue/ --limit 500
+
+Each row's layers can be turned back into a Design with
+core.catalogue.catalogue_design, or rendered directly with --render.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from core.catalogue import DesignSpace, catalogue_design, iter_catalogue
+from core.render import PALETTES, render_design
+
+
+def write_catalogue(space, output, workers=None, limit=None, render_dir=None, px=512,
+                    progress_every=100000):
+    """Streams the catalogue of 'space' to 'output' (JSONL); returns the number of designs."""
+    if render_dir:
+        os.makedirs(render_dir, exist_ok=True)
+    start = time.perf_counter()
+    count = 0
+    with open(output, "w") as f:
+        for count, (key, layers) in enumerate(islice(iter_catalogue(space, workers), limit), 1):
+            row = {"hash": key, "size": space.size,
+                   "layers": [dict(zip(("length", "width", "petals", "fill"), layer))
+                              for layer in layers]}
+            if render_dir:
+                design = catalogue_design(layers, space.size).with_colors(PALETTES[0])
+                row["path"] = os.path.join(render_dir, f"kolam_{key}.png")
+                render_design(design, row["path"], px=px)
+            f.write(json.dumps(row) + "\n")
+            if count % progress_every == 0:
+                rate = count / (time.perf_counter() - start)
+                print(f"  {count} designs ({rate:.0f}/s)")
+    print(f"{count} distinct designs in {time.perf_counter() - start:.1f}s -> {output}")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enumerate every distinct Kolam petal design")
+    parser.add_argument("size", type=int, help="dot grid size")
+    parser.add_argument("-o", "--output", default="catalogue.jsonl")
+    parser.add_argument("--min-layers", type=int, default=2)
+    parser.add_argument("--max-layers", type=int, default=4)
+    parser.add_argument("--width-step", type=float, default=0.5,
+                        help="petal width quantization, in dots")
+    parser.add_argument("--ladder", default="4,8,12,16",
+                        help="comma separated petal counts a layer may use")
+    parser.add_argument("--no-fill", action="store_true", help="outline-only layers")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many designs")
+    parser.add_argument("--render", default=None, metavar="DIR",
+                        help="also render every design to DIR as PNG")
+    parser.add_argument("--px", type=int, default=512, help="rendered image side in pixels")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    space = DesignSpace(
+        size=args.size,
+        min_layers=args.min_layers,
+        max_layers=args.max_layers,
+        width_step=args.width_step,
+        ladder=tuple(int(n) for n in args.ladder.split(",")),
+        fills=(False,) if args.no_fill else (False, True),
+    )
+    write_catalogue(space, args.output, args.workers, args.limit, args.render, args.px)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
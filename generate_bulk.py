@@ -0,0 +1,144 @@
+"""
+Headless bulk design generator: renders N seeded designs to PNG or SVG across
+a process pool, for building synthetic datasets. Each file is named by its
+seed and parameters, and a manifest.jsonl next to the images records every
+design's parameters.
+
+    python generate_bulk.py 100000 -o synthetic/ -j 8
+    python generate_bulk.py 50 --seed 1000 --format svg
+    python generate_bulk.py 1000 --kind sikku --size 9
+
+The same seed always yields the same design. Re-running into the same
+directory skips seeds the manifest records as rendered with the same kind,
+size, format and pixel size, as long as their image still exists.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+
+from core.render import (design_name, random_design, random_sikku, render_design,
+                         render_sikku, sikku_name)
+
+MANIFEST = "manifest.jsonl"
+
+
+def generate_one(seed, out_dir, size=11, fmt="png", px=512, kind="petal"):
+    """Pool task: renders the design for 'seed' and returns its manifest row (never raises)."""
+    start = time.perf_counter()
+    try:
+        if kind == "sikku":
+            sikku = random_sikku(size, seed)
+            path = os.path.join(out_dir, f"{sikku_name(seed, sikku)}.{fmt}")
+            render_sikku(sikku, path, px=px)
+            gates = np.concatenate((sikku.h_gates.ravel(), sikku.v_gates.ravel()))
+            details = {"gates": dict(zip(("cross", "wall", "bridge"),
+                                         np.bincount(gates, minlength=3).tolist()))}
+        else:
+            design = random_design(size, seed)
+            path = os.path.join(out_dir, f"{design_name(seed, design)}.{fmt}")
+            render_design(design, path, px=px)
+            details = {"layers": [{k: v for k, v in layer.items() if k != 'path'}
+                                  for layer in design]}
+        return {
+            "seed": seed,
+            "kind": kind,
+            "path": path,
+            "size": size,
+            "format": fmt,
+            "px": px,
+            **details,
+            "seconds": round(time.perf_counter() - start, 4),
+            "error": "",
+        }
+    except Exception as e:
+        return {"seed": seed, "path": "", "seconds": round(time.perf_counter() - start, 4),
+                "error": f"{type(e).__name__}: {e}"}
+
+
+def rendered_seeds(out_dir, size=11, fmt="png", px=512, kind="petal"):
+    """
+    Seeds whose latest manifest row in 'out_dir' has these settings and whose
+    image still exists. A partial last row left by an interrupted run is cut
+    off so the next row starts on a line of its own.
+    """
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+
+    # A file re-rendered with other settings is described by its last row
+    latest = {}
+    for line in data[:end].splitlines():
+        if line.strip():
+            row = json.loads(line)
+            if row.get("path"):
+                latest[os.path.basename(row["path"])] = row
+    settings = {"kind": kind, "size": size, "format": fmt, "px": px}
+    return {row["seed"] for name, row in latest.items()
+            if not row["error"] and all(row.get(k) == v for k, v in settings.items())
+            and os.path.exists(os.path.join(out_dir, name))}
+
+
+def run_bulk(count, out_dir, start_seed=0, size=11, fmt="png", px=512, workers=None,
+             chunksize=16, progress_every=1000, kind="petal"):
+    os.makedirs(out_dir, exist_ok=True)
+    done = rendered_seeds(out_dir, size, fmt, px, kind)
+    todo = [s for s in range(start_seed, start_seed + count) if s not in done]
+    print(f"{count} designs requested, {count - len(todo)} already rendered, "
+          f"{len(todo)} to render.")
+    if not todo:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    task = partial(generate_one, out_dir=out_dir, size=size, fmt=fmt, px=px, kind=kind)
+    failures = 0
+    start = time.perf_counter()
+    with open(os.path.join(out_dir, MANIFEST), "a") as manifest, \
+            Pool(processes=workers) as pool:
+        for i, row in enumerate(pool.imap_unordered(task, todo, chunksize), 1):
+            # Flushed per row: resuming trusts the manifest, not the images
+            manifest.write(json.dumps(row) + "\n")
+            manifest.flush()
+            if row["error"]:
+                failures += 1
+            if i % progress_every == 0 or i == len(todo):
+                rate = i / (time.perf_counter() - start)
+                print(f"  {i}/{len(todo)} rendered ({rate:.1f} designs/s, {failures} failed)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk Kolam design generator")
+    parser.add_argument("count", type=int, help="number of designs to render")
+    parser.add_argument("-o", "--output", default="designs",
+                        help="output directory (images + manifest.jsonl)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="first seed; designs use seeds seed .. seed+count-1")
+    parser.add_argument("--size", type=int, default=11, help="dot grid size")
+    parser.add_argument("--kind", choices=("petal", "sikku"), default="petal",
+                        help="radial petal designs or single-line Sikku kolams")
+    parser.add_argument("--format", choices=("png", "svg"), default="png")
+    parser.add_argument("--px", type=int, default=512, help="image side in pixels")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="designs handed to a worker at a time")
+    args = parser.parse_args(argv)
+
+    failures = run_bulk(args.count, args.output, args.seed, args.size, args.format,
+                        args.px, args.workers, args.chunksize, kind=args.kind)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,8 @@ import numpy as np
 import random
 import tkinter as tk
 from tkinter import messagebox, filedialog
-from core.grid import KolamEngine
-from core.symmetry import MugguSymmetry
-from core.generator import CurveGenerator, HeritageGenerator
+from core.generator import HeritageGenerator
+from core.render import PALETTES, draw_design
 from core.vision import MugguVision
 
 # --- THEME DEFINITION ---
@@ -27,19 +26,7 @@ from matplotlib.widgets import Button
 # --- MODULE 1: YOUR DESIGN GENERATOR ---
 def run_generator():
     SIZE = 11 
-    CENTER = SIZE // 2 
-    engine = KolamEngine(size=SIZE)
-    
     heritage = HeritageGenerator(size=SIZE)
-    smoother = CurveGenerator()
-    sym = MugguSymmetry(center_point=(CENTER, CENTER))
-    
-    palettes = [
-        ['#D32F2F', '#FFC107', '#1976D2'], 
-        ['#8E24AA', '#00ACC1', "#7094E9"], 
-        ["#388E3C", "#8BC34A", "#CDDC39"], # Greenery
-        ["#F57C00", "#FFB74D", "#FF9800"], # Sunset
-    ]
 
     # Create figure only once
     fig, ax = plt.subplots(figsize=(8,8), facecolor=THEME["bg"]) 
@@ -49,25 +36,10 @@ def run_generator():
         ax.clear()
         ax.set_facecolor(THEME["bg"])
         
-        # 1. Background Grid
-        dots_x, dots_y = engine._generate_square_grid() 
-        ax.scatter(dots_x, dots_y, c=THEME["text_light"], s=20, zorder=1, alpha=0.4)
-        
-        # 2. Design
-        current_colors = random.choice(palettes)
-        design = heritage.get_varied_petal_layers()
-        
-        for i, layer in enumerate(design):
-            curvy = smoother.smooth_path(layer['path'])
-            rotations = sym.apply_radial_symmetry(curvy, num_petals=layer['petals'])
-            color = current_colors[i % len(current_colors)]
-            for part in rotations:
-                if layer['fill']:
-                    ax.fill(part[:, 0], part[:, 1], color=color, alpha=0.2, zorder=i+2)
-                ax.plot(part[:, 0], part[:, 1], color=color, lw=2.5, zorder=i+3)
-
-        ax.axis('off')
-        ax.set_aspect('equal')
+        # Background grid and design (see core.render)
+        design = heritage.get_varied_petal_layers().with_colors(random.choice(PALETTES))
+        draw_design(ax, design, dot_color=THEME["text_light"])
+
         ax.set_title(" Loop & Bloom Generator ", color=THEME["fg"], 
                   fontsize=18, fontname="Georgia", pad=10)
         plt.draw()
@@ -96,12 +68,13 @@ def run_analyzer(image_path):
     try:
         vision = MugguVision(image_path)
 
-        # 1. Principles check now runs identify_chukkalu and get_skeleton internally
-        principles = vision.analyze_principles()
+        # 1. Single pass: dots and skeleton come back with the principles check
+        result = vision.analyze_principles()
+        principles = result.principles
         
-        # 2. We still want these for the visual subplots
-        dots = vision.identify_chukkalu() 
-        edges = vision.get_edges()
+        # 2. Reuse them for the visual subplots instead of recomputing
+        dots = result.dots
+        edges = result.skeleton
 
         # --- Visualization ---
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 7.5), facecolor=THEME["bg"])
@@ -113,13 +86,15 @@ def run_analyzer(image_path):
         ax1.set_title("1. Feature Extraction", color=THEME["fg"], fontsize=12, fontweight="bold", fontname="Georgia")
         ax1.axis("off")
 
-        # Display the edges/skeleton on the right
-        ax2.imshow(edges, cmap="gray")
+        # Display the edges/skeleton on the right, stretched over the full-resolution
+        # frame so dot coordinates line up even when analysis ran at a smaller scale
+        h, w = vision.image.shape[:2]
+        ax2.imshow(edges, cmap="gray", extent=(-0.5, w - 0.5, h - 0.5, -0.5))
         ax2.set_title("2. Structural Skeleton & Dots", color=THEME["fg"], fontsize=12, fontweight="bold", fontname="Georgia")
         ax2.axis("off")
         
         # HIGHLIGHT DETECTED DOTS
-        if dots:
+        if len(dots):
             dots_np = np.array(dots)
             # Scatter plot on top of skeleton (ax2)
             # x is col (0), y is row (1)
@@ -0,0 +1,75 @@
+"""
+Streaming analyzer for kolam drawing videos and live cameras: prints (or
+writes as JSONL) the principle results of every frame, then a latency report
+against the per-frame budget.
+
+    python stream_analyze.py drawing.mp4 -o frames.jsonl
+    python stream_analyze.py 0 --max-side 640          # first camera
+"""
+import argparse
+import json
+import sys
+
+from batch_analyze import load_config
+from core.stream import FrameSource, StreamingAnalyzer
+from core.vision import to_builtin
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming Muggu / Kolam analyzer")
+    parser.add_argument("source", help="video file, stream URL or camera index")
+    parser.add_argument("-o", "--output", default=None,
+                        help="JSONL file for per-frame results (default: print changes)")
+    parser.add_argument("--config", default=None,
+                        help="JSON file of VisionConfig settings (see sweep.py)")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="analyze at a pyramid level whose longest side fits this size")
+    parser.add_argument("--tile", type=int, default=64, help="change-detection tile size (px)")
+    parser.add_argument("--budget-ms", type=float, default=1000 / 30,
+                        help="per-frame latency budget for the report")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    config = load_config(args.config)
+    if args.max_side:
+        config = config.replace(max_side=args.max_side)
+    analyzer = StreamingAnalyzer(config, tile=args.tile, budget_ms=args.budget_ms)
+
+    out = open(args.output, "w") if args.output else None
+    last = None
+    try:
+        with FrameSource(source) as frames:
+            for result in analyzer.run(frames, args.max_frames):
+                row = to_builtin({
+                    "frame": result.index,
+                    "dots": len(result.dots),
+                    "sikku": result.principles["Single Continuous Line (Sikku)"],
+                    "endpoints": result.topology["endpoints_count"],
+                    "style": result.style,
+                    "palette": result.palette,
+                    "error": result.topology.get("error", ""),
+                    "changed_tiles": result.changed_tiles,
+                    "latency_ms": round(result.latency_ms, 2),
+                })
+                if out is not None:
+                    out.write(json.dumps(row) + "\n")
+                else:
+                    summary = {k: v for k, v in row.items()
+                               if k not in ("frame", "changed_tiles", "latency_ms")}
+                    if summary != last:
+                        print(row)
+                    last = summary
+    except KeyboardInterrupt:
+        pass
+    finally:
+        analyzer.close()
+        if out is not None:
+            out.close()
+
+    print(StreamingAnalyzer.format_report(analyzer.report()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
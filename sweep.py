@@ -0,0 +1,281 @@
+"""
+Parameter sweep for the vision pipeline: evaluates every VisionConfig of a grid
+against a labelled image set and ranks them.
+
+    python sweep.py labels.csv --param dot_threshold=180,200,220 \\
+        --param adaptive_block=9,11,15 -o sweep.csv --best best.json
+    python sweep.py labels.jsonl --grid grid.json --max-side 1024
+
+The labels file is a CSV with a 'path' column or JSONL with a "path" key, plus
+any of 'dots' (expected dot count), 'style' (e.g. "puli", matched against the
+predicted style name) and 'sikku' (true/false). A grid file maps config fields
+to lists of values.
+
+Each worker decodes an image once and runs every config on it through one
+shared intermediate store. Configs are ordered so the expensive stages
+(skeleton, then dots) change least often, and an intermediate is dropped as
+soon as no later config needs it. The best config can be fed back to
+batch_analyze.py --config.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import fields
+from functools import partial
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+from batch_analyze import load_config
+from core.config import VisionConfig
+from core.vision import MugguVision
+
+# Fields ordered from the most to the least expensive stage they feed; any
+# VisionConfig field not named here still takes part, after the listed ones
+SORT_FIELDS = [
+    "max_side", "adaptive_block", "adaptive_c", "close_kernel", "close_iterations",
+    "curvature_step", "dot_threshold", "dot_kernel", "dot_min_area", "dot_max_area",
+    "colors", "background_distance", "palette_size", "style_cutoff", "padi_straightness",
+]
+SORT_FIELDS += [f.name for f in fields(VisionConfig) if f.name not in SORT_FIELDS]
+
+METRIC_FIELDS = ["rank", "dot_mae", "style_acc", "sikku_acc", "seconds", "errors"]
+
+
+# --------------------------------------------------
+# INPUTS
+# --------------------------------------------------
+def _parse_bool(text):
+    return str(text).strip().lower() in ("1", "true", "yes", "y")
+
+
+def read_labels(path):
+    """Labelled images as dicts with 'path' and optional 'dots', 'style', 'sikku'."""
+    base = os.path.dirname(path)
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    labels = []
+    for row in rows:
+        if not row.get("path"):
+            continue
+        label = {"path": row["path"] if os.path.isabs(row["path"])
+                 else os.path.join(base, row["path"])}
+        if row.get("dots") not in (None, ""):
+            label["dots"] = int(row["dots"])
+        if row.get("style"):
+            label["style"] = str(row["style"]).strip().lower()
+        if row.get("sikku") not in (None, ""):
+            label["sikku"] = row["sikku"] if isinstance(row["sikku"], bool) \
+                else _parse_bool(row["sikku"])
+        labels.append(label)
+    return labels
+
+
+def _parse_value(text):
+    """'200' -> 200, '2.5' -> 2.5, 'null' -> None, anything else stays a string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_param(spec):
+    """'field=v1,v2,...' -> (field, [values])."""
+    name, sep, values = spec.partition("=")
+    if not sep or not values:
+        raise ValueError(f"Expected field=v1,v2,... but got '{spec}'")
+    return name.strip(), [_parse_value(v.strip()) for v in values.split(",")]
+
+
+def build_grid(base, grid):
+    """Every combination of the grid values applied to 'base', in evaluation order."""
+    known = {f.name for f in fields(VisionConfig)}
+    unknown = set(grid) - known
+    if unknown:
+        raise ValueError(f"Unknown VisionConfig fields: {', '.join(sorted(unknown))}")
+
+    names = list(grid)
+    configs = {base.replace(**dict(zip(names, combo)))
+               for combo in itertools.product(*(grid[n] for n in names))}
+    return sorted(configs, key=lambda c: [(getattr(c, f) is not None, getattr(c, f))
+                                         for f in SORT_FIELDS])
+
+
+# --------------------------------------------------
+# WORKER
+# --------------------------------------------------
+def _last_uses(configs):
+    """Index of the last config needing each memoized intermediate."""
+    last = {}
+    for i, config in enumerate(configs):
+        for name in MugguVision._STAGE_PARAMS:
+            extra = (config.palette_size,) if name == "palette" else ()
+            last[MugguVision.stage_key(config, name, *extra)] = i
+    return last
+
+
+def _init_worker():
+    # One OpenCV thread per process, as in batch_analyze
+    cv2.setNumThreads(1)
+
+
+def evaluate_image(label, configs):
+    """
+    Pool task: runs every config on one image. Returns (label, predictions),
+    one (dots, style, sikku, seconds, error) tuple per config.
+    """
+    image = cv2.imread(label["path"])
+    if image is None:
+        error = f"Could not open image at {label['path']}"
+        return label, [(None, None, None, 0.0, error)] * len(configs)
+
+    shared = {}
+    last_use = _last_uses(configs)
+    predictions = []
+    for i, config in enumerate(configs):
+        start = time.perf_counter()
+        try:
+            result = MugguVision(image, config, shared).analyze_principles()
+            predictions.append((len(result.dots), result.style,
+                                bool(result.topology["is_sikku"]),
+                                time.perf_counter() - start, ""))
+        except Exception as e:
+            predictions.append((None, None, None, time.perf_counter() - start,
+                                f"{type(e).__name__}: {e}"))
+        # Free intermediates no later config will ask for
+        for key in [k for k in shared if last_use.get(k, -1) <= i]:
+            del shared[key]
+    return label, predictions
+
+
+# --------------------------------------------------
+# SCORING
+# --------------------------------------------------
+def score(configs, evaluations):
+    """One metrics row per config: dot count error, style/sikku accuracy, time."""
+    n = len(configs)
+    dot_err = [[] for _ in range(n)]
+    style_hit = [[] for _ in range(n)]
+    sikku_hit = [[] for _ in range(n)]
+    seconds = np.zeros(n)
+    errors = np.zeros(n, dtype=int)
+
+    for label, predictions in evaluations:
+        for i, (dots, style, sikku, elapsed, error) in enumerate(predictions):
+            seconds[i] += elapsed
+            if error:
+                errors[i] += 1
+                continue
+            if "dots" in label:
+                dot_err[i].append(abs(dots - label["dots"]))
+            if "style" in label:
+                style_hit[i].append(label["style"] in style.lower())
+            if "sikku" in label:
+                sikku_hit[i].append(sikku == label["sikku"])
+
+    def mean(values):
+        return round(float(np.mean(values)), 4) if values else None
+
+    rows = []
+    for i, config in enumerate(configs):
+        row = config.as_dict()
+        row.update(dot_mae=mean(dot_err[i]), style_acc=mean(style_hit[i]),
+                   sikku_acc=mean(sikku_hit[i]), seconds=round(float(seconds[i]), 4),
+                   errors=int(errors[i]))
+        rows.append(row)
+
+    # Fewest failures, then best accuracies, then smallest dot error, then fastest
+    def rank_key(row):
+        return (row["errors"],
+                -(row["style_acc"] or 0), -(row["sikku_acc"] or 0),
+                row["dot_mae"] if row["dot_mae"] is not None else float("inf"),
+                row["seconds"])
+
+    rows.sort(key=rank_key)
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def run_sweep(labels_path, grid, output_path="sweep.csv", base=None, workers=None,
+              best_path=None):
+    labels = read_labels(labels_path)
+    configs = build_grid(base or VisionConfig(), grid)
+    print(f"{len(labels)} labelled images x {len(configs)} configs")
+    if not labels or not configs:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(labels))
+    task = partial(evaluate_image, configs=configs)
+    start = time.perf_counter()
+    evaluations = []
+    with Pool(processes=workers, initializer=_init_worker) as pool:
+        for i, evaluation in enumerate(pool.imap_unordered(task, labels), 1):
+            evaluations.append(evaluation)
+            print(f"  {i}/{len(labels)} images ({time.perf_counter() - start:.1f}s)")
+
+    rows = score(configs, evaluations)
+    columns = METRIC_FIELDS + [f.name for f in fields(VisionConfig)]
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    best = rows[0]
+    varied = {name: best[name] for name in grid}
+    print(f"Best: {varied}  dot_mae={best['dot_mae']} style_acc={best['style_acc']} "
+          f"sikku_acc={best['sikku_acc']} errors={best['errors']}")
+    if best_path:
+        with open(best_path, "w") as f:
+            json.dump({f.name: best[f.name] for f in fields(VisionConfig)}, f, indent=2)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grid search over VisionConfig settings")
+    parser.add_argument("labels", help="labelled image list (.csv or .jsonl)")
+    parser.add_argument("--param", action="append", default=[], metavar="FIELD=V1,V2",
+                        help="values to try for one config field (repeatable)")
+    parser.add_argument("--grid", default=None,
+                        help="JSON file mapping config fields to lists of values")
+    parser.add_argument("--base", default=None,
+                        help="JSON config the grid values are applied on top of")
+    parser.add_argument("--max-side", type=int, default=None,
+                        help="shorthand for --param max_side=N")
+    parser.add_argument("-o", "--output", default="sweep.csv",
+                        help="ranked results, one row per config")
+    parser.add_argument("--best", default=None,
+                        help="write the best config as JSON (for batch_analyze.py --config)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    for spec in args.param:
+        name, values = parse_param(spec)
+        grid[name] = values
+    if args.max_side:
+        grid["max_side"] = [args.max_side]
+
+    rows = run_sweep(args.labels, grid, args.output, load_config(args.base),
+                     args.workers, args.best)
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
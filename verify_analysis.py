@@ -1,56 +1,46 @@
-import matplotlib.pyplot as plt
 import cv2
+import itertools
 import numpy as np
 import os
+import sys
+import threading
+import time
+from core.catalogue import DesignCatalogue, DesignSpace
+from core.generator import HeritageGenerator
 from core.grid import KolamEngine
-from core.symmetry import MugguSymmetry
-from core.generator import CurveGenerator, HeritageGenerator
-from core.vision import MugguVision
-
-def generate_sample_kolam(output_path="sample_kolam.png"):
-    print(f"Generating sample Kolam to {output_path}...")
-    SIZE = 11 
-    CENTER = SIZE // 2 
-    engine = KolamEngine(size=SIZE)
-    dots_x, dots_y = engine._generate_square_grid() 
-
-    heritage = HeritageGenerator(size=SIZE)
-    smoother = CurveGenerator()
-    sym = MugguSymmetry(center_point=(CENTER, CENTER))
-
-    # Single color for simplicity in verification
-    color = '#D32F2F'
-
-    # Create figure without borders for cleaner image analysis
-    fig, ax = plt.subplots(figsize=(6,6), facecolor='white') 
-    ax.set_facecolor('white')
-    ax.set_facecolor('black')
-    
-    # Bright White Dots
-    ax.scatter(dots_x, dots_y, c='white', s=50, zorder=1) 
-
-    design = heritage.get_varied_petal_layers()
-    for i, layer in enumerate(design):
-        curvy = smoother.smooth_path(layer['path'])
-        rotations = sym.apply_radial_symmetry(curvy, num_petals=layer['petals'])
-        for part in rotations:
-            # Dimmer lines to differentiate from bright dots for high-intensity thresholding test
-            ax.plot(part[:, 0], part[:, 1], color='#555555', lw=3, zorder=i+3)
-
-    ax.axis('off')
-    ax.set_aspect('equal')
-    
-    # Save with tight bounding box
-    plt.savefig(output_path, bbox_inches='tight', pad_inches=0, dpi=100)
-    plt.close()
-    print("Sample generated.")
+from core.lattice import fit_lattice
+from core.render import BACKGROUND, grid_pixels, random_sikku, rasterize_design, rasterize_sikku
+from core.vision import MugguVision, close_lines
+from core.thinning import zhang_suen_thinning
+from core.stream import StreamingAnalyzer
+from core.tiled import TiledAnalyzer
+from core.topology import SkeletonGraph
+import core.vision as vision_module
 
-def verify_analysis(image_path="sample_kolam.png"):
-    print(f"Analyzing {image_path}...")
-    vision = MugguVision(image_path)
+SAMPLE_SIZE = 11
+
+def generate_sample_kolam(output_path=None, seed=None, px=600):
+    """
+    Renders a random design in memory (BGR array) for analysis: bright white
+    dots on black, dimmer gray unfilled lines so the high-intensity dot
+    threshold only picks up the dots. Also saved when output_path is given.
+    """
+    design = HeritageGenerator(size=SAMPLE_SIZE, seed=seed).get_varied_petal_layers()
+    image = rasterize_design(design.with_colors(['#555555']), px=px, background='#000000',
+                             dot_color='#FFFFFF', dot_alpha=1.0, dot_radius=px / 120,
+                             lw=max(1, round(px / 150)), fill=False)
+    if output_path:
+        cv2.imwrite(output_path, image)
+        print(f"Sample Kolam saved to {output_path}.")
+    return image
+
+def verify_analysis(image="sample_kolam.png"):
+    """image: a file path or a BGR array (e.g. from generate_sample_kolam)."""
+    print(f"Analyzing {image if isinstance(image, str) else 'in-memory sample'}...")
+    vision = MugguVision(image)
     
     # DEBUG: Check V channel stats
-    v_channel = vision.hsv[:, :, 2]
+    v_channel = vision.v_channel
     print(f"V-Channel Max: {np.max(v_channel)}")
     print(f"V-Channel Mean: {np.mean(v_channel)}")
     
@@ -59,22 +49,23 @@ def verify_analysis(image_path="sample_kolam.png"):
     print(f"Pixels > 200 in V: {cv2.countNonZero(mask)}")
     
     # Run Analysis
-    results = vision.analyze_principles()
+    analysis = vision.analyze_principles()
+    results = analysis.principles
     
     print("\n--- Verification Results ---")
     for key, value in results.items():
         print(f"{key}: {value}")
         
     # Check specifics
-    dots = vision.identify_chukkalu()
+    dots = analysis.dots
     print(f"Dots Detected: {len(dots)}")
     
     # Palette check
-    palette = vision.extract_color_palette(k=2)
+    palette = analysis.palette
     print(f"Palette: {palette}")
     
     # Visual check
-    skel = vision.get_skeleton()
+    skel = analysis.skeleton
     cv2.imwrite("debug_skeleton.png", skel)
     print("Saved 'debug_skeleton.png' for inspection.")
     
@@ -88,18 +79,289 @@ def verify_analysis(image_path="sample_kolam.png"):
         print("[Pass] Topology check passed (Closed Loop).")
     else:
         print("[WARN] Topology check indicates open loop or endpoints found. (Expected for some random designs, but Code logic ran).")
+    return len(dots) > 0
+
+def verify_roundtrip(count=200, px=600):
+    """
+    Generate -> analyze throughput on in-memory samples. Every detected dot
+    must sit on a grid dot; grid dots covered by a line are legitimately
+    missed, so recall is reported rather than required.
+    """
+    grid = grid_pixels(SAMPLE_SIZE, px)
+    tolerance = 0.25 * (grid[1, 0] - grid[0, 0])
+    found = stray = 0
+    start = time.perf_counter()
+    for seed in range(count):
+        dots = MugguVision(generate_sample_kolam(seed=seed, px=px)).identify_chukkalu()
+        dist = np.linalg.norm(dots[:, None] - grid[None], axis=-1).min(axis=1)
+        found += len(dots)
+        stray += int(np.count_nonzero(dist > tolerance))
+    elapsed = time.perf_counter() - start
+    print(f"Round trip: {count} designs in {elapsed:.2f}s ({60 * count / elapsed:.0f} per minute), "
+          f"dot recall {found / (count * len(grid)):.1%}")
+    if stray:
+        print(f"[FAIL] {stray} detected dots are off the grid!")
+    else:
+        print("[Pass] Every detected dot lies on the grid.")
+    return stray == 0
+
+def verify_sikku(count=20, size=7, px=1000):
+    """
+    Generated Sikku must be one closed line through every midpoint, and the
+    analyzer must confirm it from the rendered line (dots hidden).
+    """
+    single = agreed = 0
+    for seed in range(count):
+        sikku = random_sikku(size, seed)
+        single += sikku.is_single_loop and len(sikku.loops[0]) == 4 * size * size
+        image = rasterize_sikku(sikku, px, dot_color=BACKGROUND)
+        agreed += MugguVision(image).get_skeleton_graph().is_single_closed_loop()
+    print(f"Sikku: {single}/{count} generated as one closed line, "
+          f"{agreed}/{count} confirmed by the topology check.")
+    if single != count:
+        print("[FAIL] Some generated Sikku split into several loops!")
+    elif agreed != count:
+        print("[FAIL] The topology check rejects some generated Sikku!")
+    else:
+        print("[Pass] Every generated Sikku is a single loop, confirmed from its image.")
+    return single == agreed == count
+
+def verify_topology():
+    """
+    Skeletons made only of pure loops (no endpoint or junction pixel at
+    all) must give one loop per ring, not crash.
+    """
+    ring = np.zeros((64, 64), dtype=np.uint8)
+    cv2.circle(ring, (32, 32), 20, 255, 1)
+    two = np.hstack((ring, ring))
+    ok = True
+    for name, skeleton, loops in (("one ring", ring, 1), ("two rings", two, 2)):
+        graph = SkeletonGraph(skeleton)
+        single = graph.is_single_closed_loop()
+        if graph.n_nodes == 0 and graph.loop_count == loops and single == (loops == 1):
+            print(f"[Pass] {name}: {loops} pure loop(s), no nodes.")
+        else:
+            print(f"[FAIL] {name}: {graph.n_nodes} nodes, {graph.loop_count} loops!")
+            ok = False
+    return ok
+
+def verify_tiled(tile=64, n=4):
+    """
+    Tiled analysis must find the same skeleton components as the whole
+    image: short strokes in both diagonal directions cross every tile
+    corner, where the seam joins are easiest to get wrong.
+    """
+    px = tile * n
+    image = np.full((px, px, 3), 255, dtype=np.uint8)
+    for i, cy in enumerate(range(tile, px, tile)):
+        for j, cx in enumerate(range(tile, px, tile)):
+            d = 1 if (i + j) % 2 else -1
+            cv2.line(image, (cx - 12, cy - 12 * d), (cx + 11, cy + 11 * d), (0, 0, 0), 2)
+    whole = MugguVision(image).get_skeleton_graph().n_components
+    with TiledAnalyzer(image, tile=tile, halo=tile // 2) as tiled:
+        components = tiled.run().topology["components"]
+    if components == whole:
+        print(f"[Pass] Tiled and whole-image skeletons agree ({whole} components).")
+    else:
+        print(f"[FAIL] Tiled analysis found {components} components, whole image {whole}!")
+    return components == whole
+
+def verify_stream(tile=64):
+    """
+    A background verdict must describe the frame it was submitted for, even
+    when later frames change tiles while it is still pending (the worker is
+    held until the next frame has overwritten the stream buffers), and no
+    verdict graph may be built on a live stream buffer, including the one
+    for a settled scene whose buffers still equal the snapshot.
+    """
+    first = np.full((2 * tile, 4 * tile, 3), 255, dtype=np.uint8)
+    one_ring = first.copy()
+    cv2.circle(one_ring, (tile, tile), tile // 2, (0, 0, 0), 2)
+    two_rings = one_ring.copy()
+    cv2.circle(two_rings, (3 * tile, tile), tile // 2, (0, 0, 0), 2)
+
+    analyzer = StreamingAnalyzer(tile=tile, graph_interval=1)
+    built = []
+
+    def spy(skeleton):
+        built.append(skeleton)
+        return SkeletonGraph(skeleton)
+
+    release = threading.Event()
+    vision_module.SkeletonGraph = spy
+    try:
+        analyzer.process(first)
+        analyzer._executor.submit(release.wait)
+        analyzer.process(one_ring)
+        snapshot = analyzer.skeleton.copy()
+        pending = analyzer._pending
+        analyzer.process(two_rings)
+        release.set()
+        components = pending.result()["topology"]["components"]
+        # Unchanged frame: the settled drawing is verified once more
+        analyzer.process(two_rings)
+        analyzer._pending.result()
+    finally:
+        release.set()
+        vision_module.SkeletonGraph = SkeletonGraph
+        analyzer.close()
+
+    live = sum(np.shares_memory(skeleton, analyzer.skeleton) for skeleton in built)
+    expected = SkeletonGraph(snapshot).n_components
+    ok = components == expected == 1 and live == 0
+    if ok:
+        print("[Pass] Stream verdicts only read snapshots of their own frame.")
+    else:
+        print(f"[FAIL] Stream verdict saw {components} components (its frame had {expected}); "
+              f"{live} of {len(built)} graphs built on the live skeleton!")
+    return ok
+
+def verify_catalogue(size=5):
+    """
+    The pruned enumeration must find exactly the drawings of brute force:
+    every sorted layer list (repeats allowed) of min..max layers, each
+    layer reaching at least its position + 1 dots out.
+    """
+    catalogue = DesignCatalogue(DesignSpace(size=size))
+    space = catalogue.space
+    found = {key for key, _ in catalogue.designs()}
+    lengths = [option[0] for option in catalogue.options]
+    brute = set()
+    for n in range(space.min_layers, space.max_layers + 1):
+        for chosen in itertools.combinations_with_replacement(range(len(lengths)), n):
+            if all(lengths[j] > i for i, j in enumerate(chosen)):
+                state = {}
+                for j in chosen:
+                    state = catalogue._add(state, j)
+                brute.add(catalogue._key(state).hex())
+    if found == brute:
+        print(f"[Pass] Catalogue of size {size} matches brute force ({len(found)} designs).")
+    else:
+        print(f"[FAIL] Catalogue of size {size}: {len(brute - found)} designs missing, "
+              f"{len(found - brute)} extra out of {len(brute)}!")
+    return found == brute
+
+def lattice_dots(kind, rows, cols, pitch, rotation, jitter=0.0, seed=0, row_spacing=None):
+    """
+    Dot centres of a rows x cols crop of a KolamEngine grid, rotated by
+    'rotation' degrees about the image origin, moved into view and jittered
+    by 'jitter' pitches (Gaussian).
+    """
+    grid = KolamEngine(size=max(rows, cols), spacing=pitch, row_spacing=row_spacing).grid(kind)
+    keep = (grid.cells[:, 0] < rows) & (grid.cells[:, 1] < 2 * cols)
+    t = np.radians(rotation)
+    turn = np.array([[np.cos(t), -np.sin(t)], [np.sin(t), np.cos(t)]])
+    rng = np.random.default_rng(seed)
+    points = grid.points[keep].astype(np.float64) @ turn.T + 20 * pitch
+    return points + rng.normal(0, jitter * pitch, points.shape)
+
+def verify_lattice(count=200):
+    """
+    fit_lattice must recover square, staggered and hex grids, exact or
+    lightly jittered, at any rotation: the kind (hex grids are staggered), pitch and row spacing
+    within 2%, every dot snapped, no site missing.
+    """
+    cases = [("square", 4, 3, 25.0, 4.1, 0.0, None), ("staggered", 7, 5, 46.9, 0.0, 0.0, None),
+             ("hex", 7, 5, 46.9, 0.0, 0.0, None)]
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        kind = str(rng.choice(["square", "staggered", "hex"]))
+        rows, cols = (int(v) for v in rng.integers(3, 10, 2))
+        pitch = float(rng.uniform(10, 60))
+        ratio = float(rng.choice([1.0, rng.uniform(0.75, 1.3)])) if kind == "staggered" else None
+        cases.append((kind, rows, cols, pitch, float(rng.uniform(-45, 45)),
+                      float(rng.choice([0.0, 0.02])), ratio and ratio * pitch))
+    failed = []
+    for seed, (kind, rows, cols, pitch, rotation, jitter, row_spacing) in enumerate(cases):
+        dots = lattice_dots(kind, rows, cols, pitch, rotation, jitter, seed, row_spacing)
+        expected = {"square": pitch, "staggered": row_spacing or pitch, "hex": pitch * np.sqrt(3) / 2}[kind]
+        lattice = fit_lattice(dots)
+        if (lattice is None or lattice.kind != ("square" if kind == "square" else "staggered")
+                or abs(lattice.pitch / pitch - 1) > 0.02
+                or abs(lattice.row_spacing / expected - 1) > 0.02
+                or len(lattice.spurious) or len(lattice.missing)):
+            failed.append(f"{rows}x{cols} {kind} at {rotation:.1f} deg, pitch {pitch:.1f}")
+    if not failed:
+        print(f"[Pass] fit_lattice recovers {len(cases)} rotated square, staggered and hex grids.")
+    else:
+        print(f"[FAIL] fit_lattice misfits {len(failed)} of {len(cases)} grids, e.g. {failed[0]}!")
+    return not failed
+
+def reference_thinning(img):
+    """
+    Textbook Zhang-Suen: both sub-iterations sweep the whole image through
+    shifted views until nothing changes; border pixels stay as they are.
+    Slow but plain, the yardstick for the LUT implementation.
+    """
+    p = (np.asarray(img) > 0).astype(np.uint8)
+    while True:
+        changed = False
+        for step in (0, 1):
+            # P2 (north) clockwise to P9, for every interior pixel
+            n = [p[1 + dy:p.shape[0] - 1 + dy, 1 + dx:p.shape[1] - 1 + dx]
+                 for dy, dx in ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))]
+            b = sum(v.astype(np.int32) for v in n)
+            a = sum(((n[k] == 0) & (n[(k + 1) % 8] == 1)).astype(np.int32) for k in range(8))
+            if step == 0:
+                m1, m2 = n[0] * n[2] * n[4], n[2] * n[4] * n[6]
+            else:
+                m1, m2 = n[0] * n[2] * n[6], n[0] * n[4] * n[6]
+            delete = (p[1:-1, 1:-1] == 1) & (a == 1) & (b >= 2) & (b <= 6) & (m1 == 0) & (m2 == 0)
+            if delete.any():
+                p[1:-1, 1:-1][delete] = 0
+                changed = True
+        if not changed:
+            return p * 255
+
+def verify_thinning(image_path):
+    """
+    Correctness check: the built-in Zhang-Suen fallback must match
+    cv2.ximgproc.thinning pixel for pixel, or reference_thinning when
+    opencv-contrib is not installed, on the closed line mask the analyzer
+    thins.
+    """
+    vision = MugguVision(image_path)
+    closed = close_lines(vision.get_binary(), vision.config)
+
+    if hasattr(cv2, "ximgproc"):
+        name = "ximgproc"
+        reference = cv2.ximgproc.thinning(closed, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN)
+    else:
+        name = "the reference thinning"
+        reference = reference_thinning(closed)
+    ours = zhang_suen_thinning(closed)
+    mismatches = int(np.count_nonzero(reference != ours))
+    if mismatches == 0:
+        print(f"[Pass] Fallback thinning matches {name}.")
+    else:
+        print(f"[FAIL] Fallback thinning differs from {name} in {mismatches} pixels!")
+    return mismatches == 0
 
 if __name__ == "__main__":
     # Test on requested images
     test_files = ["assets/kolam1.JPG", "assets/kolam4.jpg"]
     
+    results = []
     for image_file in test_files:
         if os.path.exists(image_file):
             print(f"\n{'='*30}")
             print(f"VERIFYING: {image_file}")
             print(f"{'='*30}")
-            verify_analysis(image_file)
+            results.append(verify_analysis(image_file))
+            results.append(verify_thinning(image_file))
         else:
             print(f"Error: {image_file} not found locally.")
-        # generate_sample_kolam()
-        # verify_analysis()
+
+    print(f"\n{'='*30}")
+    print("VERIFYING: generated samples")
+    print(f"{'='*30}")
+    results.append(verify_analysis(generate_sample_kolam(seed=0)))
+    results.append(verify_roundtrip())
+    results.append(verify_sikku())
+    results.append(verify_topology())
+    results.append(verify_tiled())
+    results.append(verify_stream())
+    results.append(verify_catalogue())
+    results.append(verify_lattice())
+    if not all(results):
+        sys.exit(1)